@@ -3,12 +3,29 @@ from __future__ import annotations
 import csv
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from robot import PISCO
 from robot import PISCO_CapturarServicios as PCS
 from robot import WriteAndReadSheet as WARS
+from robot import CacheHwnd
+from robot import CedulaCache
+from robot import Columnas
+from robot import Formulario
+from robot import Grabador
+from robot import Dedup
+from robot import MascotaIds
+from robot import Mensajes
+from robot import PoolCaptura
+from robot import Reintentos
+from robot import Selectores
+from robot import Watchdog
+from robot.CedulaCache import MOTIVO_NO_ENCONTRADO, normalizar_cedula
+from robot.Journal import abrir_journal
+from robot.Mensajes import PiscoHung
+from robot.Watchdog import SesionIrrecuperable
 
 
 # ------------------------------------------------------------
@@ -56,20 +73,6 @@ def write_csv_dicts(csv_path: Path, rows: List[Dict[str, str]], headers: List[st
         w.writerows(rows)
 
 
-def find_header(headers: List[str], candidates: List[str]) -> Optional[str]:
-    norm = {h.strip().lower(): h for h in headers}
-    for c in candidates:
-        key = c.strip().lower()
-        if key in norm:
-            return norm[key]
-    for h in headers:
-        hl = h.strip().lower()
-        for c in candidates:
-            if c.strip().lower() in hl:
-                return h
-    return None
-
-
 def load_row_map(csv_path: Path) -> Dict[str, List[int]]:
     map_path = Path(str(csv_path) + ".map.json")
     if not map_path.exists():
@@ -77,6 +80,30 @@ def load_row_map(csv_path: Path) -> Dict[str, List[int]]:
     return json.loads(map_path.read_text(encoding="utf-8"))
 
 
+def save_row_map(csv_path: Path, row_map: Dict[str, List[int]]) -> None:
+    map_path = Path(str(csv_path) + ".map.json")
+    map_path.write_text(json.dumps(row_map, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def write_column_updates(ws, col_idx: int, updates: List[tuple[int, int, str]]) -> int:
+    """Escribe en Google Sheets (una sola llamada) los valores (row, col, value) de una columna."""
+    if not updates:
+        return 0
+
+    min_row = min(r for r, _, _ in updates)
+    max_row = max(r for r, _, _ in updates)
+
+    cells = ws.range(min_row, col_idx, max_row, col_idx)
+    by_row = {r: v for r, _, v in updates}
+
+    for cell in cells:
+        if cell.row in by_row:
+            cell.value = by_row[cell.row]
+
+    ws.update_cells(cells, value_input_option="USER_ENTERED")
+    return len(by_row)
+
+
 def row_id_from_dict(row: Dict[str, str], headers: List[str]) -> str:
     import hashlib
 
@@ -87,12 +114,248 @@ def row_id_from_dict(row: Dict[str, str], headers: List[str]) -> str:
     return hashlib.sha1(base.encode("utf-8")).hexdigest()
 
 
+# ------------------------------------------------------------
+# Journal: reanudar / volver a encolar
+# ------------------------------------------------------------
+# valores de N° Prestacion que no son un No Orden Servicio (además de las marcas permanentes)
+MARCAS_SIN_ORDEN = ("error", "falta cc fallecido", "cedula no registrada")
+
+
+def es_no_orden(valor: Optional[str]) -> bool:
+    """True si `valor` es un No Orden Servicio (no vacío, ni marca, ni error)."""
+    v = (valor or "").strip().lower()
+    return bool(v) and v not in MARCAS_SIN_ORDEN and not Reintentos.es_marca_permanente(v)
+
+
+def reabrir_reescritas(journal, rids: List[str]) -> int:
+    """
+    Filas exportadas (la hoja las muestra en 'Pendiente') que el journal ya dio
+    por escritas: el operador las volvió a poner en Pendiente, se rehacen desde
+    cero (migración + búsqueda). Retorna cuántas.
+    """
+    n = 0
+    for rid in rids:
+        if journal.etapa(rid) == "ESCRITO_SHEET":
+            journal.reiniciar(rid)
+            n += 1
+    return n
+
+
+def orden_reanudable(journal, rid: str) -> str:
+    """No Orden capturado en una corrida anterior ("" si no hay). Marcas y errores no se reutilizan."""
+    valor = (journal.datos(rid).get("valor") or "").strip()
+    return valor if journal.alcanzo(rid, "ORDEN_CAPTURADA") and es_no_orden(valor) else ""
+
+
+# ------------------------------------------------------------
+# Migración por lotes
+# ------------------------------------------------------------
+def renovar_reclamo(
+    reclamo,
+    filas: List[Dict[str, str]],
+    headers: List[str],
+    row_map: Dict[str, List[int]],
+    logger: logging.Logger,
+    etiqueta: str,
+) -> List[Dict[str, str]]:
+    """
+    Renueva el reclamo de las filas de la hoja detrás de `filas` (CSV) y
+    retorna solo las que siguen siendo de este host (todas sus filas de hoja).
+    """
+    gs = [row_map.get(row_id_from_dict(r, headers)) or [] for r in filas]
+    mias = reclamo.renovar({g for v in gs for g in v})
+    vivas = [r for r, v in zip(filas, gs) if all(g in mias for g in v)]
+    if len(vivas) < len(filas):
+        logger.warning("[%s] %s filas las tomó otro host; no se procesan.", etiqueta, len(filas) - len(vivas))
+    return vivas
+
+
+class LoteInterrumpido(RuntimeError):
+    """Guardar Masivo se cortó a mitad de un lote; sus filas ya quedaron conciliadas."""
+
+
+def migrar_lote(
+    mig_win,
+    lote_path: Path,
+    lote: List[Dict[str, str]],
+    headers: List[str],
+    mig_cfg: PISCO.MigracionConfig,
+    journal,
+    cache,
+    logger: logging.Logger,
+    etiqueta: str,
+) -> dict:
+    """
+    Carga + Guardar Masivo de UN lote. Retorna {"csv": Path, "con_errores": bool},
+    donde csv es el CSV del lote (o su _ERRORES.csv si PISCO reportó errores).
+    Las órdenes que se puedan leer del grid de Migración quedan en journal + cache
+    (ORDEN_CAPTURADA), así la captura por cédula solo busca las que falten.
+    """
+    logger.info("4) [lote %s] Cargando CSV en PISCO: %s", etiqueta, lote_path)
+    res_carga = PISCO.cargar_csv(mig_win, str(lote_path))
+
+    cargados = int(res_carga.get("cargados", 0) or 0)
+    invalidos = int(res_carga.get("invalidos", 0) or 0)
+    logger.info("[lote %s] Resultado carga: cargados=%s, invalidos=%s", etiqueta, cargados, invalidos)
+
+    if cargados == 0:
+        logger.info("[lote %s] 0 registros cargados. Cierro 'Datos'.", etiqueta)
+        try:
+            PISCO.cerrar_datos_si_aparece(timeout=3.0)
+        except Exception:
+            pass
+        return {"csv": lote_path, "con_errores": False}
+
+    journal.registrar_muchos([row_id_from_dict(r, headers) for r in lote], "CARGADO")
+
+    timeout = mig_cfg.timeout_guardar(len(lote))
+    logger.info("5) [lote %s] Guardar Masivo (timeout=%ss, estancado=%ss)...", etiqueta, timeout, mig_cfg.estancado)
+    try:
+        res_guardar = PISCO.guardar_masivo(mig_win, timeout=timeout, estancado=mig_cfg.estancado)
+        con_errores = bool(res_guardar.get("tiene_errores"))
+        res = PISCO.capturar_errores_desde_datos(str(lote_path)) if con_errores else {}
+    except Exception as e:
+        # Guardar Masivo ya arrancó: parte del lote puede estar guardada en PISCO
+        logger.error("[lote %s] Guardar Masivo se cortó: %s. Concilio el lote.", etiqueta, e)
+        reconciliar_lote(mig_win, lote, headers, journal, cache, logger, etiqueta)
+        raise LoteInterrumpido(str(e)) from e
+
+    out_csv = lote_path
+    if con_errores:
+        logger.info("6) [lote %s] Guardar Masivo terminó CON errores. Errores capturados desde ventana Datos.", etiqueta)
+        salida = res.get("csv_salida") or ""
+        if salida and Path(salida).is_file():
+            out_csv = Path(salida)
+        else:
+            # sin el CSV de Datos no se sabe qué filas guardó PISCO: no se asume nada
+            logger.warning("[lote %s] PISCO reportó errores pero no hay CSV de Datos; concilio el lote.", etiqueta)
+            reconciliar_lote(mig_win, lote, headers, journal, cache, logger, etiqueta)
+            return {"csv": lote_path, "con_errores": True}
+    else:
+        logger.info("6) [lote %s] Guardar Masivo terminó sin errores.", etiqueta)
+
+    # Guardadas = filas sin texto de error en N° Prestacion
+    rows_g, headers_g, _ = read_csv_dicts(out_csv)
+    col_prest_g = Columnas.nombre(headers_g, "prestacion")
+    col_cc_g = Columnas.nombre(headers_g, "cc_fallecido")
+    guardadas = [r for r in rows_g if col_prest_g and not (r.get(col_prest_g) or "").strip()]
+    journal.registrar_muchos([row_id_from_dict(r, headers_g) for r in guardadas], "GUARDADO")
+    for r in guardadas:
+        cache.olvidar(*clave_busqueda(r, headers_g))  # un "no encontrado" previo ya no vale
+
+    # Cosecha: si el grid de Migración ya muestra las órdenes creadas, no hace falta buscarlas
+    cosechadas = 0
+    if col_cc_g and guardadas:
+        try:
+            ordenes = PISCO.cosechar_ordenes_migracion(mig_win, [r.get(col_cc_g, "") for r in guardadas])
+        except Exception as e:
+            logger.warning("[lote %s] No pude cosechar órdenes del grid de Migración: %s", etiqueta, e)
+            ordenes = {}
+
+        # una cédula con varios servicios en el lote no se puede asignar por cédula
+        n_por_cedula: Dict[str, int] = {}
+        for r in guardadas:
+            k = normalizar_cedula(r.get(col_cc_g, ""))
+            n_por_cedula[k] = n_por_cedula.get(k, 0) + 1
+
+        for r in guardadas:
+            key, mes = clave_busqueda(r, headers_g)
+            no_orden = ordenes.get(key) if n_por_cedula.get(key) == 1 else None
+            if no_orden:
+                journal.registrar(row_id_from_dict(r, headers_g), "ORDEN_CAPTURADA", valor=no_orden)
+                cache.put_ok(key, mes, no_orden)
+                cosechadas += 1
+
+    logger.info("[lote %s] Guardadas=%s | órdenes cosechadas del grid=%s", etiqueta, len(guardadas), cosechadas)
+    return {"csv": out_csv, "con_errores": con_errores}
+
+
+def liberar_mascotas(mascotas, journal, lote: List[Dict[str, str]], headers: List[str], col_cc: str) -> int:
+    """
+    Quita la reserva del M#### de las filas del lote que no quedaron en PISCO
+    (ni GUARDADO ni "incierta"): su ID se libera en la próxima exportación.
+    """
+    libres = []
+    for r in lote:
+        rid = row_id_from_dict(r, headers)
+        if not (journal.alcanzo(rid, "GUARDADO") or journal.datos(rid).get("incierta")):
+            libres.append(r.get(col_cc, ""))
+    n = mascotas.liberar(libres)
+    mascotas.guardar()
+    return n
+
+
+def clave_busqueda(r: Dict[str, str], headers: List[str]) -> tuple[str, Optional[tuple[int, int]]]:
+    """
+    (cédula normalizada, mes del servicio) de una fila: clave de la cache y de
+    la búsqueda en Capturar Servicios (una persona puede tener varios servicios).
+    """
+    col_cc = Columnas.nombre(headers, "cc_fallecido")
+    col_fecha = Columnas.nombre(headers, "fecha_servicio")
+    ced = normalizar_cedula(r.get(col_cc, "")) if col_cc else ""
+    mes = PCS.mes_de_fecha(r.get(col_fecha, "") or "") if col_fecha else None
+    return ced, mes
+
+
+def reconciliar_lote(
+    mig_win,
+    lote: List[Dict[str, str]],
+    headers: List[str],
+    journal,
+    cache,
+    logger: logging.Logger,
+    etiqueta: str,
+) -> tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Lote con resultado desconocido (Guardar Masivo cortado, o con errores y
+    sin CSV de Datos): no se asume ni guardado ni fallido.
+    - filas cuya orden muestra el grid de Migración -> ORDEN_CAPTURADA
+    - el resto queda "incierta" en el journal: no se vuelve a migrar; la
+      captura por cédula decide (encontrada = guardada, no encontrada =
+      la fila vuelve a EXPORTADO y se migra en la próxima corrida)
+    Retorna (filas_con_orden, filas_inciertas).
+    """
+    col_cc = Columnas.nombre(headers, "cc_fallecido")
+    ordenes: Dict[str, str] = {}
+    if col_cc and mig_win is not None:
+        try:
+            ordenes = PISCO.cosechar_ordenes_migracion(mig_win, [r.get(col_cc, "") for r in lote])
+        except Exception as e:
+            logger.warning("[lote %s] No pude leer el grid de Migración para conciliar: %s", etiqueta, e)
+
+    # la orden de una cédula solo es inequívoca si la cédula está una sola vez en el lote
+    n_por_cedula: Dict[str, int] = {}
+    for r in lote:
+        k = normalizar_cedula(r.get(col_cc, "")) if col_cc else ""
+        n_por_cedula[k] = n_por_cedula.get(k, 0) + 1
+
+    con_orden: List[Dict[str, str]] = []
+    inciertas: List[Dict[str, str]] = []
+    for r in lote:
+        key, mes = clave_busqueda(r, headers)
+        no_orden = ordenes.get(key) if key and n_por_cedula[key] == 1 else None
+        if no_orden:
+            journal.registrar(row_id_from_dict(r, headers), "ORDEN_CAPTURADA", valor=no_orden)
+            cache.put_ok(key, mes, no_orden)
+            con_orden.append(r)
+        else:
+            inciertas.append(r)
+
+    journal.registrar_muchos([row_id_from_dict(r, headers) for r in inciertas], "CARGADO", incierta=True)
+    logger.warning(
+        "[lote %s] Conciliación: con orden en el grid=%s | inciertas (se verifican por cédula)=%s",
+        etiqueta, len(con_orden), len(inciertas),
+    )
+    return con_orden, inciertas
+
+
 # ------------------------------------------------------------
 # Main orchestration
 # ------------------------------------------------------------
-def main() -> None:
-    project_dir = Path(__file__).resolve().parent
-    robot_dir = project_dir / "robot"
+def main(robot_dir: Optional[Path] = None) -> None:
+    """robot_dir: carpeta con config.ini, credenciales y estado (default ./robot; Benchmark usa una temporal)."""
+    if robot_dir is None:
+        robot_dir = Path(__file__).resolve().parent / "robot"
     config_path = robot_dir / "config.ini"
 
     setup_logging(robot_dir)
@@ -101,14 +364,34 @@ def main() -> None:
     def is_blank(v: str) -> bool:
         return (v or "").strip() == ""
 
+    Columnas.configurar(config_path)
+    Mensajes.configurar(config_path)
+    Grabador.configurar(config_path)
+    try:
+        CacheHwnd.escuchar_destrucciones()
+    except Exception as e:
+        logger.debug("Sin hook de destrucción de ventanas: %s", e)
+
     # Referencias para cerrar al final
     main_win = None
     mig_win = None
+    cache = None
+    reclamo = None
 
     try:
+        # 0) Journal: estado por fila de corridas anteriores (reanudar tras incidentes)
+        journal = abrir_journal(robot_dir)
+        vivos = journal.compactar()
+        if vivos:
+            logger.info("Journal: %s filas con trabajo pendiente de corridas anteriores: %s", vivos, journal.resumen())
+
+        cache = CedulaCache.desde_config(config_path, robot_dir)
+        cap_cfg = PCS.load_captura_config(str(config_path))
+
         # 1) Google Sheets -> CSV (solo "Pendiente" en la columna N° Prestacion)
         logger.info("1) Generando CSV desde Google Sheets (solo Pendiente)...")
         csv_path = WARS.generate_pendientes_csv(base_dir=robot_dir)
+        reclamo = WARS.reclamo_actual()  # None si [reclamos] no está habilitado
 
         if not csv_path:
             logger.info("No hay registros en 'Pendiente'. Finalizando sin ejecutar PISCO.")
@@ -123,40 +406,29 @@ def main() -> None:
         # ------------------------------------------------------------
         rows0, headers0, delim0 = read_csv_dicts(Path(csv_path))
 
-        col_prest0 = find_header(headers0, ["N° Prestacion", "N Prestaciones", "Prestaciones", "Prestación", "Prestacion"])
+        col_prest0 = Columnas.nombre(headers0, "prestacion")
         if not col_prest0:
             raise RuntimeError(f"No encontré la columna de Prestación/N° Prestacion en el CSV. Headers={headers0}")
 
-        col_cc0 = find_header(headers0, [
-            "CC: Del Fallecido",
-            "CC Del Fallecido",
-            "CC Fallecido",
-            "Cedula Fallecido",
-            "Cédula Fallecido",
-            "Documento Fallecido",
-            "Documento del Fallecido",
-        ])
+        col_cc0 = Columnas.nombre(headers0, "cc_fallecido")
         if not col_cc0:
             raise RuntimeError(f"No encontré la columna de cédula del fallecido en el CSV. Headers={headers0}")
 
         row_map0 = load_row_map(Path(csv_path))
+        rids0 = [row_id_from_dict(r, headers0) for r in rows0]
+        n_reabiertas = reabrir_reescritas(journal, rids0)
+        if n_reabiertas:
+            logger.info("Journal: %s filas ya escritas volvieron a 'Pendiente' en la hoja; se rehacen.", n_reabiertas)
+        journal.registrar_muchos(rids0, "EXPORTADO")
 
         ws0 = WARS.connect(str(robot_dir / WARS.DEFAULT_CREDENTIALS_NAME))
         sheet_all0 = ws0.get_all_values()
         sheet_headers0 = sheet_all0[0] if sheet_all0 else []
 
-        idx_prest_sheet0 = None
-        for cand in ["N° Prestacion", "N° Prestaciones", "N Prestaciones", "Prestaciones", "Prestación", "Prestacion"]:
-            if cand in sheet_headers0:
-                idx_prest_sheet0 = sheet_headers0.index(cand) + 1
-                break
-        if idx_prest_sheet0 is None:
-            for i, h in enumerate(sheet_headers0, start=1):
-                if "prest" in (h or "").strip().lower():
-                    idx_prest_sheet0 = i
-                    break
+        idx_prest_sheet0 = Columnas.indice(sheet_headers0, "prestacion")
         if idx_prest_sheet0 is None:
             raise RuntimeError("No encontré en Google Sheets la columna 'N° Prestacion' (o equivalente).")
+        idx_prest_sheet0 += 1  # gspread: columnas 1-based
 
         marca_cc = "Falta CC fallecido"
         updates0: List[tuple[int, int, str]] = []  # (row, col, value)
@@ -177,26 +449,48 @@ def main() -> None:
             r[col_prest0] = ""
             valid_rows.append(r)
 
-        write_csv_dicts(Path(csv_path), valid_rows, headers0, delim0)
+        # Duplicados (misma clave de negocio) => un solo representante va a PISCO;
+        # el mapa de filas del representante acumula las filas de la hoja de todo el grupo.
+        n_validas = len(valid_rows)
+        valid_rows = Dedup.coalescer(
+            valid_rows,
+            headers0,
+            Dedup.clave_desde_config(config_path),
+            row_map0,
+            lambda r: row_id_from_dict(r, headers0),
+        )
+        save_row_map(Path(csv_path), row_map0)
+
+        journal.registrar_muchos([row_id_from_dict(r, headers0) for r in valid_rows], "VALIDADO")
+
+        # Filas ya guardadas en PISCO en una corrida anterior (o inciertas, que se
+        # concilian por cédula): NO se vuelven a migrar
+        a_migrar: List[Dict[str, str]] = []
+        reanudadas: List[Dict[str, str]] = []
+        for r in valid_rows:
+            rid = row_id_from_dict(r, headers0)
+            if journal.alcanzo(rid, "GUARDADO") or journal.datos(rid).get("incierta"):
+                reanudadas.append(r)
+            else:
+                a_migrar.append(r)
+
+        write_csv_dicts(Path(csv_path), a_migrar, headers0, delim0)
         logger.info(
-            "✅ CSV preparado para PISCO: filas_validas=%s | descartadas_sin_CC=%s",
+            "✅ CSV preparado para PISCO: filas_validas=%s | descartadas_sin_CC=%s | duplicadas=%s | ya_migradas=%s",
             len(valid_rows),
-            len(rows0) - len(valid_rows),
+            len(rows0) - n_validas,
+            n_validas - len(valid_rows),
+            len(reanudadas),
         )
 
+        if updates0 and reclamo is not None:
+            mias0 = reclamo.vigentes(g for g, _, _ in updates0)
+            updates0 = [u for u in updates0 if u[0] in mias0]
         if updates0:
-            min_row = min(r for r, _, _ in updates0)
-            max_row = max(r for r, _, _ in updates0)
-
-            cells = ws0.range(min_row, idx_prest_sheet0, max_row, idx_prest_sheet0)
-            by_row = {r: v for r, _, v in updates0}
-
-            for cell in cells:
-                if cell.row in by_row:
-                    cell.value = by_row[cell.row]
-
-            ws0.update_cells(cells, value_input_option="USER_ENTERED")
-            logger.info("✅ Google Sheets marcado 'Falta CC fallecido' en %s filas.", len(by_row))
+            n0 = write_column_updates(ws0, idx_prest_sheet0, updates0)
+            if reclamo is not None:
+                reclamo.terminar(g for g, _, _ in updates0)
+            logger.info("✅ Google Sheets marcado 'Falta CC fallecido' en %s filas.", n0)
 
         if not valid_rows:
             logger.info("No quedan filas con CC válido. Finalizando sin abrir PISCO.")
@@ -205,76 +499,134 @@ def main() -> None:
         # ------------------------------------------------------------
         # 2) PISCO: cargar CSV + Guardar Masivo
         # ------------------------------------------------------------
-        logger.info("2) Abriendo PISCO e iniciando sesión...")
-        main_win = PISCO.open_and_login(config_path=str(config_path))
-
-        logger.info("3) Abriendo Migración Servicios desde Excel...")
-        mig_win = PISCO.open_migracion(main_win)
-
-        logger.info("4) Cargando CSV en PISCO: %s", csv_path)
-        res_carga = PISCO.cargar_csv(mig_win, str(csv_path))
-
-        cargados = int(res_carga.get("cargados", 0) or 0)
-        invalidos = int(res_carga.get("invalidos", 0) or 0)
-        logger.info("Resultado carga: cargados=%s, invalidos=%s", cargados, invalidos)
-
         csv_to_use = Path(csv_path)
 
-        if cargados == 0:
-            logger.info("0 registros cargados. Cierro 'Datos' y cierro Migración para poder abrir Capturar Servicios.")
-            try:
-                PISCO.cerrar_datos_si_aparece(timeout=3.0)
-            except Exception:
-                pass
-            try:
-                PISCO.cerrar_ventana(mig_win, timeout=6.0)
-                mig_win = None
-            except Exception:
-                pass
-            try:
-                main_win.set_focus()
-            except Exception:
-                pass
+        if not a_migrar:
+            logger.info("2-6) Todas las filas ya fueron migradas antes (journal). Salto Migración.")
         else:
-            logger.info("5) Guardar Masivo...")
-            res_guardar = PISCO.guardar_masivo(mig_win)
-            tiene_errores = bool(res_guardar.get("tiene_errores"))
-
-            if tiene_errores:
-                logger.info("6) Guardar Masivo terminó CON errores. Capturando errores desde ventana Datos...")
-                res = PISCO.capturar_errores_desde_datos(str(csv_path))
-                errores_out = Path(res.get("csv_salida") or "")
-                if errores_out.exists():
-                    logger.info("✅ CSV con errores: %s", errores_out)
-                    csv_to_use = errores_out
+            mig_cfg = PISCO.load_migracion_config(str(config_path))
+            tam = mig_cfg.lote if mig_cfg.lote > 0 else len(a_migrar)
+            lotes = [a_migrar[i:i + tam] for i in range(0, len(a_migrar), tam)]
+
+            if len(lotes) == 1:
+                lote_paths = [Path(csv_path)]  # ya escrito arriba
             else:
-                logger.info("6) Guardar Masivo terminó sin errores.")
+                lote_paths = [
+                    Path(csv_path).with_name(f"{Path(csv_path).stem}_L{i:02d}{Path(csv_path).suffix}")
+                    for i in range(1, len(lotes) + 1)
+                ]
+
+            mascotas = MascotaIds.abrir_allocator(robot_dir)
+
+            logger.info("2) Abriendo PISCO e iniciando sesión...")
+            main_win = PISCO.open_and_login(config_path=str(config_path))
+
+            logger.info("3) Abriendo Migración Servicios desde Excel...")
+            mig_win = PISCO.open_migracion(main_win)
+
+            logger.info("4-6) Migrando %s filas en %s lote(s) de hasta %s.", len(a_migrar), len(lotes), tam)
+            rows_mig: List[Dict[str, str]] = []
+            hubo_errores = False
+            ultimo_csv = Path(csv_path)
+            estancado = False
+
+            # Pipeline: mientras PISCO procesa el lote N, se escribe el CSV del lote N+1
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                prep = None if len(lotes) == 1 else pool.submit(write_csv_dicts, lote_paths[0], lotes[0], headers0, delim0)
+
+                for i, (lote, lote_path) in enumerate(zip(lotes, lote_paths), start=1):
+                    if prep is not None:
+                        prep.result()
+                        prep = None
+                    if i < len(lotes):
+                        prep = pool.submit(write_csv_dicts, lote_paths[i], lotes[i], headers0, delim0)
+
+                    if reclamo is not None:
+                        # reverifica (otro host pudo pisar el reclamo) y extiende el lease por lote
+                        vivas = renovar_reclamo(reclamo, lote, headers0, row_map0, logger, f"lote {i}/{len(lotes)}")
+                        if len(vivas) < len(lote):
+                            lote = vivas
+                            if not lote:
+                                continue
+                            write_csv_dicts(lote_path, lote, headers0, delim0)
+
+                    try:
+                        if not PISCO.ventana_existe(mig_win):
+                            mig_win = PISCO.open_migracion(main_win)
+                        # los M#### del lote quedan reservados antes de que PISCO pueda guardarlos
+                        mascotas.reservar(r.get(col_cc0, "") for r in lote)
+                        mascotas.guardar()
+                        try:
+                            res_lote = migrar_lote(
+                                mig_win, lote_path, lote, headers0, mig_cfg, journal, cache, logger, f"{i}/{len(lotes)}"
+                            )
+                        finally:
+                            liberar_mascotas(mascotas, journal, lote, headers0, col_cc0)
+                    except Exception as e:
+                        logger.error("Lote %s/%s falló (%s filas): %s", i, len(lotes), len(lote), e)
+                        if not isinstance(e, LoteInterrumpido):
+                            # falló antes de Guardar Masivo: nada quedó en PISCO, no se consultan
+                            for r in lote:
+                                r[col_prest0] = "Error"
+                        # si no, las filas ya están conciliadas (orden del grid o "incierta")
+                        # y pasan a la captura por cédula
+                        rows_mig.extend(lote)
+                        ultimo_csv = lote_path
+                        hubo_errores = True
+                        try:
+                            PISCO._close_any_dialogs(timeout=2.0)
+                            PISCO.cerrar_datos_si_aparece(timeout=2.0)
+                        except Exception:
+                            pass
+                        if isinstance(e.__cause__, (TimeoutError, PiscoHung)):
+                            # Guardar Masivo no terminó (GuardarEstancado o plazo vencido):
+                            # PISCO puede seguir colgado, los lotes que faltan no se cargan
+                            estancado = True
+                            break
+                        hwnd = getattr(main_win, "handle", None)
+                        if hwnd and not Mensajes.responde(hwnd, timeout_ms=2000):
+                            logger.error("PISCO no responde después del lote %s/%s.", i, len(lotes))
+                            estancado = True
+                            break
+                        continue
+
+                    ultimo_csv = res_lote["csv"]
+                    rows_l, _, _ = read_csv_dicts(ultimo_csv)
+                    rows_mig.extend(rows_l)
+                    hubo_errores = hubo_errores or res_lote["con_errores"]
+
+            if estancado:
+                # lo conciliado queda "incierto" en el journal y se verifica en la próxima corrida
+                logger.error("❌ PISCO no terminó un lote (colgado). Corto la corrida; lo pendiente queda para la próxima.")
+                return
+
+            # Resultado consolidado (filas con error quedan marcadas en N° Prestacion)
+            if len(lotes) == 1:
+                csv_to_use = ultimo_csv
+            else:
+                csv_to_use = Path(csv_path).with_name(f"{Path(csv_path).stem}_LOTES{Path(csv_path).suffix}")
+            write_csv_dicts(csv_to_use, rows_mig, headers0, delim0)
+            if hubo_errores:
+                logger.info("✅ CSV con errores: %s", csv_to_use)
 
         # ------------------------------------------------------------
         # 3) Capturar No Orden Servicio + actualizar Sheet
         # ------------------------------------------------------------
         logger.info("7) Preparando captura de No Orden Servicio...")
         rows, headers, delim = read_csv_dicts(csv_to_use)
+        rows.extend(reanudadas)
 
-        col_prest = find_header(headers, ["N° Prestacion", "N Prestaciones", "Prestaciones", "Prestación", "Prestacion"])
+        col_prest = Columnas.nombre(headers, "prestacion")
         if not col_prest:
             raise RuntimeError(f"No encontré la columna de Prestación/N° Prestacion en el CSV. Headers={headers}")
 
-        col_cc = find_header(headers, [
-            "CC: Del Fallecido",
-            "CC Del Fallecido",
-            "CC Fallecido",
-            "Cedula Fallecido",
-            "Cédula Fallecido",
-            "Documento Fallecido",
-            "Documento del Fallecido",
-        ])
+        col_cc = Columnas.nombre(headers, "cc_fallecido")
         if not col_cc:
             raise RuntimeError(f"No encontré la columna de cédula del fallecido en el CSV. Headers={headers}")
 
         def is_ok(r: Dict[str, str]) -> bool:
             v = (r.get(col_prest, "") or "").strip().lower()
-            return v not in ("error", "falta cc fallecido", "cedula no registrada")
+            return v not in MARCAS_SIN_ORDEN and not Reintentos.es_marca_permanente(v)
 
         ok_rows = [r for r in rows if is_ok(r) and not is_blank((r.get(col_cc, "") or "").strip())]
 
@@ -282,101 +634,395 @@ def main() -> None:
             logger.info("No hay filas OK para consultar No Orden Servicio.")
             return
 
-        # Asegurar que Migración esté cerrada antes de abrir Capturar Servicios
-        if mig_win is not None:
-            try:
-                PISCO.cerrar_ventana(mig_win, timeout=6.0)
-            except Exception:
-                pass
-            mig_win = None
-
-        try:
-            main_win.set_focus()
-        except Exception:
-            pass
+        # Filas cuya orden ya se capturó antes (journal): solo falta escribir en la hoja
+        capturadas: List[tuple[Dict[str, str], str, str]] = []  # (row, rid, valor)
+        a_consultar: List[Dict[str, str]] = []
+        for r in ok_rows:
+            rid0 = row_id_from_dict(r, headers)
+            valor = orden_reanudable(journal, rid0)
+            if valor:
+                capturadas.append((r, rid0, valor))
+            else:
+                a_consultar.append(r)
 
-        logger.info("8) Abriendo menú: Archivo -> Capturar Servicios...")
-        PCS.capturar_servicios_desde_menu(main_win)
+        if capturadas:
+            logger.info("Journal: %s filas ya tienen No Orden Servicio capturado; no se consultan.", len(capturadas))
 
         row_map = load_row_map(Path(csv_path))  # siempre el del CSV original
 
+        if reclamo is not None:
+            vivas = {id(r) for r in renovar_reclamo(
+                reclamo, [r for r, _, _ in capturadas] + a_consultar, headers, row_map, logger, "captura"
+            )}
+            capturadas = [c for c in capturadas if id(c[0]) in vivas]
+            a_consultar = [r for r in a_consultar if id(r) in vivas]
+
         ws = WARS.connect(str(robot_dir / WARS.DEFAULT_CREDENTIALS_NAME))
         sheet_all = ws.get_all_values()
         sheet_headers = sheet_all[0] if sheet_all else []
 
-        idx_prest_sheet = None
-        for cand in ["N° Prestacion", "N° Prestaciones", "N Prestaciones", "Prestaciones", "Prestación", "Prestacion"]:
-            if cand in sheet_headers:
-                idx_prest_sheet = sheet_headers.index(cand) + 1
-                break
-        if idx_prest_sheet is None:
-            for i, h in enumerate(sheet_headers, start=1):
-                if "prest" in (h or "").strip().lower():
-                    idx_prest_sheet = i
-                    break
+        idx_prest_sheet = Columnas.indice(sheet_headers, "prestacion")
         if idx_prest_sheet is None:
             raise RuntimeError("No encontré en Google Sheets la columna 'N° Prestacion' (o equivalente).")
+        idx_prest_sheet += 1  # gspread: columnas 1-based
 
         updates: List[tuple[int, int, str]] = []
-
-        logger.info("9) Consultando No Orden Servicio para %s registros...", len(ok_rows))
-        for r in ok_rows:
-            cedula = (r.get(col_cc, "") or "").strip()
-            if not cedula:
+        escritos: Dict[str, List[int]] = {}  # rid -> filas de la hoja que quedan escritas
+
+        # [campos_extra]: columnas de la hoja que se llenan con otros campos del formulario
+        idx_extra_sheet: Dict[str, int] = {}
+        for col_hoja in cap_cfg.campos_extra:
+            i = Columnas.indice_libre(sheet_headers, col_hoja)
+            if i is None:
+                logger.warning("[campos_extra] La columna '%s' no existe en Google Sheets; se ignora.", col_hoja)
                 continue
+            idx_extra_sheet[col_hoja] = i + 1
+        updates_extra: Dict[int, List[tuple[int, int, str]]] = {}
 
-            rid0 = row_id_from_dict(r, headers)  # rid antes de cambiar N° Prestacion
+        def agendar(r: Dict[str, str], rid0: str, valor: str, cedula: str, campos: Optional[Dict[str, str]] = None) -> None:
+            # todas las filas de la hoja del grupo (duplicados incluidos) reciben el valor
+            r[col_prest] = valor
+            gs_rows = row_map.pop(rid0, None) or []
+            if gs_rows:
+                for gs_row in gs_rows:
+                    updates.append((gs_row, idx_prest_sheet, valor))
+                escritos[rid0] = gs_rows
+            else:
+                logger.warning("No pude mapear fila a Google Sheets (cedula=%s).", cedula)
 
-            try:
-                out = PCS.buscar_por_cedula_fallecido(main_win=main_win, cedula=cedula)
-            except Exception as e:
-                logger.warning("Cédula=%s -> fallo captura: %s", cedula, e)
+            for col_hoja, idx in idx_extra_sheet.items():
+                v = Formulario.buscar(campos or {}, cap_cfg.campos_extra[col_hoja])
+                if not v:
+                    continue
+                for gs_row in gs_rows:
+                    updates_extra.setdefault(idx, []).append((gs_row, idx, v))
+
+        for r, rid0, valor in capturadas:
+            agendar(r, rid0, valor, (r.get(col_cc, "") or "").strip())
+
+        def etiqueta(mes) -> str:
+            return f"{mes[0]:04d}-{mes[1]:02d}" if mes else "mes por defecto"
+
+        # Agrupar por (cédula, mes del servicio): una búsqueda por grupo. Dos
+        # servicios distintos (otra clave de negocio) de la misma cédula en el
+        # mismo mes no se pueden distinguir en la búsqueda => se marcan.
+        grupos: Dict[tuple, List[Dict[str, str]]] = {}
+        for r in a_consultar:
+            key = clave_busqueda(r, headers)
+            if key[0]:
+                grupos.setdefault(key, []).append(r)
+
+        resultados: Dict[tuple, str] = {}  # key -> valor a escribir
+        campos_por_key: Dict[tuple, Dict[str, str]] = {}  # key -> campos del formulario (búsqueda individual)
+
+        clave_negocio = Dedup.funcion_clave(headers, Dedup.clave_desde_config(config_path))
+        if clave_negocio is not None:
+            for key, rs in grupos.items():
+                if len({clave_negocio(r) for r in rs}) > 1:
+                    logger.warning(
+                        "Cédula=%s tiene %s servicios en %s; la búsqueda no los distingue, se marcan.",
+                        key[0], len(rs), etiqueta(key[1]),
+                    )
+                    resultados[key] = Reintentos.marca_permanente("VARIOS_SERVICIOS_MES")
+
+        # Cache cross-run: resolver lo que ya se conoce SIN tocar la UI
+        for key in grupos:
+            if key in resultados:
+                continue
+            hit = cache.get(*key)
+            if not hit:
                 continue
+            if hit.get("motivo") == MOTIVO_NO_ENCONTRADO:
+                resultados[key] = "Cedula no registrada"
+            elif (hit.get("no_orden") or "").strip():
+                resultados[key] = hit["no_orden"].strip()
 
-            if not out.get("ok") and out.get("motivo") == "NO_ENCONTRADO":
-                marca = "Cedula no registrada"
-                r[col_prest] = marca
+        pendientes = [k for k in grupos if k not in resultados]
+        logger.info(
+            "Cache cédulas: filas=%s | cédula+mes únicos=%s | resueltos=%s | a_buscar=%s",
+            len(a_consultar), len(grupos), len(resultados), len(pendientes),
+        )
 
-                gs_rows = (row_map.get(rid0) or [])
-                if gs_rows:
-                    gs_row = gs_rows.pop(0)
-                    updates.append((gs_row, idx_prest_sheet, marca))
-                else:
-                    logger.warning("No pude mapear fila a Google Sheets (cedula=%s).", cedula)
-                continue
+        # Cédulas pendientes por mes del servicio (el mes ya es parte de la clave).
+        # None = sin fecha legible => mes por defecto del popup (comportamiento anterior).
+        por_mes: Dict[Optional[tuple[int, int]], List[tuple]] = {}
+        for key in pendientes:
+            por_mes.setdefault(key[1], []).append(key)
 
-            if not out.get("ok"):
-                continue
+        if pendientes:
+            # Asegurar que Migración esté cerrada antes de abrir Capturar Servicios
+            if mig_win is not None:
+                try:
+                    PISCO.cerrar_ventana(mig_win, timeout=6.0)
+                except Exception:
+                    pass
+                mig_win = None
 
-            no_orden = (out.get("no_orden_servicio") or "").strip()
-            if not no_orden:
-                continue
+            if main_win is None:
+                logger.info("8.0) Abriendo PISCO e iniciando sesión (solo captura)...")
+                main_win = PISCO.open_and_login(config_path=str(config_path))
 
-            r[col_prest] = no_orden
+        # Watchdog: PISCO colgado o N fallos seguidos => se mata la sesión, login de
+        # nuevo, se reabre Capturar Servicios del mismo mes y se sigue desde la
+        # cédula pendiente. Si no se recupera (SesionIrrecuperable), lo ya
+        # capturado se escribe abajo y el resto queda para otra corrida.
+        watchdog = Watchdog.desde_config(config_path)
+        mes_correcto = False
 
-            gs_rows = (row_map.get(rid0) or [])
-            if gs_rows:
-                gs_row = gs_rows.pop(0)
-                updates.append((gs_row, idx_prest_sheet, no_orden))
+        def hwnd_main() -> Optional[int]:
+            return getattr(main_win, "handle", None)
+
+        def desmontar_sesion() -> None:
+            # PISCO colgado no atiende Alt+F4: directo a taskkill
+            PISCO._kill_pisco_processes(PISCO.load_config(str(config_path)).exe_path)
+            try:
+                PISCO._close_any_dialogs(timeout=2.0)
+            except Exception:
+                pass
+            # sin esperar al hook de destrucción (asíncrono): los hwnds de la sesión muerta se reciclan
+            CacheHwnd.invalidar()
+
+        def reiniciar_sesion() -> None:
+            nonlocal main_win
+            main_win = watchdog.reiniciar(
+                desmontar_sesion, lambda: PISCO.open_and_login(config_path=str(config_path))
+            )
+
+        def abrir_captura(mes, etiqueta_mes: str) -> Optional[dict]:
+            """Archivo -> Capturar Servicios del mes; reinicia la sesión si PISCO está colgado."""
+            while True:
+                try:
+                    main_win.set_focus()
+                except Exception:
+                    pass
+                try:
+                    return PCS.capturar_servicios_desde_menu(main_win, mes=mes)
+                except Exception as e:
+                    logger.warning("No pude abrir Capturar Servicios para %s: %s", etiqueta_mes, e)
+                    if not watchdog.fallo(e, hwnd_main()):
+                        return None
+                reiniciar_sesion()
+
+        def retomar_mes(mes, etiqueta_mes: str) -> None:
+            """Sesión nueva + Capturar Servicios del mismo mes (la captura sigue donde iba)."""
+            nonlocal mes_correcto
+            reiniciar_sesion()
+            popup = abrir_captura(mes, etiqueta_mes)
+            if popup is None:
+                raise SesionIrrecuperable(f"No pude reabrir Capturar Servicios para {etiqueta_mes}")
+            mes_correcto = bool(popup.get("mes_aplicado", mes is None))
+
+        def consultar(cedula: str, mes, etiqueta_mes: str) -> tuple[Optional[dict], Optional[Exception]]:
+            """buscar_por_cedula_fallecido con watchdog; tras un reinicio se reintenta la misma cédula una vez."""
+            err: Optional[Exception] = None
+            for _ in range(2):
+                try:
+                    out = PCS.buscar_por_cedula_fallecido(main_win=main_win, cedula=cedula, entrada=cap_cfg.entrada)
+                    watchdog.exito()
+                    return out, None
+                except Exception as e:
+                    err = e
+                    logger.warning("Cédula=%s -> fallo captura: %s", cedula, e)
+                    if not watchdog.fallo(e, hwnd_main()):
+                        return None, e
+                retomar_mes(mes, etiqueta_mes)
+            return None, err
+
+        def aplicar(key: tuple, mes, out: Optional[dict], err: Optional[Exception], mes_ok: bool) -> None:
+            """Resultado de una búsqueda: No Orden, 'Cedula no registrada', marca permanente o cola de reintentos."""
+            if reclamo is not None:
+                try:
+                    reclamo.renovar_si_toca()
+                except Exception as e:
+                    logger.warning("No pude renovar el reclamo de filas: %s", e)
+            cedula = (grupos[key][0].get(col_cc, "") or "").strip()
+
+            if out is not None and not out.get("ok") and out.get("motivo") == "NO_ENCONTRADO":
+                cola.descartar(key)
+                if not mes_ok:
+                    logger.warning(
+                        "Cédula=%s no encontrada, pero no pude fijar el mes %s; queda pendiente.",
+                        cedula, etiqueta(mes),
+                    )
+                    return
+                cache.put_no_encontrado(*key)
+                resultados[key] = "Cedula no registrada"
+                return
+
+            no_orden = (out.get("no_orden_servicio") or "").strip() if out is not None and out.get("ok") else ""
+            if no_orden:
+                cola.resuelto(key)
+                cache.put_ok(*key, no_orden)
+                resultados[key] = no_orden
+                campos_por_key[key] = out.get("campos") or {}
+                return
+
+            tipo, motivo = Reintentos.clasificar(err, out)
+            if tipo == Reintentos.PERMANENTE:
+                cola.descartar(key)
+                logger.warning("Cédula=%s -> fallo permanente (%s); se marca en la hoja.", cedula, motivo)
+                resultados[key] = Reintentos.marca_permanente(motivo)
+            elif cola.agregar(key, cedula, motivo, grupo=mes):
+                logger.info("Cédula=%s -> fallo transitorio (%s); queda en la cola de reintentos.", cedula, motivo)
             else:
-                logger.warning("No pude mapear fila a Google Sheets (cedula=%s).", cedula)
+                logger.warning("Cédula=%s -> agotó los reintentos (%s); queda pendiente.", cedula, motivo)
+
+        def procesar(key: tuple, mes, etiqueta_mes: str) -> None:
+            cedula = (grupos[key][0].get(col_cc, "") or "").strip()
+            out, err = consultar(cedula, mes, etiqueta_mes)
+            aplicar(key, mes, out, err, mes_correcto)
+
+        # Sesión local como driver del pool: abre el mes pedido solo si cambió
+        mes_local: list = []  # [mes abierto] (vacío = ninguno)
+
+        def buscar_local(cedula: str, mes) -> PoolCaptura.Salida:
+            nonlocal mes_correcto
+            if not mes_local or mes_local[0] != mes:
+                logger.info("8) Abriendo menú: Archivo -> Capturar Servicios (%s)...", etiqueta(mes))
+                popup = abrir_captura(mes, etiqueta(mes))
+                if popup is None:
+                    mes_local.clear()
+                    return None, RuntimeError(f"Capturar Servicios no abrió para {etiqueta(mes)}"), False
+                mes_correcto = bool(popup.get("mes_aplicado", mes is None))
+                mes_local[:] = [mes]
+            out, err = consultar(cedula, mes, etiqueta(mes))
+            return out, err, mes_correcto
+
+        cola = Reintentos.desde_config(config_path)
+        conciliar = cap_cfg.modo == "conciliacion"
+        trabajo: Dict[Optional[tuple[int, int]], List[tuple[tuple, str]]] = {}
+
+        try:
+            for mes, claves in por_mes.items():
+                etiqueta_mes = etiqueta(mes)
+
+                # Conciliación: listado mensual en bloque + join local por cédula
+                if conciliar:
+                    logger.info("8) Abriendo menú: Archivo -> Capturar Servicios (%s, %s cédulas)...", etiqueta_mes, len(claves))
+                    popup = abrir_captura(mes, etiqueta_mes)
+                    if popup is None:
+                        logger.warning("Capturar Servicios no abrió para %s; quedan pendientes.", etiqueta_mes)
+                        continue
+                    mes_correcto = bool(popup.get("mes_aplicado", mes is None))
+                    mes_local[:] = [mes]
+
+                    try:
+                        listado = PCS.listar_servicios_mes(
+                            main_win, cedulas=[grupos[k][0].get(col_cc, "") for k in claves]
+                        )
+                    except PCS.ListadoSinFallecido as e:
+                        logger.warning("%s. Desactivo la conciliación; sigo con búsqueda individual.", e)
+                        listado = []
+                        conciliar = False
+                    except Exception as e:
+                        logger.warning("Listado mensual falló; sigo con búsqueda individual: %s", e)
+                        listado = []
+                        if watchdog.fallo(e, hwnd_main()):
+                            retomar_mes(mes, etiqueta_mes)
+
+                    por_cedula: Dict[str, List[dict]] = {}
+                    for srv in listado:
+                        por_cedula.setdefault(normalizar_cedula(srv["cedula"]), []).append(srv)
+
+                    for key in claves:
+                        cands = por_cedula.get(key[0]) or []
+                        if len(cands) == 1:  # varias órdenes para la misma cédula => se busca individual
+                            resultados[key] = cands[0]["no_orden"]
+                            cache.put_ok(*key, cands[0]["no_orden"])
+
+                    n_antes = len(claves)
+                    claves = [k for k in claves if k not in resultados]
+                    logger.info(
+                        "Conciliación %s: servicios_listado=%s | emparejadas=%s | quedan_individual=%s",
+                        etiqueta_mes, len(listado), n_antes - len(claves), len(claves),
+                    )
+
+                if claves:
+                    trabajo[mes] = [(k, (grupos[k][0].get(col_cc, "") or "").strip()) for k in claves]
+
+            # 9) Búsqueda individual: Coordinador con la sesión local como único driver
+            #    (afinidad de mes: no reabre Capturar Servicios mientras queden cédulas del mes)
+            n_trabajo = sum(len(v) for v in trabajo.values())
+            if n_trabajo:
+                logger.info("9) Consultando No Orden Servicio para %s cédulas (%s meses)...", n_trabajo, len(trabajo))
+                pool = PoolCaptura.Coordinador([PoolCaptura.DriverFunciones("local", buscar_local)])
+                pool.ejecutar(
+                    trabajo,
+                    lambda res: aplicar(res.key, res.mes, res.out, res.err, res.mes_correcto),
+                    mes_inicial={"local": mes_local[0]} if mes_local else None,
+                )
+
+            # 9b) Reintentos al final del lote: formulario recién abierto por mes, con backoff
+            while len(cola):
+                for mes, ents in cola.siguiente_ronda().items():
+                    etiqueta_mes = etiqueta(mes)
+                    popup = abrir_captura(mes, etiqueta_mes)
+                    if popup is None:
+                        for ent in ents:
+                            cola.agregar(ent.key, ent.cedula, "FORMULARIO_NO_ABRIO", grupo=mes)
+                        continue
+                    mes_correcto = bool(popup.get("mes_aplicado", mes is None))
+                    for ent in ents:
+                        procesar(ent.key, mes, etiqueta_mes)
+        except (PiscoHung, SesionIrrecuperable) as e:
+            faltan = sum(1 for k in pendientes if k not in resultados)
+            logger.error("❌ %s. Corto la captura: %s cédulas quedan pendientes.", e, faltan)
+
+        if cola.rondas:
+            rr = cola.resumen()
+            logger.info(
+                "Reintentos: rondas=%s | resueltos=%s | agotados=%s",
+                rr["rondas"], rr["resueltos"], rr["agotados"] + rr["en_cola"],
+            )
+
+        if watchdog.reinicios:
+            rs = watchdog.resumen()
+            logger.info(
+                "Watchdog: reinicios=%s | recuperación total=%ss | máx=%ss",
+                rs["reinicios"], rs["recuperacion_total_s"], rs["recuperacion_max_s"],
+            )
+
+        se = Selectores.estadisticas()
+        if se["consultas"]:
+            logger.info(
+                "Selectores: consultas=%s | memorizadas=%s | nodos evaluados=%s",
+                se["consultas"], se["memo"], se["nodos"],
+            )
+
+        # Repartir el resultado de cada cédula a todas sus filas
+        for key, valor in resultados.items():
+            for r in grupos[key]:
+                rid0 = row_id_from_dict(r, headers)  # rid antes de cambiar N° Prestacion
+                if valor == "Cedula no registrada" and journal.datos(rid0).get("incierta"):
+                    # lote cortado y PISCO no la tiene: no se guardó, se migra de nuevo
+                    logger.warning("Fila incierta (cedula=%s) no está en PISCO; vuelve a migrarse.", key[0])
+                    r[col_prest] = "Error"
+                    journal.reiniciar(rid0)
+                    continue
+                if es_no_orden(valor):
+                    # solo órdenes: una marca no se reescribe en otra corrida, se vuelve a buscar
+                    journal.registrar(rid0, "ORDEN_CAPTURADA", valor=valor)
+                agendar(r, rid0, valor, (r.get(col_cc, "") or "").strip(), campos_por_key.get(key))
 
         write_csv_dicts(csv_to_use, rows, headers, delim)
         logger.info("✅ CSV actualizado con No Orden Servicio: %s", csv_to_use)
 
-        if updates:
-            min_row = min(r for r, _, _ in updates)
-            max_row = max(r for r, _, _ in updates)
-
-            cells = ws.range(min_row, idx_prest_sheet, max_row, idx_prest_sheet)
-            by_row = {r: v for r, _, v in updates}
+        if updates and reclamo is not None:
+            # última verificación: no escribir sobre filas que ya tomó otro host
+            mias = reclamo.vigentes(g for g, _, _ in updates)
+            updates = [u for u in updates if u[0] in mias]
+            updates_extra = {idx: [u for u in ups if u[0] in mias] for idx, ups in updates_extra.items()}
+            escritos = {rid: gs for rid, gs in escritos.items() if all(g in mias for g in gs)}
 
-            for cell in cells:
-                if cell.row in by_row:
-                    cell.value = by_row[cell.row]
-
-            ws.update_cells(cells, value_input_option="USER_ENTERED")
-            logger.info("✅ Google Sheets actualizado (col=%s) en %s filas.", idx_prest_sheet, len(by_row))
+        if updates:
+            n = write_column_updates(ws, idx_prest_sheet, updates)
+            journal.registrar_muchos(list(escritos), "ESCRITO_SHEET")
+            if reclamo is not None:
+                reclamo.terminar(g for g, _, _ in updates)
+            logger.info("✅ Google Sheets actualizado (col=%s) en %s filas.", idx_prest_sheet, n)
+            for idx, ups in updates_extra.items():
+                n = write_column_updates(ws, idx, ups)
+                logger.info("✅ Google Sheets campos extra (col=%s) en %s filas.", idx, n)
         else:
             logger.info("No hubo actualizaciones para Google Sheets.")
 
@@ -422,6 +1068,30 @@ def main() -> None:
         except Exception:
             pass
 
+        # Reclamos: lo que este host no terminó vuelve a "Pendiente"
+        try:
+            if reclamo is not None:
+                n_lib = reclamo.liberar()
+                if n_lib:
+                    logger.info("Reclamos: %s filas sin terminar vuelven a 'Pendiente'.", n_lib)
+        except Exception as e:
+            logger.warning("No pude liberar el reclamo de filas: %s", e)
+
+        # Cache de cédulas: bajar a disco lo que quedó sin guardar
+        try:
+            if cache is not None:
+                cache.guardar()
+        except Exception:
+            pass
+
+        # Latencias de mensajes a PISCO (diagnóstico de cuelgues/lentitud)
+        try:
+            Mensajes.log_latencias()
+            CacheHwnd.log_resumen()
+            CacheHwnd.detener()
+        except Exception:
+            pass
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,243 @@
+# robot/Benchmark.py
+# ==========================================
+# Benchmark.py – captura de main.py contra SimuladorPisco (corre en Linux)
+#
+# Corre main.main() sobre una carpeta temporal (config.ini, journal, cache,
+# CSV), pero NO es el flujo completo de producción:
+#   - la hoja en memoria (HojaSimulada) en lugar de gspread (WARS.connect)
+#   - las entradas de PCS que tocan la UI se reemplazan por DriverSimulado
+#     (capturar_servicios_desde_menu, buscar_por_cedula_fallecido y la
+#     lectura del grid de listar_servicios_mes; el parseo del grid es el de
+#     producción). DriverSimulado repite los pasos de PCS sobre UIDriver,
+#     no ejecuta el código de PCS.
+#   - login/cierre/taskkill de PISCO sin efecto
+#   - Migración NO se corre: las filas se siembran en el journal como
+#     GUARDADO (Guardar Masivo no está simulado)
+# Lo que sí es código de producción: la orquestación de la captura en main
+# (agrupación por mes, cache, conciliación, Coordinador, reintentos, journal
+# y escritura en la hoja).
+#
+# Reporta filas/hora y tiempo por paso en segundos VIRTUALES (latencias del
+# simulador) más el tiempo real de CPU del robot. El backoff de la cola de
+# reintentos no se mide ([reintentos] espera_s = 0).
+#
+# Uso:
+#   python -m robot.Benchmark --filas 2000 --meses 3
+#   python -m robot.Benchmark --filas 500 --sin-conciliacion --fallo-combo 0.05
+# ==========================================
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import logging
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from robot import PISCO
+from robot import PISCO_CapturarServicios as PCS
+from robot import Reintentos
+from robot import WriteAndReadSheet as WARS
+from robot.Journal import abrir_journal
+from robot.SimuladorPisco import DriverSimulado, Latencias, SimuladorUI
+
+logger = logging.getLogger("Robot62.Benchmark")
+
+CABECERAS = ["Fecha Servicio", "CC: Del Fallecido", "N° Prestacion", "Tipo", "Fallecido"]
+_COL_PREST = CABECERAS.index("N° Prestacion") + 1  # 1-based, como gspread
+
+
+# ==========================================================
+# Hoja en memoria (lo que main.py y WARS usan del worksheet de gspread)
+# ==========================================================
+@dataclass
+class Celda:
+    row: int
+    col: int
+    value: str
+
+
+class HojaSimulada:
+    def __init__(self, filas: List[List[str]]):
+        self.filas = [list(CABECERAS)] + [list(f) for f in filas]
+        self.escrituras = 0
+
+    def get_all_values(self) -> List[List[str]]:
+        return [list(f) for f in self.filas]
+
+    def range(self, r1: int, c1: int, r2: int, c2: int) -> List[Celda]:
+        return [Celda(r, c, self.filas[r - 1][c - 1]) for r in range(r1, r2 + 1) for c in range(c1, c2 + 1)]
+
+    def update_cells(self, celdas: List[Celda], value_input_option: str = "RAW") -> None:
+        self.escrituras += 1
+        for c in celdas:
+            self.filas[c.row - 1][c.col - 1] = c.value
+
+    def columna(self, col: int) -> List[str]:
+        return [f[col - 1] for f in self.filas[1:]]
+
+
+class VentanaSimulada:
+    """Lo que main.py toca de la ventana principal (sin handle: el watchdog no hace ping)."""
+
+    def set_focus(self) -> None:
+        pass
+
+
+# ==========================================================
+# Datos
+# ==========================================================
+def generar_datos(
+    filas: int, meses: int, p_encontrada: float = 0.9, p_error13: float = 0.01, semilla: int = 0,
+) -> Tuple[List[List[str]], Dict[Tuple[Any, str], str], set]:
+    """(filas de la hoja en 'Pendiente', servicios del simulador, cédulas con Error 13)"""
+    rnd = random.Random(semilla)
+    hoja: List[List[str]] = []
+    servicios: Dict[Tuple[Any, str], str] = {}
+    error13: set = set()
+    for i in range(filas):
+        mes = (2026, 1 + i % meses)
+        ced = str(10_000_000 + i)
+        hoja.append([f"15/{mes[1]:02d}/{mes[0]}", ced, "Pendiente", "Humano", f"FALLECIDO {ced}"])
+        r = rnd.random()
+        if r < p_error13:
+            error13.add(ced)
+        elif r < p_error13 + p_encontrada:
+            servicios[(mes, ced)] = f"{mes[1]:02d}-{i:04d}-26"
+    return hoja, servicios, error13
+
+
+def _config(robot_dir: Path, conciliacion: bool, max_intentos: int) -> None:
+    (robot_dir / "config.ini").write_text(
+        "[captura]\n"
+        f"modo = {'conciliacion' if conciliacion else 'individual'}\n"
+        "entrada = mensajes\n"
+        "\n[reintentos]\n"
+        f"max_intentos = {max_intentos}\n"
+        "espera_s = 0\n",
+        encoding="utf-8",
+    )
+
+
+def _sembrar_migradas(robot_dir: Path, hoja: List[List[str]]) -> None:
+    """Journal con las filas en GUARDADO: main va directo a la captura."""
+    from main import row_id_from_dict
+
+    i_prest = _COL_PREST - 1
+    rids = []
+    for f in hoja:
+        csv_fila = [("" if j == i_prest else v) for j, v in enumerate(f)]  # como las exporta WARS
+        rids.append(row_id_from_dict(dict(zip(CABECERAS, csv_fila)), CABECERAS))
+    abrir_journal(robot_dir).registrar_muchos(rids, "GUARDADO")
+
+
+@contextlib.contextmanager
+def _sustituir(modulo, **attrs) -> Iterator[None]:
+    antes = {k: getattr(modulo, k) for k in attrs}
+    for k, v in attrs.items():
+        setattr(modulo, k, v)
+    try:
+        yield
+    finally:
+        for k, v in antes.items():
+            setattr(modulo, k, v)
+
+
+def _nada(*_a, **_kw) -> None:
+    return None
+
+
+# ==========================================================
+# Corrida
+# ==========================================================
+def correr(
+    filas: int = 1000,
+    meses: int = 3,
+    conciliacion: bool = True,
+    latencias: Optional[Latencias] = None,
+    max_intentos: int = 3,
+    semilla: int = 0,
+) -> dict:
+    import main as robot_main
+
+    hoja_filas, servicios, error13 = generar_datos(filas, meses, semilla=semilla)
+    hoja = HojaSimulada(hoja_filas)
+    sim = SimuladorUI(servicios, error13, latencias or Latencias(), semilla=semilla)
+    driver = DriverSimulado("local", sim)
+    ventana = VentanaSimulada()
+
+    def listar(main_win, cedulas=(), timeout: float = 15.0) -> list:
+        return PCS.servicios_de_grid(*driver.listar(), cedulas)
+
+    with tempfile.TemporaryDirectory(prefix="robot62-bench-") as tmp:
+        robot_dir = Path(tmp)
+        _config(robot_dir, conciliacion, max_intentos)
+        _sembrar_migradas(robot_dir, hoja_filas)
+
+        cpu0 = time.process_time()
+        with _sustituir(WARS, connect=lambda *_a, **_kw: hoja), _sustituir(
+            PISCO,
+            open_and_login=lambda *_a, **_kw: ventana,
+            cerrar_ventana=_nada,
+            _kill_pisco_processes=_nada,
+            _close_any_dialogs=_nada,
+        ), _sustituir(
+            PCS,
+            capturar_servicios_desde_menu=lambda main_win, mes=None, **_kw: {"mes_aplicado": driver.abrir_mes(mes)},
+            buscar_por_cedula_fallecido=lambda main_win=None, cedula="", **_kw: driver.consultar(cedula),
+            listar_servicios_mes=listar,
+        ):
+            robot_main.main(robot_dir)
+        cpu_s = time.process_time() - cpu0
+
+    valores = hoja.columna(_COL_PREST)
+    n_pend = sum(1 for v in valores if v.strip().lower() == "pendiente")
+    n_nr = sum(1 for v in valores if v == "Cedula no registrada")
+    n_marca = sum(1 for v in valores if Reintentos.es_marca_permanente(v))
+    total_s = sim.reloj_s
+
+    return {
+        "filas": filas,
+        "con_orden": len(valores) - n_pend - n_nr - n_marca,
+        "no_registradas": n_nr,
+        "marcadas": n_marca,
+        "pendientes": n_pend,
+        "segundos_virtuales": round(total_s, 1),
+        "filas_hora": round((filas - n_pend) * 3600 / total_s, 1) if total_s else 0.0,
+        "pasos_s": {k: round(v, 1) for k, v in sorted(driver.etapas.items())},
+        "operaciones_ui": sim.operaciones,
+        "escrituras_hoja": hoja.escrituras,
+        "cpu_s": round(cpu_s, 2),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark de la captura de main.py contra el simulador de PISCO.")
+    ap.add_argument("--filas", type=int, default=1000)
+    ap.add_argument("--meses", type=int, default=3)
+    ap.add_argument("--sin-conciliacion", action="store_true")
+    ap.add_argument("--fallo-combo", type=float, default=0.0)
+    ap.add_argument("--busqueda-s", type=float, default=Latencias.busqueda_s)
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("--log", default="ERROR", help="nivel de log del robot durante la corrida")
+    a = ap.parse_args()
+
+    # antes de main.setup_logging: su basicConfig no agrega handlers si ya hay
+    logging.basicConfig(level=a.log.upper(), format="%(levelname)s | %(name)s | %(message)s")
+    rep = correr(
+        filas=a.filas,
+        meses=a.meses,
+        conciliacion=not a.sin_conciliacion,
+        latencias=Latencias(fallo_combo=a.fallo_combo, busqueda_s=a.busqueda_s),
+        semilla=a.semilla,
+    )
+    for k, v in rep.items():
+        print(f"{k:>20}: {v}")
+
+
+if __name__ == "__main__":
+    main()
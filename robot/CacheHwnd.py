@@ -0,0 +1,212 @@
+# robot/CacheHwnd.py
+# ==========================================
+# CacheHwnd.py – propiedades inmutables por hwnd (clase, ctrl id)
+#
+# La clase y el ctrl id de una ventana no cambian mientras vive, pero los
+# loops de espera (popups, diálogos, botones VB6, listbox, huellas) los
+# pedían a Windows en cada tick y por cada hijo.
+#   - escuchar_destrucciones(): hook EVENT_OBJECT_DESTROY en un hilo propio
+#     que borra la entrada cuando la ventana se destruye (cubre hwnds que
+#     Windows recicla)
+#   - clase(h) / ctrl_id(h): con el hook activo, un acierto sale de caché
+#     sin llamar a Windows. Sin hook (no se pudo instalar o se detuvo) cada
+#     acierto se confirma con IsWindow: no ahorra llamadas y no detecta un
+#     hwnd reciclado, solo uno muerto
+#   - ventana de carrera: el hook es WINEVENT_OUTOFCONTEXT, Windows encola el
+#     evento y el hilo lo atiende DESPUÉS de la destrucción. Entre ambos un
+#     acierto puede devolver datos de un hwnd ya destruido (o reciclado).
+#     Por eso, tras destruir ventanas a propósito (taskkill del reinicio del
+#     watchdog, cierre de diálogos/Datos en PISCO.py) se llama invalidar()
+#     sin esperar al hook
+#   - log_resumen(): evitadas (sin llamada) / validadas (IsWindow) / reales /
+#     invalidaciones
+#
+# Imports de Win32 diferidos: el módulo se importa sin pywin32.
+# ==========================================
+
+from __future__ import annotations
+
+import ctypes
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("Robot62.CacheHwnd")
+
+MAX_ENTRADAS = 8192
+
+EVENT_OBJECT_DESTROY = 0x8001
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+WM_QUIT = 0x0012
+
+_CLASE, _CTRL_ID = 0, 1
+
+_lock = threading.Lock()
+_datos: Dict[int, List[Optional[object]]] = {}  # hwnd -> [clase, ctrl_id]
+_stats = {"evitadas": 0, "validadas": 0, "reales": 0, "invalidadas": 0, "destruidas": 0}
+_hilo: Optional[threading.Thread] = None
+_con_hook = False  # True mientras el hook de destrucción está instalado
+
+
+def _es_ventana(hwnd: int) -> bool:
+    import win32gui
+
+    return bool(win32gui.IsWindow(hwnd))
+
+
+def _obtener(hwnd: int, i: int, leer: Callable[[int], object]):
+    ent = _datos.get(hwnd)
+    if ent is not None and ent[i] is not None:
+        if _con_hook:
+            with _lock:
+                _stats["evitadas"] += 1
+            return ent[i]
+        if _es_ventana(hwnd):
+            with _lock:
+                _stats["validadas"] += 1
+            return ent[i]
+        invalidar(hwnd)
+        with _lock:
+            _stats["invalidadas"] += 1
+
+    v = leer(hwnd)  # hwnd inválido -> la misma excepción que win32gui
+    with _lock:
+        _stats["reales"] += 1
+        if len(_datos) >= MAX_ENTRADAS:
+            _datos.clear()
+        _datos.setdefault(hwnd, [None, None])[i] = v
+    return v
+
+
+def clase(hwnd: int) -> str:
+    """GetClassName, de caché mientras la ventana viva."""
+    import win32gui
+
+    return _obtener(hwnd, _CLASE, win32gui.GetClassName)
+
+
+def ctrl_id(hwnd: int) -> int:
+    """GetDlgCtrlID, de caché mientras la ventana viva."""
+    import win32gui
+
+    return _obtener(hwnd, _CTRL_ID, lambda h: int(win32gui.GetDlgCtrlID(h)))
+
+
+def invalidar(hwnd: Optional[int] = None) -> None:
+    """Olvida un hwnd (o todo, ej. al reiniciar PISCO)."""
+    with _lock:
+        if hwnd is None:
+            _datos.clear()
+        else:
+            _datos.pop(hwnd, None)
+
+
+# ==========================================================
+# Hook de destrucción de ventanas
+# ==========================================================
+def _loop_hook(ok: List[bool], listo: threading.Event) -> None:
+    """Instala el hook y atiende su loop de mensajes hasta WM_QUIT (corre en su hilo)."""
+    from ctypes import wintypes
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    WinEventProc = ctypes.WINFUNCTYPE(
+        None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+        wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD,
+    )
+    user32.SetWinEventHook.restype = wintypes.HANDLE
+    user32.SetWinEventHook.argtypes = [
+        wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProc,
+        wintypes.DWORD, wintypes.DWORD, wintypes.DWORD,
+    ]
+    user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+
+    def al_destruir(_hook, _evento, hwnd, id_obj, id_hijo, _hilo_ev, _ms):
+        if hwnd and id_obj == OBJID_WINDOW and id_hijo == CHILDID_SELF:
+            with _lock:
+                if _datos.pop(hwnd, None) is not None:
+                    _stats["destruidas"] += 1
+
+    proc = WinEventProc(al_destruir)  # referencia viva mientras corre el hilo
+    hook = user32.SetWinEventHook(
+        EVENT_OBJECT_DESTROY, EVENT_OBJECT_DESTROY, None, proc, 0, 0,
+        WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS,
+    )
+    ok[0] = bool(hook)
+    listo.set()
+    if not hook:
+        return
+    try:
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+    finally:
+        user32.UnhookWinEvent(hook)
+
+
+def escuchar_destrucciones(timeout: float = 2.0) -> bool:
+    """
+    Instala SetWinEventHook(EVENT_OBJECT_DESTROY) en un hilo daemon con su
+    propio loop de mensajes. True si quedó activo.
+    """
+    global _hilo, _con_hook
+    if _hilo is not None and _hilo.is_alive():
+        return _con_hook
+
+    listo = threading.Event()
+    ok = [False]
+
+    def correr() -> None:
+        global _con_hook
+        try:
+            _loop_hook(ok, listo)
+        except Exception as e:
+            logger.debug("Hook de destrucción terminó: %s", e)
+        finally:
+            # sin hook nadie invalida: de aquí en más cada acierto se valida con IsWindow
+            _con_hook = False
+            listo.set()
+
+    _hilo = threading.Thread(target=correr, name="CacheHwnd-destroy", daemon=True)
+    _hilo.start()
+    listo.wait(timeout)
+    if ok[0]:
+        _con_hook = True
+    else:
+        logger.warning("No pude instalar el hook de destrucción; la caché valida cada acierto con IsWindow.")
+    return ok[0]
+
+
+def detener() -> None:
+    global _hilo, _con_hook
+    _con_hook = False
+    if _hilo is None or not _hilo.is_alive():
+        return
+    try:
+        ctypes.WinDLL("user32").PostThreadMessageW(_hilo.ident, WM_QUIT, 0, 0)
+        _hilo.join(2.0)
+    except Exception as e:
+        logger.debug("No pude detener el hook de destrucción: %s", e)
+    _hilo = None
+
+
+# ==========================================================
+# Resumen
+# ==========================================================
+def estadisticas() -> Dict[str, int]:
+    with _lock:
+        return dict(_stats, entradas=len(_datos))
+
+
+def log_resumen() -> None:
+    st = estadisticas()
+    if not (st["evitadas"] or st["validadas"] or st["reales"]):
+        return
+    logger.info(
+        "CacheHwnd: llamadas evitadas=%s | aciertos validados con IsWindow=%s | reales=%s | "
+        "invalidadas IsWindow=%s | destroy=%s",
+        st["evitadas"], st["validadas"], st["reales"], st["invalidadas"], st["destruidas"],
+    )
@@ -0,0 +1,154 @@
+# robot/CedulaCache.py
+# ==========================================
+# CedulaCache.py – cache persistente (cédula, mes del servicio) -> No Orden Servicio
+#
+# Guarda el resultado de cada búsqueda en Capturar Servicios:
+#   - OK            -> No Orden Servicio (TTL largo)
+#   - NO_ENCONTRADO -> cache negativa (TTL corto, el servicio puede aparecer luego)
+#
+# La clave incluye el mes: una misma persona puede tener servicios en meses
+# distintos y cada uno tiene su orden. Sin mes (fecha ilegible) no se cachea.
+# Las escrituras se acumulan y se bajan a disco cada `guardar_cada` cambios
+# (y al final con guardar()), no en cada put.
+#
+# Config opcional (config.ini):
+#   [cache]
+#   habilitada = true
+#   ttl_ok_horas = 720
+#   ttl_no_encontrado_horas = 12
+#   guardar_cada = 50
+# ==========================================
+
+from __future__ import annotations
+
+import configparser
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+Mes = Optional[Tuple[int, int]]
+
+logger = logging.getLogger("Robot62.CedulaCache")
+
+DEFAULT_CACHE_NAME = "cedulas_cache.json"
+
+MOTIVO_OK = "OK"
+MOTIVO_NO_ENCONTRADO = "NO_ENCONTRADO"
+
+
+def normalizar_cedula(cedula: str) -> str:
+    """'1.234.567 ' -> '1234567' ; 'm0042' -> 'M0042'"""
+    return re.sub(r"[^0-9A-Za-z]", "", cedula or "").upper()
+
+
+def clave(cedula: str, mes: Mes) -> Optional[str]:
+    """('1.234.567', (2026, 2)) -> '1234567@2026-02' ; None si falta cédula o mes."""
+    ced = normalizar_cedula(cedula)
+    if not ced or not mes:
+        return None
+    return f"{ced}@{mes[0]:04d}-{mes[1]:02d}"
+
+
+class CedulaCache:
+    def __init__(
+        self,
+        path: Path | str,
+        ttl_ok: float = 720 * 3600,
+        ttl_no_encontrado: float = 12 * 3600,
+        habilitada: bool = True,
+        guardar_cada: int = 50,
+    ):
+        self.path = Path(path)
+        self.ttl_ok = ttl_ok
+        self.ttl_no_encontrado = ttl_no_encontrado
+        self.habilitada = habilitada
+        self.guardar_cada = max(1, guardar_cada)
+        self.hits = 0
+        self.misses = 0
+        self._data: Dict[str, dict] = {}
+        self._pendientes = 0  # cambios aún no bajados a disco
+        if habilitada:
+            self._cargar()
+
+    def _cargar(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8")) or {}
+        except Exception as e:
+            logger.warning("Cache de cédulas ilegible (%s). Se ignora: %s", self.path, e)
+            data = {}
+        # entradas viejas (solo cédula, sin mes) no se pueden usar
+        self._data = {k: v for k, v in data.items() if "@" in k}
+
+    def guardar(self) -> None:
+        if not self.habilitada:
+            return
+        ahora = time.time()
+        vivos = {k: v for k, v in self._data.items() if v.get("expira", 0) > ahora}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(vivos, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._data = vivos
+        self._pendientes = 0
+
+    def _tocar(self) -> None:
+        self._pendientes += 1
+        if self._pendientes >= self.guardar_cada:
+            self.guardar()
+
+    def get(self, cedula: str, mes: Mes) -> Optional[dict]:
+        """
+        Retorna {"motivo": "OK", "no_orden": "..."} o {"motivo": "NO_ENCONTRADO"}
+        si hay entrada vigente; None si no hay (o expiró, o no hay mes).
+        """
+        key = clave(cedula, mes)
+        if not self.habilitada or key is None:
+            return None
+        ent = self._data.get(key)
+        if not ent or ent.get("expira", 0) <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(ent)
+
+    def _put(self, cedula: str, mes: Mes, ent: dict, ttl: float) -> None:
+        key = clave(cedula, mes)
+        if not self.habilitada or key is None:
+            return
+        ahora = time.time()
+        ent.update({"ts": ahora, "expira": ahora + ttl})
+        self._data[key] = ent
+        self._tocar()
+
+    def put_ok(self, cedula: str, mes: Mes, no_orden: str) -> None:
+        self._put(cedula, mes, {"motivo": MOTIVO_OK, "no_orden": no_orden}, self.ttl_ok)
+
+    def put_no_encontrado(self, cedula: str, mes: Mes) -> None:
+        self._put(cedula, mes, {"motivo": MOTIVO_NO_ENCONTRADO}, self.ttl_no_encontrado)
+
+    def olvidar(self, cedula: str, mes: Mes) -> None:
+        """Descarta la entrada (ej. se acaba de migrar un servicio para esa cédula y mes)."""
+        key = clave(cedula, mes)
+        if self.habilitada and key is not None and self._data.pop(key, None) is not None:
+            self._tocar()
+
+
+def desde_config(config_path: Path | str, base_dir: Path | str) -> CedulaCache:
+    """Crea la cache en ./robot/estado/ leyendo TTLs de [cache] (todo opcional)."""
+    cp = configparser.ConfigParser()
+    cp.read(str(config_path), encoding="utf-8")
+
+    return CedulaCache(
+        Path(base_dir) / "estado" / DEFAULT_CACHE_NAME,
+        ttl_ok=cp.getfloat("cache", "ttl_ok_horas", fallback=720) * 3600,
+        ttl_no_encontrado=cp.getfloat("cache", "ttl_no_encontrado_horas", fallback=12) * 3600,
+        habilitada=cp.getboolean("cache", "habilitada", fallback=True),
+        guardar_cada=cp.getint("cache", "guardar_cada", fallback=50),
+    )
@@ -0,0 +1,160 @@
+# robot/Columnas.py
+# ==========================================
+# Columnas.py – esquema de columnas + resolución de cabeceras
+#
+# Un solo lugar para los sinónimos de cada columna lógica. Lo usan main.py,
+# WriteAndReadSheet (hoja) y PISCO (CSV de errores), así no pueden discrepar.
+#
+# Normaliza tildes, mayúsculas, signos y espacios:
+#   "N° Prestación " -> "n prestacion"
+#   "CC: Del Fallecido" -> "cc del fallecido"
+#
+# Config opcional (config.ini) – sinónimos extra, separados por "|",
+# con prioridad sobre los de fábrica:
+#   [columnas]
+#   prestacion = Nro Prestacion | Prestación Servicio
+#   cc_fallecido = Identificacion Fallecido
+#   contrato = Nro Contrato        (también vale para las columnas de [campos_extra])
+# ==========================================
+
+from __future__ import annotations
+
+import configparser
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# nombre lógico -> (sinónimos, match_parcial, fragmento_fallback)
+# match_parcial: además del match exacto, acepta cabeceras que CONTENGAN el sinónimo.
+ESQUEMA: Dict[str, tuple[List[str], bool, Optional[str]]] = {
+    "prestacion": (
+        [
+            "N° Prestacion",
+            "N Prestacion",
+            "N Prestaciones",
+            "N° Prestaciones",
+            "No Prestaciones",
+            "No Prestacion",
+            "Prestaciones",
+            "Prestacion",
+        ],
+        True,
+        "prest",
+    ),
+    "cc_fallecido": (
+        [
+            "CC: Del Fallecido",
+            "CC Del Fallecido",
+            "CC Fallecido",
+            "Cedula Fallecido",
+            "Documento Fallecido",
+            "Documento del Fallecido",
+        ],
+        True,
+        None,
+    ),
+    "fecha_servicio": (
+        [
+            "Fecha Servicio",
+            "Fecha del Servicio",
+            "Fecha",
+        ],
+        False,
+        None,
+    ),
+    "tipo": (["Tipo"], False, None),
+    "categoria": (["Categoria"], False, None),
+    "clasificacion": (["Clasificacion"], False, None),
+}
+
+_extra: Dict[str, List[str]] = {}
+
+
+def normalizar(s: str) -> str:
+    s = unicodedata.normalize("NFD", (s or "").lower())
+    s = "".join(c for c in s if unicodedata.category(c) != "Mn")
+    s = re.sub(r"[^0-9a-z]+", " ", s)
+    return s.strip()
+
+
+def configurar(config_path: Path | str) -> None:
+    """Lee sinónimos extra de [columnas] en config.ini (si existe)."""
+    cp = configparser.ConfigParser()
+    cp.read(str(config_path), encoding="utf-8")
+
+    nuevo: Dict[str, List[str]] = {}
+    if "columnas" in cp:
+        for col, raw in cp["columnas"].items():
+            sin = [x.strip() for x in (raw or "").split("|") if x.strip()]
+            if sin:
+                nuevo[col.strip().lower()] = sin
+
+    global _extra
+    if nuevo != _extra:
+        _extra = nuevo
+        _resolver_cached.cache_clear()
+
+
+def _sinonimos(col: str) -> List[str]:
+    base, _, _ = ESQUEMA.get(col, ([], False, None))
+    return [normalizar(s) for s in _extra.get(col, []) + base]
+
+
+@lru_cache(maxsize=64)
+def _resolver_cached(firma: tuple[str, ...]) -> Dict[str, Optional[int]]:
+    norm = [normalizar(h) for h in firma]
+    pos: Dict[str, int] = {}
+    for i, h in enumerate(norm):
+        pos.setdefault(h, i)
+
+    out: Dict[str, Optional[int]] = {}
+    for col in set(ESQUEMA) | set(_extra):
+        _, parcial, fragmento = ESQUEMA.get(col, ([], False, None))
+        sinonimos = _sinonimos(col)
+
+        idx = next((pos[s] for s in sinonimos if s in pos), None)
+
+        if idx is None and parcial:
+            idx = next((i for i, h in enumerate(norm) for s in sinonimos if s and s in h), None)
+
+        if idx is None and fragmento:
+            idx = next((i for i, h in enumerate(norm) if fragmento in h), None)
+
+        out[col] = idx
+    return out
+
+
+def resolver(headers: Sequence[str]) -> Dict[str, Optional[int]]:
+    """
+    Resuelve TODAS las columnas lógicas en una pasada.
+    Retorna {nombre_logico: indice 0-based | None}. Memoizado por la fila de cabeceras.
+    """
+    return _resolver_cached(tuple(h or "" for h in headers))
+
+
+def indice(headers: Sequence[str], col: str) -> Optional[int]:
+    return resolver(headers).get(col)
+
+
+def nombre(headers: Sequence[str], col: str) -> Optional[str]:
+    """Nombre real de la cabecera (para csv.DictReader)."""
+    i = indice(headers, col)
+    return headers[i] if i is not None else None
+
+
+def indice_libre(headers: Sequence[str], col: str) -> Optional[int]:
+    """
+    Columna dada por su nombre en la hoja (ej. claves de [campos_extra]): si
+    tiene sinónimos (esquema o [columnas]) se resuelve con ellos, así un
+    renombre en la hoja se arregla en config; si no, cabecera con ese nombre.
+    """
+    logico = (col or "").strip().lower()
+    if logico in ESQUEMA or logico in _extra:
+        i = indice(headers, logico)
+        if i is not None:
+            return i
+    objetivo = normalizar(col)
+    norm = [normalizar(h) for h in headers]
+    return norm.index(objetivo) if objetivo in norm else None
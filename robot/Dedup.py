@@ -0,0 +1,101 @@
+# robot/Dedup.py
+# ==========================================
+# Dedup.py – agrupar pendientes duplicados antes de migrar
+#
+# Si el mismo servicio se ingresó dos veces en la hoja, solo UNA fila
+# (representante) va a PISCO; las demás quedan colgadas de ella en el mapa
+# de filas (.map.json) y reciben el mismo No Orden Servicio al escribir.
+#
+# Config opcional (config.ini) – columnas lógicas de robot/Columnas.py:
+#   [dedup]
+#   clave = cc_fallecido, fecha_servicio, tipo
+#   (clave vacía => desactivado)
+# ==========================================
+
+from __future__ import annotations
+
+import configparser
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from robot import Columnas
+from robot.CedulaCache import normalizar_cedula
+
+logger = logging.getLogger("Robot62.Dedup")
+
+CLAVE_DEFAULT = ("cc_fallecido", "fecha_servicio", "tipo")
+
+
+def clave_desde_config(config_path: Path | str) -> List[str]:
+    cp = configparser.ConfigParser()
+    cp.read(str(config_path), encoding="utf-8")
+    raw = cp.get("dedup", "clave", fallback=",".join(CLAVE_DEFAULT))
+    return [c.strip().lower() for c in raw.split(",") if c.strip()]
+
+
+def funcion_clave(
+    headers: Sequence[str], clave: Sequence[str]
+) -> Optional[Callable[[Dict[str, str]], tuple]]:
+    """
+    Función fila -> clave de negocio normalizada, o None si la clave está
+    vacía, no incluye cc_fallecido o alguna de sus columnas no tiene cabecera.
+    """
+    cols = [(c, Columnas.nombre(headers, c)) for c in clave]
+    if not cols or any(h is None for _, h in cols) or not any(c == "cc_fallecido" for c, _ in cols):
+        return None
+
+    def valor(r: Dict[str, str], c: str, h: str) -> str:
+        v = r.get(h, "") or ""
+        return normalizar_cedula(v) if c == "cc_fallecido" else Columnas.normalizar(v)
+
+    return lambda r: tuple(valor(r, c, h) for c, h in cols)
+
+
+def coalescer(
+    rows: List[Dict[str, str]],
+    headers: Sequence[str],
+    clave: Sequence[str],
+    row_map: Dict[str, List[int]],
+    rid_of: Callable[[Dict[str, str]], str],
+) -> List[Dict[str, str]]:
+    """
+    Retorna solo los representantes (primera fila de cada grupo, en orden).
+    Mueve las filas de Google Sheets de cada duplicado al rid del representante
+    dentro de row_map (in-place).
+    """
+    if not clave:
+        return rows
+    faltan = [c for c in clave if Columnas.nombre(headers, c) is None]
+    if faltan:
+        # sin una columna la clave quedaría más ancha y juntaría servicios distintos
+        logger.warning("Dedup: columnas de la clave sin cabecera %s. No se agrupa.", faltan)
+        return rows
+
+    clave_de = funcion_clave(headers, clave)
+    if clave_de is None:
+        logger.info("Dedup: la clave no incluye cc_fallecido. No se agrupa.")
+        return rows
+
+    reps: Dict[tuple, str] = {}  # clave -> rid representante
+    out: List[Dict[str, str]] = []
+    n_dups = 0
+
+    for r in rows:
+        k = clave_de(r)
+        rid = rid_of(r)
+
+        rep_rid = reps.get(k)
+        if rep_rid is None:
+            reps[k] = rid
+            out.append(r)
+            continue
+
+        n_dups += 1
+        if rid != rep_rid:
+            row_map.setdefault(rep_rid, []).extend(row_map.pop(rid, []))
+        logger.info("Dedup: fila duplicada %s -> representante %s (clave=%s)", rid[:10], rep_rid[:10], k)
+
+    if n_dups:
+        logger.info("Dedup: %s filas -> %s representantes (%s duplicadas).", len(rows), len(out), n_dups)
+    return out
@@ -0,0 +1,60 @@
+# robot/Diferido.py
+# ==========================================
+# Diferido.py – imports de Win32 que se resuelven en el primer uso
+#
+# PISCO.py y PISCO_CapturarServicios.py usan win32gui/win32con/pywinauto en
+# casi todas sus funciones. Con estos proxies los módulos se importan sin
+# pywin32 (Linux: tests, SimuladorPisco, Benchmark) y el import real ocurre
+# la primera vez que se toca un atributo o se llama:
+#
+#   win32gui = modulo("win32gui")
+#   Desktop = atributo("pywinauto", "Desktop")
+#   user32 = Diferido(lambda: ctypes.windll.user32, "user32")
+#
+# Sin pywin32 el error (ImportError/AttributeError) sale en ese primer uso.
+# ==========================================
+
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import Any, Callable
+
+
+class Diferido:
+    """Objeto que se carga recién cuando se usa (atributo o llamada)."""
+
+    def __init__(self, cargar: Callable[[], Any], nombre: str):
+        self._cargar = cargar
+        self._nombre = nombre
+        self._lock = threading.Lock()
+        self._valor: Any = None
+        self._listo = False
+
+    def _objeto(self) -> Any:
+        if not self._listo:
+            with self._lock:
+                if not self._listo:
+                    self._valor = self._cargar()
+                    self._listo = True
+        return self._valor
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self._objeto(), attr)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._objeto()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        estado = "cargado" if self._listo else "sin cargar"
+        return f"<Diferido {self._nombre} ({estado})>"
+
+
+def modulo(nombre: str) -> Diferido:
+    return Diferido(lambda: importlib.import_module(nombre), nombre)
+
+
+def atributo(nombre_modulo: str, attr: str) -> Diferido:
+    return Diferido(lambda: getattr(importlib.import_module(nombre_modulo), attr), f"{nombre_modulo}.{attr}")
@@ -0,0 +1,183 @@
+# robot/Formulario.py
+# ==========================================
+# Formulario.py – scrape completo de un formulario VB6 en UNA pasada
+#
+# 1) foto(): un solo recorrido de descendientes -> lista de Control
+#    (clase, texto, rect) de labels y campos visibles.
+# 2) emparejar(): cada label Static con el campo más cercano a su derecha,
+#    usando un índice espacial (bandas en Y + orden por X) en vez de comparar
+#    todos contra todos.
+# 3) Resultado: {"no orden servicio": "05-0791-26", "contrato nro": "...", ...}
+#    con claves normalizadas (Columnas.normalizar, sin "*" ni ":").
+# ==========================================
+
+from __future__ import annotations
+
+import bisect
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from robot import Columnas, UIDriver
+from robot.Mensajes import PiscoHung
+
+logger = logging.getLogger("Robot62.Formulario")
+
+CLASES_LABEL = ("Static",)
+CLASES_CAMPO = (
+    "Edit",
+    "ThunderRT6TextBox",
+    "ThunderRT6TextBox2",
+    "ThunderRT6MaskedEdit",
+    "ComboBox",
+    "ThunderRT6ComboBox",
+    "SysDateTimePick32",
+    "DTPicker20WndClass",
+)
+
+# campos más altos que esto son textareas (observaciones), no valores de un label
+ALTO_MAX_CAMPO = 40
+# alto de banda del índice espacial (px)
+BANDA = 24
+# desalineación vertical máxima label <-> campo (px, bordes superiores)
+DY_MAX = 14
+
+
+@dataclass(frozen=True)
+class Control:
+    hwnd: int
+    clase: str
+    texto: str
+    l: int
+    t: int
+    r: int
+    b: int
+
+    @property
+    def es_label(self) -> bool:
+        return self.clase in CLASES_LABEL
+
+    @property
+    def es_campo(self) -> bool:
+        return self.clase in CLASES_CAMPO and (self.b - self.t) <= ALTO_MAX_CAMPO
+
+
+def clave_campo(label: str) -> str:
+    """'* No Orden Servicio:' -> 'no orden servicio'"""
+    return Columnas.normalizar(label)
+
+
+class _IndiceCampos:
+    """Campos agrupados por banda vertical y ordenados por X dentro de cada banda."""
+
+    def __init__(self, campos: Sequence[Control]):
+        self._bandas: Dict[int, List[Control]] = {}
+        for c in campos:
+            self._bandas.setdefault(c.t // BANDA, []).append(c)
+        self._xs: Dict[int, List[int]] = {}
+        for k, lst in self._bandas.items():
+            lst.sort(key=lambda c: c.l)
+            self._xs[k] = [c.l for c in lst]
+
+    def mas_cercano_a_la_derecha(self, label: Control) -> Optional[Control]:
+        mejor, mejor_score = None, None
+        b0 = (label.t - DY_MAX) // BANDA
+        b1 = (label.t + DY_MAX) // BANDA
+        for k in range(b0, b1 + 1):
+            lst = self._bandas.get(k)
+            if not lst:
+                continue
+            i = bisect.bisect_left(self._xs[k], label.r - 5)
+            for c in lst[i:]:
+                xgap = abs(c.l - label.r)
+                if mejor_score is not None and xgap >= mejor_score:
+                    break  # más a la derecha solo empeora
+                dy = abs(c.t - label.t)
+                if dy > DY_MAX:
+                    continue
+                score = dy * 4 + xgap
+                if mejor_score is None or score < mejor_score:
+                    mejor, mejor_score = c, score
+        return mejor
+
+
+def emparejar_controles(controles: Sequence[Control]) -> Dict[str, Control]:
+    """
+    {clave_label: Control del campo}. Si dos labels normalizan igual, gana el
+    primero con valor no vacío.
+    """
+    labels = [c for c in controles if c.es_label and c.texto]
+    indice = _IndiceCampos([c for c in controles if c.es_campo])
+
+    out: Dict[str, Control] = {}
+    for lb in labels:
+        clave = clave_campo(lb.texto)
+        if not clave or (clave in out and out[clave].texto):
+            continue
+        campo = indice.mas_cercano_a_la_derecha(lb)
+        if campo is not None:
+            out[clave] = campo
+    return out
+
+
+def emparejar(controles: Sequence[Control]) -> Dict[str, str]:
+    """{clave_label: texto_del_campo}"""
+    return {k: c.texto for k, c in emparejar_controles(controles).items()}
+
+
+def buscar(campos: Dict[str, str], *fragmentos: str) -> Optional[str]:
+    """Primer valor no vacío cuya clave contenga TODOS los fragmentos (normalizados)."""
+    frs = [clave_campo(f) for f in fragmentos]
+    for k, v in campos.items():
+        if v and all(f in k for f in frs):
+            return v
+    return None
+
+
+def buscar_por_patron(controles: Sequence[Control], patron: re.Pattern) -> Optional[str]:
+    for c in controles:
+        if c.es_campo and patron.match(c.texto):
+            return c.texto
+    return None
+
+
+# ==========================================================
+# UI (Win32 real o simulador, ver UIDriver)
+# ==========================================================
+def _texto(hwnd: int, ui: Optional[UIDriver.UIDriver] = None) -> str:
+    ui = ui or UIDriver.ui()
+    try:
+        return ui.texto(hwnd)
+    except PiscoHung:
+        raise
+    except Exception:
+        try:
+            return ui.titulo(hwnd)
+        except Exception:
+            return ""
+
+
+def foto(hwnd_root: int, ui: Optional[UIDriver.UIDriver] = None) -> List[Control]:
+    """Una pasada por los descendientes visibles: labels + campos con su texto y rect."""
+    ui = ui or UIDriver.ui()
+    out: List[Control] = []
+
+    for h in ui.descendientes(hwnd_root):
+        try:
+            if not ui.visible(h):
+                continue
+            cls = ui.clase(h)
+            if cls not in CLASES_LABEL and cls not in CLASES_CAMPO:
+                continue
+            txt = ui.titulo(h) if cls in CLASES_LABEL else _texto(h, ui)
+            out.append(Control(h, cls, txt, *ui.rect(h)))
+        except PiscoHung:
+            raise
+        except Exception:
+            continue
+    return out
+
+
+def leer_formulario(hwnd_root: int, ui: Optional[UIDriver.UIDriver] = None) -> Dict[str, str]:
+    return emparejar(foto(hwnd_root, ui))
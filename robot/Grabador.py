@@ -0,0 +1,324 @@
+# robot/Grabador.py
+# ==========================================
+# Grabador.py – grabación y replay del árbol de ventanas
+#
+# Grabación (producción): en cada paso clave (barra de búsqueda, registro de
+# servicio, grid, dump de diagnóstico) se guarda el árbol completo de la
+# ventana (clase, título, texto, rect, ctrl id, visible, jerarquía) y lo que
+# eligió el localizador, en ./robot/grabaciones/<corrida>/NNNN_<paso>.json.gz
+#
+# Replay (Linux): ReplayUI sirve una grabación como UIDriver de solo lectura;
+# `python -m robot.Grabador <carpeta>` corre los localizadores contra todas
+# las grabaciones y reporta tiempo y aciertos contra lo elegido en vivo.
+#
+# Config opcional (config.ini):
+#   [grabacion]
+#   habilitada = false
+#   carpeta = grabaciones
+#   max_archivos = 2000      (por corrida)
+# ==========================================
+
+from __future__ import annotations
+
+import configparser
+import gzip
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from robot.Formulario import CLASES_CAMPO
+from robot.Mensajes import PiscoHung
+from robot.UIDriver import UIDriver, ui as ui_actual
+
+logger = logging.getLogger("Robot62.Grabador")
+
+# además de los campos, estas clases guardan su texto real (WM_GETTEXT)
+_CLASES_CON_TEXTO = set(CLASES_CAMPO) | {"ComboBox", "ThunderRT6ComboBox", "ThunderComboBox", "ComboBoxEx32"}
+
+
+# ==========================================================
+# Instantánea
+# ==========================================================
+def _nodo(ui: UIDriver, h: int, profundidad: int) -> dict:
+    cls = ui.clase(h)
+    n = {
+        "h": int(h),
+        "clase": cls,
+        "titulo": ui.titulo(h),
+        "rect": list(ui.rect(h)),
+        "id": ui.ctrl_id(h),
+        "visible": ui.visible(h),
+    }
+    if cls in _CLASES_CON_TEXTO:
+        try:
+            n["texto"] = ui.texto(h)
+        except PiscoHung:
+            raise
+        except Exception:
+            n["texto"] = n["titulo"]
+    if profundidad < 32:
+        n["hijos"] = [_nodo(ui, c, profundidad + 1) for c in ui.hijos(h)]
+    return n
+
+
+def instantanea(ui: UIDriver, raices: List[int]) -> List[dict]:
+    out = []
+    for r in raices:
+        try:
+            out.append(_nodo(ui, r, 0))
+        except PiscoHung:
+            raise
+        except Exception as e:
+            logger.debug("No pude grabar hwnd=%s: %s", r, e)
+    return out
+
+
+# ==========================================================
+# Grabador
+# ==========================================================
+class Grabador:
+    def __init__(self, carpeta: Optional[Path | str] = None, max_archivos: int = 2000):
+        self.carpeta = Path(carpeta) if carpeta else None
+        self.max_archivos = max_archivos
+        self.n = 0
+
+    @property
+    def habilitado(self) -> bool:
+        return self.carpeta is not None
+
+    def grabar(
+        self,
+        paso: str,
+        raiz: int,
+        elegidos: Optional[Dict[str, Optional[int]]] = None,
+        ui: Optional[UIDriver] = None,
+    ) -> Optional[Path]:
+        """Graba el árbol de `raiz` (+ las ventanas de nivel superior). Nunca corta el flujo."""
+        if not self.habilitado or self.n >= self.max_archivos:
+            return None
+        ui = ui or ui_actual()
+        try:
+            t0 = time.perf_counter()
+            raices = [raiz] + [h for h in ui.ventanas() if h != raiz]
+            datos = {
+                "paso": paso,
+                "ts": time.time(),
+                "raiz": int(raiz),
+                "elegidos": {k: (int(v) if v else None) for k, v in (elegidos or {}).items()},
+                "ventanas": instantanea(ui, raices),
+            }
+            self.carpeta.mkdir(parents=True, exist_ok=True)
+            self.n += 1
+            nombre = "".join(c if c.isalnum() or c in "._-" else "_" for c in paso)[:60]
+            path = self.carpeta / f"{self.n:04d}_{nombre}.json.gz"
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                json.dump(datos, f, ensure_ascii=False)
+            logger.debug("Grabación %s (%.0fms)", path.name, (time.perf_counter() - t0) * 1000)
+            return path
+        except PiscoHung:
+            raise
+        except Exception as e:
+            logger.warning("No pude grabar el paso %s: %s", paso, e)
+            return None
+
+
+_instancia = Grabador()
+
+
+def configurar(config_path: Path | str) -> None:
+    """Lee [grabacion]; la carpeta de la corrida es <carpeta>/<AAAAmmdd_HHMMSS>."""
+    global _instancia
+    cp = configparser.ConfigParser()
+    cp.read(str(config_path), encoding="utf-8")
+    if not cp.getboolean("grabacion", "habilitada", fallback=False):
+        _instancia = Grabador()
+        return
+    base = Path(cp.get("grabacion", "carpeta", fallback="grabaciones"))
+    if not base.is_absolute():
+        base = Path(config_path).resolve().parent / base
+    _instancia = Grabador(
+        base / time.strftime("%Y%m%d_%H%M%S"),
+        max_archivos=cp.getint("grabacion", "max_archivos", fallback=2000),
+    )
+    logger.info("Grabación de ventanas habilitada: %s", _instancia.carpeta)
+
+
+def grabador() -> Grabador:
+    return _instancia
+
+
+# ==========================================================
+# Replay
+# ==========================================================
+class SoloLectura(RuntimeError):
+    """Acción de UI (escribir, click, combo, menú, cerrar) pedida a una grabación."""
+
+
+class ReplayUI(UIDriver):
+    """UIDriver de solo lectura servido desde una grabación: las acciones lanzan SoloLectura."""
+
+    def __init__(self, datos: dict):
+        self.datos = datos
+        self._nodos: Dict[int, dict] = {}
+        self._padre: Dict[int, int] = {}
+        self._top: List[int] = []
+        for v in datos.get("ventanas", []):
+            self._top.append(v["h"])
+            self._indexar(v, 0)
+        self.operaciones = 0
+
+    @classmethod
+    def desde_archivo(cls, path: Path | str) -> "ReplayUI":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _indexar(self, n: dict, padre: int) -> None:
+        self._nodos[n["h"]] = n
+        self._padre[n["h"]] = padre
+        for c in n.get("hijos", []):
+            self._indexar(c, n["h"])
+
+    def _n(self, h: int) -> dict:
+        self.operaciones += 1
+        n = self._nodos.get(h)
+        if n is None:
+            raise LookupError(f"hwnd={h} no está en la grabación")
+        return n
+
+    @property
+    def raiz(self) -> int:
+        return self.datos["raiz"]
+
+    @property
+    def elegidos(self) -> Dict[str, Optional[int]]:
+        return self.datos.get("elegidos", {})
+
+    def ventanas(self) -> List[int]:
+        return [h for h in self._top if self._nodos[h]["visible"]]
+
+    def hijos(self, hwnd: int) -> List[int]:
+        return [c["h"] for c in self._n(hwnd).get("hijos", [])]
+
+    def existe(self, hwnd: int) -> bool:
+        return hwnd in self._nodos
+
+    def visible(self, hwnd: int) -> bool:
+        # IsWindowVisible: visible solo si toda la cadena de padres lo es
+        while hwnd:
+            if not self._n(hwnd)["visible"]:
+                return False
+            hwnd = self._padre.get(hwnd, 0)
+        return True
+
+    def padre(self, hwnd: int) -> int:
+        return self._padre.get(hwnd, 0)
+
+    def clase(self, hwnd: int) -> str:
+        return self._n(hwnd)["clase"]
+
+    def ctrl_id(self, hwnd: int) -> int:
+        return self._n(hwnd)["id"]
+
+    def rect(self, hwnd: int):
+        return tuple(self._n(hwnd)["rect"])
+
+    def titulo(self, hwnd: int) -> str:
+        return self._n(hwnd)["titulo"]
+
+    def texto(self, hwnd: int) -> str:
+        n = self._n(hwnd)
+        return n.get("texto", n["titulo"])
+
+    def set_texto(self, hwnd: int, valor: str) -> bool:
+        raise SoloLectura(f"ReplayUI es de solo lectura: set_texto(hwnd={hwnd})")
+
+    def click(self, hwnd: int) -> None:
+        raise SoloLectura(f"ReplayUI es de solo lectura: click(hwnd={hwnd})")
+
+    def combo_items(self, hwnd: int) -> List[str]:
+        return []
+
+    def combo_set(self, hwnd: int, idx: int) -> bool:
+        raise SoloLectura(f"ReplayUI es de solo lectura: combo_set(hwnd={hwnd})")
+
+    def menu(self, hwnd: int, ruta: str) -> None:
+        raise SoloLectura(f"ReplayUI es de solo lectura: menu(hwnd={hwnd})")
+
+    def leer_grid(self, hwnd: int):
+        return [], []
+
+    def cerrar(self, hwnd: int) -> None:
+        raise SoloLectura(f"ReplayUI es de solo lectura: cerrar(hwnd={hwnd})")
+
+
+def grabaciones(carpeta: Path | str) -> Iterator[Path]:
+    yield from sorted(Path(carpeta).rglob("*.json.gz"))
+
+
+# ==========================================================
+# Benchmark de localizadores sobre grabaciones
+# ==========================================================
+def _localizar(paso: str, ui: ReplayUI) -> Dict[str, Optional[int]]:
+    from robot import Localizadores
+
+    if paso == "busqueda":
+        combo, edit, lupa = Localizadores.busqueda(ui, ui.raiz)
+        return {"combo": combo, "edit": edit, "lupa": lupa}
+    if paso.startswith("grid"):
+        return {"grid": Localizadores.grid(ui, ui.raiz)}
+    if paso == "servicio":
+        _, ctrl = Localizadores.campos_servicio(ui, ui.raiz)
+        return {"no_orden": ctrl.hwnd if ctrl else None}
+    return {}
+
+
+def evaluar(carpeta: Path | str, repeticiones: int = 5) -> Dict[str, dict]:
+    """{paso: {n, aciertos, fallos, ms_prom}} de los localizadores contra cada grabación."""
+    res: Dict[str, dict] = {}
+    for path in grabaciones(carpeta):
+        ui = ReplayUI.desde_archivo(path)
+        paso = ui.datos.get("paso", "")
+        clave = "grid" if paso.startswith("grid") else paso
+        st = res.setdefault(clave, {"n": 0, "aciertos": 0, "fallos": 0, "ms_total": 0.0})
+
+        t0 = time.perf_counter()
+        try:
+            for _ in range(repeticiones):
+                got = _localizar(paso, ui)
+        except SoloLectura as e:
+            # un localizador no debe actuar sobre la UI: en vivo cambiaría lo que mide
+            logger.warning("%s: el localizador intentó actuar sobre la UI: %s", path.name, e)
+            got = {"error": None}
+        except Exception as e:
+            logger.info("%s: el localizador falló: %s", path.name, e)
+            got = {"error": None}
+        st["ms_total"] += (time.perf_counter() - t0) * 1000 / repeticiones
+        if not got:
+            continue
+
+        st["n"] += 1
+        esperados = {k: v for k, v in ui.elegidos.items() if v}
+        if esperados and all(got.get(k) == v for k, v in esperados.items()):
+            st["aciertos"] += 1
+        else:
+            st["fallos"] += 1
+            logger.info("%s: esperado=%s obtenido=%s", path.name, esperados, got)
+
+    for st in res.values():
+        st["ms_prom"] = round(st.pop("ms_total") / st["n"], 3) if st["n"] else 0.0
+    return res
+
+
+def main() -> None:
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(name)s | %(message)s")
+    carpeta = sys.argv[1] if len(sys.argv) > 1 else str(Path(__file__).resolve().parent / "grabaciones")
+    for paso, st in evaluar(carpeta).items():
+        print(f"{paso:>10}: n={st['n']} aciertos={st['aciertos']} fallos={st['fallos']} prom={st['ms_prom']}ms")
+
+
+if __name__ == "__main__":
+    main()
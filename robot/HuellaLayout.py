@@ -0,0 +1,205 @@
+# robot/HuellaLayout.py
+# ==========================================
+# HuellaLayout.py – huella persistente de controles PISCO
+#
+# La primera vez que la heurística (geometría + clase) encuentra un control,
+# se guarda su huella en ./robot/layout_fingerprint.json:
+#   - cadena: [(ctrl_id, clase), ...] desde la ventana raíz hasta el control
+#   - rect relativo al cliente de la raíz (fracciones 0..1: no depende de DPI
+#     ni del tamaño de la ventana)
+#
+# En corridas siguientes se resuelve bajando por GetDlgCtrlID (un hijo por
+# nivel, sin recorrer todo el árbol). Si la verificación falla (no existe,
+# clase distinta, invisible o se movió demasiado) se retorna None: el llamador
+# usa la heurística y vuelve a registrar la huella.
+# ==========================================
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from robot import CacheHwnd
+
+logger = logging.getLogger("Robot62.HuellaLayout")
+
+DEFAULT_HUELLAS_NAME = "layout_fingerprint.json"
+
+# desvío máximo permitido del rect relativo (fracción del cliente de la raíz)
+TOLERANCIA_RECT = 0.15
+
+Paso = Tuple[int, str]  # (ctrl_id, clase)
+RectRel = Tuple[float, float, float, float]
+
+
+def rect_relativo(rect: Sequence[int], cliente: Sequence[int]) -> RectRel:
+    """rect de pantalla -> fracciones del rect cliente (en pantalla) de la raíz."""
+    cl, ct, cr, cb = cliente
+    w = max(1, cr - cl)
+    h = max(1, cb - ct)
+    l, t, r, b = rect
+    return ((l - cl) / w, (t - ct) / h, (r - cl) / w, (b - ct) / h)
+
+
+def rect_parecido(a: Sequence[float], b: Sequence[float], tol: float = TOLERANCIA_RECT) -> bool:
+    return all(abs(x - y) <= tol for x, y in zip(a, b))
+
+
+# ==========================================================
+# Win32 (import diferido: lo puro se usa sin pywin32)
+# ==========================================================
+def _cliente_en_pantalla(hwnd_root: int) -> Tuple[int, int, int, int]:
+    import win32gui
+
+    l, t, r, b = win32gui.GetClientRect(hwnd_root)
+    x0, y0 = win32gui.ClientToScreen(hwnd_root, (l, t))
+    x1, y1 = win32gui.ClientToScreen(hwnd_root, (r, b))
+    return x0, y0, x1, y1
+
+
+def _cadena(hwnd_root: int, hwnd: int) -> Optional[List[Paso]]:
+    """[(ctrl_id, clase)] de la raíz (excluida) al control. None si no desciende de la raíz."""
+    import win32gui
+
+    pasos: List[Paso] = []
+    cur = hwnd
+    for _ in range(32):
+        if not cur:
+            return None
+        if cur == hwnd_root:
+            return list(reversed(pasos))
+        pasos.append((int(CacheHwnd.ctrl_id(cur)), CacheHwnd.clase(cur)))
+        cur = win32gui.GetParent(cur)
+    return None
+
+
+def _hijos_directos(hwnd: int) -> List[int]:
+    """Solo el primer nivel (GW_CHILD + GW_HWNDNEXT), sin enumerar el subárbol."""
+    import win32gui
+
+    GW_HWNDNEXT, GW_CHILD = 2, 5
+    out: List[int] = []
+    try:
+        h = win32gui.GetWindow(hwnd, GW_CHILD)
+        while h:
+            out.append(h)
+            h = win32gui.GetWindow(h, GW_HWNDNEXT)
+    except Exception:
+        pass
+    return out
+
+
+class HuellasLayout:
+    def __init__(self, path: Optional[Path | str] = None):
+        self.path = Path(path) if path else None
+        self._data: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        if self.path and self.path.exists():
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8")) or {}
+            except Exception as e:
+                logger.warning("Huellas de layout ilegibles (%s). Se ignoran: %s", self.path, e)
+                self._data = {}
+
+    def guardar(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(self._data, ensure_ascii=False, indent=1), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def olvidar(self, nombre: str) -> None:
+        if self._data.pop(nombre, None) is not None:
+            self.guardar()
+
+    # -------------------------
+    # Registro / resolución
+    # -------------------------
+    def registrar(self, nombre: str, hwnd_root: int, hwnd: int) -> bool:
+        """Guarda la huella del control `hwnd` (descendiente de `hwnd_root`)."""
+        import win32gui
+
+        try:
+            cadena = _cadena(hwnd_root, hwnd)
+            if not cadena:
+                return False
+            rel = rect_relativo(win32gui.GetWindowRect(hwnd), _cliente_en_pantalla(hwnd_root))
+        except Exception as e:
+            logger.debug("No pude tomar huella de %s: %s", nombre, e)
+            return False
+
+        nuevo = {"cadena": [list(p) for p in cadena], "rect": [round(x, 4) for x in rel]}
+        if self._data.get(nombre) != nuevo:
+            self._data[nombre] = nuevo
+            self.guardar()
+            logger.info("Huella de layout registrada: %s -> %s", nombre, nuevo["cadena"])
+        return True
+
+    def resolver(self, nombre: str, hwnd_root: int) -> Optional[int]:
+        """HWND del control por su huella, o None si no hay huella o no verifica."""
+        import win32gui
+
+        ent = self._data.get(nombre)
+        if not ent:
+            return None
+
+        try:
+            cliente = _cliente_en_pantalla(hwnd_root)
+            cadena = [(int(i), str(c)) for i, c in ent["cadena"]]
+            cur = hwnd_root
+            for n, (ctrl_id, clase) in enumerate(cadena):
+                cands = [
+                    h for h in _hijos_directos(cur)
+                    if CacheHwnd.ctrl_id(h) == ctrl_id and CacheHwnd.clase(h) == clase
+                ]
+                if not cands:
+                    raise LookupError(f"paso {n}: ({ctrl_id}, {clase}) no existe")
+                if len(cands) > 1 and n == len(cadena) - 1:
+                    # ids repetidos (VB6 arrays de controles): el más parecido en posición
+                    cands.sort(key=lambda h: sum(
+                        abs(x - y) for x, y in zip(rect_relativo(win32gui.GetWindowRect(h), cliente), ent["rect"])
+                    ))
+                cur = cands[0]
+
+            if not win32gui.IsWindowVisible(cur):
+                raise LookupError("invisible")
+            rel = rect_relativo(win32gui.GetWindowRect(cur), cliente)
+            if not rect_parecido(rel, ent["rect"]):
+                raise LookupError(f"se movió: {ent['rect']} -> {[round(x, 3) for x in rel]}")
+        except Exception as e:
+            self.fallos += 1
+            logger.info("Huella de layout '%s' no verifica (%s); uso búsqueda heurística.", nombre, e)
+            return None
+
+        self.aciertos += 1
+        return cur
+
+    def resolver_o_buscar(
+        self, nombre: str, hwnd_root: int, buscar: Callable[[], Optional[int]]
+    ) -> Optional[int]:
+        """Huella primero; si falla, `buscar()` (heurística) y se refresca la huella."""
+        h = self.resolver(nombre, hwnd_root)
+        if h:
+            return h
+        h = buscar()
+        if h:
+            self.registrar(nombre, hwnd_root, h)
+        return h
+
+
+_instancia: Optional[HuellasLayout] = None
+
+
+def huellas() -> HuellasLayout:
+    """Instancia compartida: ./robot/layout_fingerprint.json (junto a config.ini)."""
+    global _instancia
+    if _instancia is None:
+        _instancia = HuellasLayout(Path(__file__).resolve().parent / DEFAULT_HUELLAS_NAME)
+    return _instancia
@@ -0,0 +1,187 @@
+# robot/Journal.py
+# ==========================================
+# Journal.py – bitácora append-only por fila
+#
+# Cada línea es un JSON:
+#   {"ts": ..., "rid": "<sha1 fila CSV>", "etapa": "GUARDADO", "datos": {...}}
+#
+# Etapas (en orden):
+#   EXPORTADO -> VALIDADO -> CARGADO -> GUARDADO -> ORDEN_CAPTURADA -> ESCRITO_SHEET
+#
+# Una corrida nueva lee el journal, reconstruye la última etapa de cada fila
+# y salta las etapas que ya se completaron.
+#
+# datos.incierta = la fila se cargó pero no se sabe si PISCO la guardó (lote
+# cortado, o Datos sin CSV): no se vuelve a migrar, se concilia por cédula.
+# ==========================================
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger("Robot62.Journal")
+
+ETAPAS = (
+    "EXPORTADO",
+    "VALIDADO",
+    "CARGADO",
+    "GUARDADO",
+    "ORDEN_CAPTURADA",
+    "ESCRITO_SHEET",
+)
+_ORDEN = {e: i for i, e in enumerate(ETAPAS)}
+
+DEFAULT_JOURNAL_NAME = "journal.jsonl"
+
+# compactar() solo reescribe el archivo si pasó este tamaño
+COMPACTAR_DESDE_BYTES = 4 * 1024 * 1024
+
+
+class Journal:
+    """
+    Journal append-only (JSON Lines) con el estado de cada fila.
+    - Cada escritura hace flush + fsync: si el proceso muere, lo escrito queda.
+    - Una línea truncada al final (kill a mitad de escritura) se ignora al leer.
+    - Las etapas solo avanzan; para volver atrás se usa reiniciar().
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._estado: Dict[str, dict] = {}
+        self._cola_truncada = False
+        self._cargar()
+
+    # -------------------------
+    # Lectura
+    # -------------------------
+    def _cargar(self) -> None:
+        if not self.path.exists():
+            return
+
+        malas = 0
+        with self.path.open("r", encoding="utf-8") as f:
+            for ln in f:
+                # la última línea sin "\n" = escritura interrumpida
+                self._cola_truncada = not ln.endswith("\n")
+                ln = ln.strip()
+                if not ln:
+                    continue
+                try:
+                    ev = json.loads(ln)
+                except ValueError:
+                    malas += 1
+                    continue
+                self._aplicar(ev)
+
+        if malas:
+            logger.warning("Journal: ignoré %s líneas corruptas en %s", malas, self.path)
+
+    def _aplicar(self, ev: dict) -> None:
+        rid = ev.get("rid")
+        etapa = ev.get("etapa")
+        if not rid or etapa not in _ORDEN:
+            return
+
+        if ev.get("reinicio"):
+            self._estado[rid] = {"etapa": etapa, "ts": ev.get("ts"), "datos": dict(ev.get("datos") or {})}
+            return
+
+        cur = self._estado.get(rid)
+        if cur is None or _ORDEN[etapa] >= _ORDEN[cur["etapa"]]:
+            datos = dict(cur["datos"]) if cur else {}
+            datos.update(ev.get("datos") or {})
+            self._estado[rid] = {"etapa": etapa, "ts": ev.get("ts"), "datos": datos}
+
+    def etapa(self, rid: str) -> Optional[str]:
+        cur = self._estado.get(rid)
+        return cur["etapa"] if cur else None
+
+    def alcanzo(self, rid: str, etapa: str) -> bool:
+        """True si la fila ya completó `etapa` (o una posterior)."""
+        cur = self.etapa(rid)
+        return cur is not None and _ORDEN[cur] >= _ORDEN[etapa]
+
+    def datos(self, rid: str) -> dict:
+        cur = self._estado.get(rid)
+        return dict(cur["datos"]) if cur else {}
+
+    # -------------------------
+    # Escritura
+    # -------------------------
+    def _append(self, eventos: list[dict]) -> None:
+        if not eventos:
+            return
+        with self.path.open("a", encoding="utf-8") as f:
+            if self._cola_truncada:
+                f.write("\n")
+                self._cola_truncada = False
+            for ev in eventos:
+                f.write(json.dumps(ev, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        for ev in eventos:
+            self._aplicar(ev)
+
+    def registrar(self, rid: str, etapa: str, **datos) -> None:
+        self.registrar_muchos([rid], etapa, **datos)
+
+    def registrar_muchos(self, rids: Iterable[str], etapa: str, **datos) -> None:
+        """Registra la misma etapa para varias filas con un solo fsync."""
+        if etapa not in _ORDEN:
+            raise ValueError(f"Etapa desconocida: {etapa}")
+        ts = time.time()
+        eventos = []
+        for rid in rids:
+            if self.alcanzo(rid, etapa) and not datos:
+                continue
+            eventos.append({"ts": ts, "rid": rid, "etapa": etapa, "datos": datos})
+        self._append(eventos)
+
+    def reiniciar(self, rid: str, etapa: str = "EXPORTADO") -> None:
+        """Fuerza la etapa de la fila (ej: la fila volvió a 'Pendiente' en la hoja)."""
+        self._append([{"ts": time.time(), "rid": rid, "etapa": etapa, "datos": {}, "reinicio": True}])
+
+    def compactar(self, desde_bytes: int = COMPACTAR_DESDE_BYTES) -> int:
+        """
+        Si el archivo pasa `desde_bytes`, lo reescribe con una línea por fila
+        (estado actual) y descarta las filas que ya llegaron a ESCRITO_SHEET.
+        Retorna cuántas filas tienen trabajo pendiente.
+        """
+        vivos = {rid: st for rid, st in self._estado.items() if st["etapa"] != "ESCRITO_SHEET"}
+        try:
+            tam = self.path.stat().st_size
+        except OSError:
+            tam = 0
+        if tam < desde_bytes:
+            return len(vivos)
+
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for rid, st in vivos.items():
+                ev = {"ts": st["ts"], "rid": rid, "etapa": st["etapa"], "datos": st["datos"], "reinicio": True}
+                f.write(json.dumps(ev, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        logger.info("Journal compactado: %s KB -> %s filas vivas", tam // 1024, len(vivos))
+
+        self._estado = vivos
+        self._cola_truncada = False
+        return len(vivos)
+
+    def resumen(self) -> Dict[str, int]:
+        out = {e: 0 for e in ETAPAS}
+        for st in self._estado.values():
+            out[st["etapa"]] += 1
+        return out
+
+
+def abrir_journal(base_dir: Path | str) -> Journal:
+    """Abre (o crea) ./robot/estado/journal.jsonl"""
+    return Journal(Path(base_dir) / "estado" / DEFAULT_JOURNAL_NAME)
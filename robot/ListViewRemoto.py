@@ -0,0 +1,311 @@
+# robot/ListViewRemoto.py
+# ==========================================
+# ListViewRemoto.py – lectura masiva de un SysListView32 de OTRO proceso
+#
+# LVM_GETITEMTEXTW necesita un LVITEMW + buffer que el control (proceso PISCO)
+# pueda escribir. Un puntero a memoria de Python no le sirve: por eso antes
+# todo terminaba en el fallback de portapapeles.
+#
+# Aquí se reserva UNA región en el proceso destino (VirtualAllocEx) con un
+# bloque de LVITEMs + slots de texto:
+#   1 WriteProcessMemory (todos los LVITEM del bloque)
+#   N LVM_GETITEMTEXTW (uno por celda, lo exige el control; con timeout vía Mensajes)
+#   1 ReadProcessMemory (todos los textos del bloque)
+#
+# El armado filas x columnas y la decodificación UTF-16 no dependen de Win32:
+# leer_tabla() trabaja contra la interfaz LectorListView, con FakeListView
+# para probarlo en Linux.
+# ==========================================
+
+from __future__ import annotations
+
+import ctypes
+import logging
+import struct
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+from robot import Mensajes
+
+logger = logging.getLogger("Robot62.ListViewRemoto")
+
+# caracteres por slot de texto (incluye el NUL final)
+CCH_CELDA = 260
+# celdas por ida y vuelta (WriteProcessMemory/ReadProcessMemory)
+CELDAS_POR_BLOQUE = 512
+# una celda que llenó el slot se relee con un slot más grande
+CCH_RELECTURA = 4096
+
+Celda = Tuple[int, int]  # (fila, columna)
+
+
+# ==========================================================
+# Interfaz + lógica pura
+# ==========================================================
+class LectorListView(ABC):
+    """
+    Acceso crudo a un ListView. Los textos vuelven como UTF-16LE en slots de
+    `cch` caracteres (igual que en la memoria del proceso destino) más la
+    longitud que informó el control por slot (-1 = desconocida, cortar en NUL).
+    """
+
+    @abstractmethod
+    def dimensiones(self) -> Tuple[int, int]:
+        """(filas, columnas)"""
+
+    @abstractmethod
+    def leer_bloque(self, celdas: Sequence[Celda], cch: int) -> Tuple[bytes, List[int]]:
+        """Textos de `celdas` en slots de `cch` caracteres + longitud por slot."""
+
+    @abstractmethod
+    def leer_cabeceras(self, n_cols: int, cch: int) -> Tuple[bytes, List[int]]:
+        """Textos de las `n_cols` cabeceras (longitud -1: cortar en NUL)."""
+
+    def cerrar(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def decodificar_slots(raw: bytes, longitudes: Sequence[int], cch: int) -> List[str]:
+    """Corta cada slot UTF-16LE por su longitud (o en el primer NUL) y lo decodifica."""
+    ancho = cch * 2
+    out: List[str] = []
+    for i, n in enumerate(longitudes):
+        slot = raw[i * ancho:(i + 1) * ancho]
+        if 0 <= n < cch:
+            slot = slot[: n * 2]
+        else:
+            for j in range(0, len(slot) - 1, 2):
+                if slot[j] == 0 and slot[j + 1] == 0:
+                    slot = slot[:j]
+                    break
+        out.append(slot.decode("utf-16-le", errors="replace").strip())
+    return out
+
+
+def leer_tabla(
+    lector: LectorListView,
+    cch: int = CCH_CELDA,
+    bloque: int = CELDAS_POR_BLOQUE,
+    cabeceras: bool = True,
+) -> Tuple[List[str], List[List[str]]]:
+    """Lee todo el ListView. Retorna (cabeceras, filas)."""
+    n_filas, n_cols = lector.dimensiones()
+    if n_filas <= 0 or n_cols <= 0:
+        return [], []
+
+    headers: List[str] = []
+    if cabeceras:
+        raw, lons = lector.leer_cabeceras(n_cols, cch)
+        headers = decodificar_slots(raw, lons, cch)
+
+    celdas = [(r, c) for r in range(n_filas) for c in range(n_cols)]
+    textos: List[str] = []
+    truncadas: List[int] = []
+
+    for ini in range(0, len(celdas), bloque):
+        parte = celdas[ini:ini + bloque]
+        raw, lons = lector.leer_bloque(parte, cch)
+        textos.extend(decodificar_slots(raw, lons, cch))
+        truncadas.extend(ini + k for k, n in enumerate(lons) if n >= cch - 1)
+
+    if truncadas and cch < CCH_RELECTURA:
+        for ini in range(0, len(truncadas), bloque):
+            idxs = truncadas[ini:ini + bloque]
+            raw, lons = lector.leer_bloque([celdas[i] for i in idxs], CCH_RELECTURA)
+            for i, txt in zip(idxs, decodificar_slots(raw, lons, CCH_RELECTURA)):
+                textos[i] = txt
+
+    filas = [textos[r * n_cols:(r + 1) * n_cols] for r in range(n_filas)]
+    return headers, filas
+
+
+class FakeListView(LectorListView):
+    """ListView en memoria con el mismo contrato que el remoto (slots UTF-16, truncado a cch-1)."""
+
+    def __init__(self, filas: Sequence[Sequence[str]], cabeceras: Optional[Sequence[str]] = None):
+        self.filas = [list(r) for r in filas]
+        n_cols = max((len(r) for r in self.filas), default=len(cabeceras or []))
+        self.cabeceras = list(cabeceras or [""] * n_cols)
+        self.idas_y_vueltas = 0
+
+    def dimensiones(self) -> Tuple[int, int]:
+        return len(self.filas), len(self.cabeceras)
+
+    @staticmethod
+    def _slots(textos: Sequence[str], cch: int) -> Tuple[bytes, List[int]]:
+        raw = bytearray()
+        lons: List[int] = []
+        for t in textos:
+            t = t[: cch - 1]
+            enc = t.encode("utf-16-le")
+            raw += enc + b"\x00" * (cch * 2 - len(enc))
+            lons.append(len(t))
+        return bytes(raw), lons
+
+    def leer_bloque(self, celdas: Sequence[Celda], cch: int) -> Tuple[bytes, List[int]]:
+        self.idas_y_vueltas += 1
+        textos = [self.filas[r][c] if c < len(self.filas[r]) else "" for r, c in celdas]
+        return self._slots(textos, cch)
+
+    def leer_cabeceras(self, n_cols: int, cch: int) -> Tuple[bytes, List[int]]:
+        raw, _ = self._slots(self.cabeceras[:n_cols], cch)
+        return raw, [-1] * n_cols  # LVM_GETCOLUMNW no informa longitud
+
+
+# ==========================================================
+# Implementación Win32 (memoria en el proceso destino)
+# ==========================================================
+LVM_FIRST = 0x1000
+LVM_GETITEMCOUNT = LVM_FIRST + 4
+LVM_GETHEADER = LVM_FIRST + 31
+LVM_GETCOLUMNW = LVM_FIRST + 95
+LVM_GETITEMTEXTW = LVM_FIRST + 115
+HDM_GETITEMCOUNT = 0x1200
+
+LVIF_TEXT = 0x0001
+LVCF_TEXT = 0x0004
+
+PROCESS_VM_OPERATION = 0x0008
+PROCESS_VM_READ = 0x0010
+PROCESS_VM_WRITE = 0x0020
+PROCESS_QUERY_INFORMATION = 0x0400
+MEM_COMMIT = 0x1000
+MEM_RESERVE = 0x2000
+MEM_RELEASE = 0x8000
+PAGE_READWRITE = 0x04
+
+# LVITEMW / LVCOLUMNW según bitness del proceso DESTINO (PISCO VB6 = 32 bits)
+_LVITEM = {32: struct.Struct("<IiiIIIiii"), 64: struct.Struct("<IiiII4xQiiq")}
+_LVCOLUMN = {32: struct.Struct("<IiiIiiii"), 64: struct.Struct("<Iii4xQiiii")}
+# espacio por estructura (holgura para versiones de comctl con campos extra)
+_SLOT_ESTRUCTURA = 96
+
+
+class ListViewRemoto(LectorListView):
+    def __init__(self, hwnd: int):
+        from ctypes import wintypes
+
+        self.hwnd = hwnd
+        self._u32 = ctypes.WinDLL("user32", use_last_error=True)
+        self._k32 = k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+        k32.OpenProcess.restype = wintypes.HANDLE
+        k32.VirtualAllocEx.restype = ctypes.c_void_p
+        k32.VirtualAllocEx.argtypes = [wintypes.HANDLE, ctypes.c_void_p, ctypes.c_size_t, wintypes.DWORD, wintypes.DWORD]
+        k32.VirtualFreeEx.argtypes = [wintypes.HANDLE, ctypes.c_void_p, ctypes.c_size_t, wintypes.DWORD]
+        k32.WriteProcessMemory.argtypes = [
+            wintypes.HANDLE, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t)
+        ]
+        k32.ReadProcessMemory.argtypes = [
+            wintypes.HANDLE, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t)
+        ]
+
+        pid = wintypes.DWORD()
+        self._u32.GetWindowThreadProcessId(wintypes.HWND(hwnd), ctypes.byref(pid))
+        acceso = PROCESS_VM_OPERATION | PROCESS_VM_READ | PROCESS_VM_WRITE | PROCESS_QUERY_INFORMATION
+        self._hproc = k32.OpenProcess(acceso, False, pid.value)
+        if not self._hproc:
+            raise OSError(ctypes.get_last_error(), f"OpenProcess falló (pid={pid.value})")
+
+        self.bits = self._bits_destino()
+        self._mem: Optional[int] = None
+        self._mem_size = 0
+
+    def _bits_destino(self) -> int:
+        from ctypes import wintypes
+
+        def wow64(h) -> bool:
+            v = wintypes.BOOL()
+            return bool(self._k32.IsWow64Process(h, ctypes.byref(v))) and bool(v.value)
+
+        if wow64(self._hproc):
+            return 32
+        so_64 = struct.calcsize("P") == 8 or wow64(self._k32.GetCurrentProcess())
+        return 64 if so_64 else 32
+
+    # -------------------------
+    # Memoria remota
+    # -------------------------
+    def _reservar(self, size: int) -> int:
+        if self._mem and self._mem_size >= size:
+            return self._mem
+        self._liberar()
+        mem = self._k32.VirtualAllocEx(self._hproc, None, size, MEM_COMMIT | MEM_RESERVE, PAGE_READWRITE)
+        if not mem:
+            raise OSError(ctypes.get_last_error(), "VirtualAllocEx falló")
+        self._mem, self._mem_size = mem, size
+        return mem
+
+    def _liberar(self) -> None:
+        if self._mem:
+            self._k32.VirtualFreeEx(self._hproc, self._mem, 0, MEM_RELEASE)
+        self._mem, self._mem_size = None, 0
+
+    def _escribir(self, addr: int, data: bytes) -> None:
+        n = ctypes.c_size_t()
+        if not self._k32.WriteProcessMemory(self._hproc, addr, data, len(data), ctypes.byref(n)):
+            raise OSError(ctypes.get_last_error(), "WriteProcessMemory falló")
+
+    def _leer(self, addr: int, size: int) -> bytes:
+        buf = ctypes.create_string_buffer(size)
+        n = ctypes.c_size_t()
+        if not self._k32.ReadProcessMemory(self._hproc, addr, buf, size, ctypes.byref(n)):
+            raise OSError(ctypes.get_last_error(), "ReadProcessMemory falló")
+        return buf.raw[: n.value]
+
+    def _ronda(self, pedidos: Sequence[Tuple[int, int, int]], cch: int, columna: bool) -> Tuple[bytes, List[int]]:
+        """
+        pedidos: (wParam, iItem, iSubItem). Layout remoto:
+        [estructura_0 .. estructura_n-1][texto_0 .. texto_n-1]
+        """
+        n = len(pedidos)
+        if not n:
+            return b"", []
+        ancho = cch * 2
+        base = self._reservar(n * (_SLOT_ESTRUCTURA + ancho))
+        textos = base + n * _SLOT_ESTRUCTURA
+
+        estructuras = bytearray(n * _SLOT_ESTRUCTURA)
+        for k, (_, item, sub) in enumerate(pedidos):
+            psz = textos + k * ancho
+            if columna:
+                st = _LVCOLUMN[self.bits].pack(LVCF_TEXT, 0, 0, psz, cch, sub, 0, 0)
+            else:
+                st = _LVITEM[self.bits].pack(LVIF_TEXT, item, sub, 0, 0, psz, cch, 0, 0)
+            estructuras[k * _SLOT_ESTRUCTURA:k * _SLOT_ESTRUCTURA + len(st)] = st
+        self._escribir(base, bytes(estructuras))
+
+        msg = LVM_GETCOLUMNW if columna else LVM_GETITEMTEXTW
+        lons: List[int] = []
+        for k, (wparam, _, _) in enumerate(pedidos):
+            r = Mensajes.enviar(self.hwnd, msg, wparam, base + k * _SLOT_ESTRUCTURA)
+            lons.append(-1 if columna else int(r))
+
+        return self._leer(textos, n * ancho), lons
+
+    # -------------------------
+    # Interfaz
+    # -------------------------
+    def dimensiones(self) -> Tuple[int, int]:
+        filas = Mensajes.enviar(self.hwnd, LVM_GETITEMCOUNT)
+        hdr = Mensajes.enviar(self.hwnd, LVM_GETHEADER)
+        cols = Mensajes.enviar(hdr, HDM_GETITEMCOUNT) if hdr else 0
+        return max(filas, 0), max(cols, 0)
+
+    def leer_bloque(self, celdas: Sequence[Celda], cch: int) -> Tuple[bytes, List[int]]:
+        return self._ronda([(r, r, c) for r, c in celdas], cch, columna=False)
+
+    def leer_cabeceras(self, n_cols: int, cch: int) -> Tuple[bytes, List[int]]:
+        return self._ronda([(c, 0, c) for c in range(n_cols)], cch, columna=True)
+
+    def cerrar(self) -> None:
+        self._liberar()
+        if self._hproc:
+            self._k32.CloseHandle(self._hproc)
+            self._hproc = None
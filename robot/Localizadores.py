@@ -0,0 +1,178 @@
+# robot/Localizadores.py
+# ==========================================
+# Localizadores.py – heurísticas para ubicar controles de PISCO
+#
+# Consultas declarativas (Selectores) sobre UIDriver, sin win32gui directo:
+# la misma función corre contra PISCO real (Win32UI), el simulador o una
+# grabación (Grabador.ReplayUI), así se pueden medir velocidad y aciertos en
+# Linux con layouts reales.
+#
+#   busqueda(ui, main)         -> (combo, edit, lupa) de la barra de búsqueda
+#   grid(ui, root)             -> grid real (ListView/FlexGrid) de la ventana
+#   campos_servicio(ui, root)  -> ({label: valor}, control "No Orden Servicio")
+#   contrato(ui, root)         -> "Contrato Nro" de Control de Llamadas
+#   boton_vb6(ui, root, texto) -> CommandButton visible y habilitado
+#   columnas_ordenes(...)      -> columnas cédula / orden / contrato de un grid leído
+# ==========================================
+
+from __future__ import annotations
+
+import re
+import shlex
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from robot import Columnas, Formulario, Selectores
+from robot.CedulaCache import normalizar_cedula
+from robot.Formulario import Control
+from robot.UIDriver import UIDriver
+
+PAT_ORDEN = re.compile(r"^\d{2}-\d{3,5}-\d{2}$")  # ej: 05-0791-26
+
+CLASES_COMBO = ("ComboBox", "ComboBoxEx32", "ThunderRT6ComboBox", "ThunderComboBox")
+CLASES_EDIT = ("Edit", "ThunderRT6TextBox")
+CLASES_LUPA = ("Button", "Static", "ToolbarWindow32", "ThunderRT6PictureBox", "ThunderRT6CommandButton")
+
+GRID_CLASS_CANDIDATES = {
+    # ListView / grids comunes
+    "SysListView32",
+    "MSFlexGridWndClass",
+    "MshFlexGridWndClass",      # a veces
+    "VSFlexGridWndClass",
+    "VtListView",               # algunos terceros
+    "TDBGrid",                  # algunos terceros
+    # VB6 containers que pueden envolver otros
+    "ThunderRT6UserControlDC",
+    "ThunderRT6PictureBox",
+}
+
+# franja superior del main donde está la barra (edit + combo + lupa)
+MARGEN_BARRA = 220
+
+BUSQUEDA = f"""
+combo = {"|".join(CLASES_COMBO)} ancho>=120 alto>=18 franja<={MARGEN_BARRA} mayor:ancho
+edit  = {"|".join(CLASES_EDIT)} ancho>=80 alto>=18 franja<={MARGEN_BARRA} izquierda-de:combo peso-y=3
+lupa  = {"|".join(CLASES_LUPA)} ancho<=60 alto<=60 franja<={MARGEN_BARRA} junto-a:combo
+"""
+
+CONTRATO = f"""
+nro = @campo derecha-de:"contrato nro" misma-fila<={Formulario.DY_MAX} peso-y=4
+"""
+POR_PATRON_ORDEN = f"x = @campo valor~{shlex.quote(PAT_ORDEN.pattern)}"
+
+GRID = f"""
+grid    = {"|".join(sorted(GRID_CLASS_CANDIDATES))}|ATL:* oculto mayor:area
+interno = {"|".join(sorted(GRID_CLASS_CANDIDATES))} oculto dentro-de:grid mayor:area
+"""
+
+
+# ==========================================================
+# Barra de búsqueda
+# ==========================================================
+def busqueda(ui: UIDriver, main: int) -> Tuple[int, int, Optional[int]]:
+    """
+    (combo, edit, lupa) por geometría en la franja superior del main: combo
+    más ancho, edit a su izquierda en la misma fila, lupa pegada a su derecha.
+    RuntimeError si no hay combo o edit alineado.
+    """
+    r = Selectores.localizar(ui, main, BUSQUEDA)
+    if not r["combo"]:
+        raise RuntimeError("No encontré ningún Combo en la barra superior.")
+    if not r["edit"]:
+        raise RuntimeError("Encontré Combo, pero no hallé Edit candidato alineado a su izquierda.")
+    return r["combo"], r["edit"], r["lupa"]
+
+
+# ==========================================================
+# Grid
+# ==========================================================
+def grid(ui: UIDriver, root: int) -> Optional[int]:
+    """
+    El candidato a grid más grande del árbol. Si resulta ser un wrapper
+    ATL:xxxx, el mejor candidato real entre sus descendientes.
+    """
+    r = Selectores.localizar(ui, root, GRID)
+    best = r["grid"]
+    if best and r["interno"] and ui.clase(best).startswith("ATL:"):
+        return r["interno"]
+    return best
+
+
+# ==========================================================
+# Registro de servicio
+# ==========================================================
+def campos_servicio(ui: UIDriver, root: int) -> Tuple[Dict[str, str], Optional[Control]]:
+    """
+    Una pasada (Formulario.foto): {label normalizado: valor} y el control de
+    'No Orden Servicio' (por label, o el primer campo con patrón de orden).
+    """
+    controles = Formulario.foto(root, ui)
+    pares = Formulario.emparejar_controles(controles)
+    campos = {k: c.texto for k, c in pares.items()}
+
+    ctrl = next((c for k, c in pares.items() if "orden servicio" in k and c.texto), None)
+    if ctrl is None:
+        ctrl = next((c for c in controles if c.es_campo and PAT_ORDEN.match(c.texto)), None)
+        if ctrl is not None:
+            campos["no orden servicio"] = ctrl.texto
+    return campos, ctrl
+
+
+# ==========================================================
+# Control de Llamadas / botones VB6
+# ==========================================================
+def contrato(ui: UIDriver, root: int) -> Optional[str]:
+    """'Contrato Nro:' (campo a la derecha del label); si está vacío, el primer campo con patrón de orden."""
+    h = Selectores.localizar(ui, root, CONTRATO)["nro"]
+    v = Formulario._texto(h, ui) if h else ""
+    if v:
+        return v
+    h = Selectores.localizar(ui, root, POR_PATRON_ORDEN)["x"]
+    return Formulario._texto(h, ui) if h else None
+
+
+def boton_vb6(ui: UIDriver, root: int, texto: str) -> Optional[int]:
+    """ThunderRT6CommandButton con texto exacto (sin mayúsculas), visible y habilitado."""
+    return Selectores.uno(ui, root, f"ThunderRT6CommandButton texto={shlex.quote(texto)} habilitado")
+
+
+# ==========================================================
+# Columnas de un grid de servicios (Migración / listado mensual)
+# ==========================================================
+def columnas_ordenes(headers: List[str], filas: List[List[str]], cedulas: Iterable[str]) -> Dict[str, int]:
+    """
+    Ubica columnas cedula / no_orden / contrato:
+    1) por nombre de cabecera (si el grid las expone); la cédula solo si es
+       la del fallecido (cedula/identific/documento + fallec)
+    2) por contenido: cédula = más coincidencias con `cedulas`; orden = más valores 05-0791-26
+    """
+    cols: Dict[str, int] = {}
+    for j, h in enumerate(headers):
+        nh = Columnas.normalizar(h)
+        if "orden" in nh and "no_orden" not in cols:
+            cols["no_orden"] = j
+        elif "contrato" in nh and "contrato" not in cols:
+            cols["contrato"] = j
+        elif ("cedula" in nh or "identific" in nh or "documento" in nh) and "fallec" in nh:
+            cols.setdefault("cedula", j)
+
+    if filas and ("cedula" not in cols or "no_orden" not in cols):
+        objetivo = {normalizar_cedula(c) for c in cedulas if normalizar_cedula(c)}
+        n_cols = max(len(f) for f in filas)
+        hits_ced = [0] * n_cols
+        hits_ord = [0] * n_cols
+        for f in filas:
+            for j, v in enumerate(f):
+                v = (v or "").strip()
+                if normalizar_cedula(v) in objetivo:
+                    hits_ced[j] += 1
+                if PAT_ORDEN.match(v):
+                    hits_ord[j] += 1
+
+        if "cedula" not in cols and max(hits_ced, default=0) > 0:
+            cols["cedula"] = max(range(n_cols), key=lambda j: hits_ced[j])
+        if "no_orden" not in cols:
+            libres = [j for j in range(n_cols) if j != cols.get("contrato") and j != cols.get("cedula")]
+            if libres and max(hits_ord[j] for j in libres) > 0:
+                cols["no_orden"] = max(libres, key=lambda j: hits_ord[j])
+
+    return cols
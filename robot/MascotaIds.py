@@ -0,0 +1,196 @@
+# robot/MascotaIds.py
+# ==========================================
+# MascotaIds.py – asignador persistente de IDs M0000..M9999
+#
+# - Primer intento determinístico: hash SHA-256 de la fila (igual que antes).
+# - Si está ocupado: siguiente libre hacia adelante (circular) con un
+#   "union-find" de siguiente-libre => O(1) amortizado por asignación.
+# - Se siembra con los M#### que ya existen en la hoja y con los reservados
+#   en corridas anteriores (./robot/estado/mascota_ids.json).
+#
+# Un ID se "reserva" antes de que su fila entre a PISCO (main, antes de cada
+# lote) y se "libera" si la fila no llegó a GUARDADO (ni quedó incierta).
+# Al exportar (abrir_allocator(..., liberar_provisionales=True)) los IDs
+# asignados que no quedaron reservados vuelven a estar libres: sin esto el
+# espacio de 10000 se agota con filas que nunca llegaron a PISCO.
+# La misma fila (misma clave) reutiliza su ID mientras siga en el archivo.
+# ==========================================
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+logger = logging.getLogger("Robot62.MascotaIds")
+
+ESPACIO = 10000
+PATRON_ID = re.compile(r"^M(\d{4})$")
+DEFAULT_IDS_NAME = "mascota_ids.json"
+
+# avisar cuando el espacio de IDs pase este % de uso
+UMBRAL_AVISO = 0.80
+
+
+def _norm(x: str) -> str:
+    return (x or "").strip()
+
+
+def id_preferido(row_values, salt: str = "PISCO") -> int:
+    """Número 0..9999 derivado del hash de la fila (primer intento)."""
+    base = "|".join([_norm(x) for x in row_values])
+    h = hashlib.sha256((salt + "|" + base).encode("utf-8")).hexdigest()
+    return int(h[:8], 16) % ESPACIO
+
+
+def clave_fila(row_values) -> str:
+    return hashlib.sha1("|".join([_norm(x) for x in row_values]).encode("utf-8")).hexdigest()
+
+
+class MascotaIdAllocator:
+    def __init__(
+        self, path: Optional[Path | str] = None, salt: str = "PISCO", liberar_provisionales: bool = False
+    ):
+        """
+        liberar_provisionales: descarta los IDs asignados en corridas anteriores
+        que no quedaron reservados (su fila nunca llegó a PISCO).
+        """
+        self.path = Path(path) if path else None
+        self.salt = salt
+        self._usado = bytearray(ESPACIO)
+        # _sig[i] -> candidato a "siguiente libre >= i"; ESPACIO = centinela (fin)
+        self._sig = list(range(ESPACIO + 1))
+        self._asignados: Dict[str, str] = {}
+        self._reservados: Set[str] = set()
+        self.usados = 0
+        self.liberados = 0
+
+        if self.path and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8")) or {}
+            except Exception as e:
+                logger.warning("No pude leer %s (%s). Arranco vacío.", self.path, e)
+                data = {}
+            self._asignados = dict(data.get("asignados") or {})
+            if "reservados" in data:
+                self._reservados = set(data.get("reservados") or [])
+            else:
+                # archivo de antes de las reservas: no se sabe cuáles llegaron a PISCO
+                self._reservados = set(self._asignados.values())
+            if liberar_provisionales:
+                antes = len(self._asignados)
+                self._asignados = {k: v for k, v in self._asignados.items() if v in self._reservados}
+                self.liberados = antes - len(self._asignados)
+            self.sembrar(self._reservados)
+            self.sembrar(self._asignados.values())
+
+    # -------------------------
+    # Bitmap + siguiente libre
+    # -------------------------
+    def _find(self, i: int) -> int:
+        raiz = i
+        while self._sig[raiz] != raiz:
+            raiz = self._sig[raiz]
+        # compresión de camino
+        while self._sig[i] != raiz:
+            self._sig[i], i = raiz, self._sig[i]
+        return raiz
+
+    def _marcar(self, n: int) -> None:
+        if self._usado[n]:
+            return
+        self._usado[n] = 1
+        self._sig[n] = n + 1
+        self.usados += 1
+
+    def sembrar(self, valores: Iterable[str]) -> int:
+        """Marca como usados los valores con forma M####. Retorna cuántos nuevos marcó."""
+        antes = self.usados
+        for v in valores:
+            m = PATRON_ID.match(_norm(v).upper())
+            if m:
+                self._marcar(int(m.group(1)))
+        return self.usados - antes
+
+    def esta_usado(self, mid: str) -> bool:
+        m = PATRON_ID.match(_norm(mid).upper())
+        return bool(m) and bool(self._usado[int(m.group(1))])
+
+    # -------------------------
+    # API
+    # -------------------------
+    def asignar(self, row_values) -> str:
+        """
+        Retorna el M#### de la fila. Si la fila ya tenía uno (corrida anterior)
+        se reutiliza; si no, hash -> siguiente libre circular.
+        """
+        clave = clave_fila(row_values)
+        previo = self._asignados.get(clave)
+        if previo:
+            return previo
+
+        if self.usados >= ESPACIO:
+            raise RuntimeError("No hay IDs disponibles M0000..M9999 (se agotaron).")
+
+        n = self._find(id_preferido(row_values, self.salt))
+        if n == ESPACIO:
+            n = self._find(0)
+
+        self._marcar(n)
+        mid = f"M{n:04d}"
+        self._asignados[clave] = mid
+        return mid
+
+    def reservar(self, valores: Iterable[str]) -> int:
+        """Marca como reservados (su fila va a PISCO) los M#### de valores. Retorna cuántos nuevos."""
+        antes = len(self._reservados)
+        for v in valores:
+            mid = _norm(v).upper()
+            if PATRON_ID.match(mid):
+                self._marcar(int(mid[1:]))
+                self._reservados.add(mid)
+        return len(self._reservados) - antes
+
+    def liberar(self, valores: Iterable[str]) -> int:
+        """
+        Quita la reserva (la fila no llegó a PISCO). El ID sigue ocupado en
+        esta instancia; queda libre al abrir con liberar_provisionales=True.
+        """
+        antes = len(self._reservados)
+        for v in valores:
+            self._reservados.discard(_norm(v).upper())
+        return antes - len(self._reservados)
+
+    def ocupacion(self) -> float:
+        return self.usados / ESPACIO
+
+    def reportar(self) -> None:
+        occ = self.ocupacion()
+        nivel = logging.WARNING if occ >= UMBRAL_AVISO else logging.INFO
+        logger.log(
+            nivel, "IDs mascota: usados=%s/%s (%.1f%%) | liberados=%s", self.usados, ESPACIO, occ * 100, self.liberados
+        )
+
+    def guardar(self) -> None:
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"asignados": self._asignados, "reservados": sorted(self._reservados)}, ensure_ascii=False, indent=1
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+
+def abrir_allocator(base_dir: Path | str, liberar_provisionales: bool = False) -> MascotaIdAllocator:
+    """Abre (o crea) ./robot/estado/mascota_ids.json"""
+    return MascotaIdAllocator(
+        Path(base_dir) / "estado" / DEFAULT_IDS_NAME, liberar_provisionales=liberar_provisionales
+    )
@@ -0,0 +1,220 @@
+# robot/Mensajes.py
+# ==========================================
+# Mensajes.py – SendMessage a PISCO con timeout (nunca bloquear el robot)
+#
+# Un SendMessage normal a una ventana de PISCO colgado no vuelve nunca: ni
+# los timeouts de los loops ni el finally de main.py llegan a ejecutarse.
+# Aquí todo pasa por SendMessageTimeoutW + SMTO_ABORTIFHUNG:
+#   - timeout o ventana colgada -> PiscoHung (error tipado)
+#   - HWND inválido -> 0 (como SendMessage)
+#   - latencia por mensaje (n, total, máx, timeouts) para el log de cierre
+#
+# Config opcional (config.ini):
+#   [mensajes]
+#   timeout_ms = 5000
+# ==========================================
+
+from __future__ import annotations
+
+import configparser
+import ctypes
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger("Robot62.Mensajes")
+
+TIMEOUT_MS_DEFAULT = 5000
+
+SMTO_NORMAL = 0x0000
+SMTO_ABORTIFHUNG = 0x0002
+ERROR_TIMEOUT = 1460
+ERROR_INVALID_WINDOW_HANDLE = 1400
+
+WM_NULL = 0x0000
+WM_GETTEXT = 0x000D
+WM_GETTEXTLENGTH = 0x000E
+
+# nombres para el resumen de latencias (el resto se muestra en hex)
+_NOMBRES = {
+    0x0000: "WM_NULL",
+    0x000C: "WM_SETTEXT",
+    0x000D: "WM_GETTEXT",
+    0x000E: "WM_GETTEXTLENGTH",
+    0x0111: "WM_COMMAND",
+    0x0146: "CB_GETCOUNT",
+    0x0147: "CB_GETCURSEL",
+    0x0148: "CB_GETLBTEXT",
+    0x0149: "CB_GETLBTEXTLEN",
+    0x014E: "CB_SETCURSEL",
+    0x014F: "CB_SHOWDROPDOWN",
+    0x0189: "LB_GETTEXT",
+    0x018A: "LB_GETTEXTLEN",
+    0x018B: "LB_GETCOUNT",
+    0x1004: "LVM_GETITEMCOUNT",
+    0x100C: "LVM_GETNEXTITEM",
+    0x101F: "LVM_GETHEADER",
+    0x1027: "LVM_GETTOPINDEX",
+    0x105F: "LVM_GETCOLUMNW",
+    0x1073: "LVM_GETITEMTEXTW",
+    0x1200: "HDM_GETITEMCOUNT",
+}
+
+_timeout_ms = TIMEOUT_MS_DEFAULT
+
+
+class PiscoHung(RuntimeError):
+    """PISCO no respondió un mensaje dentro del timeout (o Windows lo marcó colgado)."""
+
+    def __init__(self, hwnd: int, msg: int, timeout_ms: int):
+        self.hwnd = hwnd
+        self.msg = msg
+        self.timeout_ms = timeout_ms
+        super().__init__(f"PISCO no responde: {nombre_mensaje(msg)} a hwnd={hwnd} (timeout={timeout_ms}ms)")
+
+
+def nombre_mensaje(msg: int) -> str:
+    return _NOMBRES.get(msg, f"0x{msg:04X}")
+
+
+def configurar(config_path: Path | str) -> None:
+    """Lee [mensajes] timeout_ms de config.ini (si existe)."""
+    global _timeout_ms
+    cp = configparser.ConfigParser()
+    cp.read(str(config_path), encoding="utf-8")
+    _timeout_ms = max(100, cp.getint("mensajes", "timeout_ms", fallback=TIMEOUT_MS_DEFAULT))
+
+
+# ==========================================================
+# Estadísticas de latencia
+# ==========================================================
+class _Latencias:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_msg: Dict[int, list] = {}  # msg -> [n, total_s, max_s, timeouts]
+
+    def anotar(self, msg: int, dt: float, timeout: bool = False) -> None:
+        with self._lock:
+            st = self._por_msg.setdefault(msg, [0, 0.0, 0.0, 0])
+            st[0] += 1
+            st[1] += dt
+            st[2] = max(st[2], dt)
+            st[3] += int(timeout)
+
+    def resumen(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                nombre_mensaje(m): {
+                    "n": n,
+                    "prom_ms": round(tot * 1000 / n, 2) if n else 0.0,
+                    "max_ms": round(mx * 1000, 2),
+                    "timeouts": to,
+                }
+                for m, (n, tot, mx, to) in sorted(self._por_msg.items(), key=lambda kv: -kv[1][1])
+            }
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._por_msg.clear()
+
+
+latencias = _Latencias()
+
+
+def log_latencias(top: int = 8) -> None:
+    res = latencias.resumen()
+    if not res:
+        return
+    for nombre, st in list(res.items())[:top]:
+        logger.info(
+            "Mensajes %s: n=%s prom=%sms máx=%sms timeouts=%s",
+            nombre, st["n"], st["prom_ms"], st["max_ms"], st["timeouts"],
+        )
+
+
+# ==========================================================
+# Envío
+# ==========================================================
+_user32 = None
+
+
+def _api():
+    global _user32
+    if _user32 is None:
+        from ctypes import wintypes
+
+        u = ctypes.WinDLL("user32", use_last_error=True)
+        u.SendMessageTimeoutW.restype = ctypes.c_ssize_t
+        u.SendMessageTimeoutW.argtypes = [
+            wintypes.HWND, wintypes.UINT, ctypes.c_size_t, ctypes.c_ssize_t,
+            wintypes.UINT, wintypes.UINT, ctypes.POINTER(ctypes.c_size_t),
+        ]
+        _user32 = u
+    return _user32
+
+
+def _como_lparam(lparam) -> int:
+    if lparam is None:
+        return 0
+    if isinstance(lparam, int):
+        return lparam
+    if isinstance(lparam, ctypes.Array):
+        return ctypes.addressof(lparam)
+    if isinstance(lparam, ctypes.c_void_p):
+        return lparam.value or 0
+    raise TypeError(f"lParam no soportado: {type(lparam).__name__}")
+
+
+def enviar(hwnd: int, msg: int, wparam: int = 0, lparam=0, timeout_ms: Optional[int] = None) -> int:
+    """
+    SendMessageTimeoutW(SMTO_ABORTIFHUNG). lparam: int, buffer ctypes o str
+    (se pasa como LPCWSTR, ej. WM_SETTEXT). Lanza PiscoHung si no responde.
+    """
+    timeout_ms = _timeout_ms if timeout_ms is None else timeout_ms
+    if isinstance(lparam, str):
+        lparam = ctypes.create_unicode_buffer(lparam)
+
+    res = ctypes.c_size_t(0)
+    t0 = time.perf_counter()
+    ok = _api().SendMessageTimeoutW(
+        int(hwnd), msg, wparam & ((1 << 8 * ctypes.sizeof(ctypes.c_size_t)) - 1), _como_lparam(lparam),
+        SMTO_NORMAL | SMTO_ABORTIFHUNG, timeout_ms, ctypes.byref(res),
+    )
+    dt = time.perf_counter() - t0
+
+    if not ok:
+        err = ctypes.get_last_error()
+        if err == ERROR_INVALID_WINDOW_HANDLE:
+            latencias.anotar(msg, dt)
+            return 0
+        # ERROR_TIMEOUT, o 0 cuando Windows ya la tiene marcada como colgada
+        latencias.anotar(msg, dt, timeout=True)
+        raise PiscoHung(hwnd, msg, timeout_ms)
+
+    latencias.anotar(msg, dt)
+    v = res.value
+    # LRESULT con signo (ej. -1 = LVNI "ninguno", CB_ERR)
+    if v >= 1 << (8 * ctypes.sizeof(ctypes.c_size_t) - 1):
+        v -= 1 << (8 * ctypes.sizeof(ctypes.c_size_t))
+    return v
+
+
+def texto(hwnd: int) -> str:
+    """Texto real del control (WM_GETTEXT; Windows lo copia entre procesos)."""
+    ln = enviar(hwnd, WM_GETTEXTLENGTH)
+    if ln <= 0:
+        return ""
+    buf = ctypes.create_unicode_buffer(ln + 1)
+    enviar(hwnd, WM_GETTEXT, ln + 1, buf)
+    return (buf.value or "").strip()
+
+
+def responde(hwnd: int, timeout_ms: int = 1000) -> bool:
+    """Ping WM_NULL: False si la ventana está colgada."""
+    try:
+        enviar(hwnd, WM_NULL, timeout_ms=timeout_ms)
+        return True
+    except PiscoHung:
+        return False
@@ -7,60 +7,58 @@ import time
 import ctypes
 import logging
 import configparser
-import pyperclip
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from pathlib import Path
 
-import win32gui
-import win32con
-import win32process
-
 import re
-import time
-import win32gui
-import win32con
 import os
 
-
-from pywinauto.timings import TimeoutError
-
-from pywinauto import Application, Desktop
-from pywinauto.keyboard import send_keys
-from pywinauto.timings import TimeoutError
-from pywinauto.controls.hwndwrapper import HwndWrapper
-
-from pywinauto import Desktop
+from robot.Diferido import Diferido, atributo, modulo
+
+# pywin32/pywinauto se cargan en el primer uso (el módulo se importa en Linux)
+win32api = modulo("win32api")
+win32gui = modulo("win32gui")
+win32con = modulo("win32con")
+win32process = modulo("win32process")
+
+Application = atributo("pywinauto", "Application")
+Desktop = atributo("pywinauto", "Desktop")
+send_keys = atributo("pywinauto.keyboard", "send_keys")
+
+if TYPE_CHECKING:
+    from pywinauto.controls.hwndwrapper import HwndWrapper
+
+from robot import CacheHwnd
+from robot import Columnas
+from robot import Localizadores
+from robot.CedulaCache import normalizar_cedula
+from robot import Mensajes
+from robot import Portapapeles
+from robot.Grabador import grabador
+from robot.HuellaLayout import huellas
+from robot.Mensajes import PiscoHung
+from robot.ListViewRemoto import CCH_CELDA, ListViewRemoto, decodificar_slots, leer_tabla
+from robot.UIDriver import ui
 
 logger = logging.getLogger("Robot62.PISCO")
 
-import ctypes
 from ctypes import wintypes
-user32 = ctypes.windll.user32
+user32 = Diferido(lambda: ctypes.windll.user32, "user32")
 
 LVM_FIRST = 0x1000
 LVM_GETITEMCOUNT = LVM_FIRST + 4
+LVM_GETNEXTITEM = LVM_FIRST + 12
+LVM_GETTOPINDEX = LVM_FIRST + 39
 LVM_GETCOLUMNWIDTH = LVM_FIRST + 29
 LVM_GETHEADER = LVM_FIRST + 31
 LVM_GETITEMTEXTW = LVM_FIRST + 115
+LVM_GETCOLUMNW = LVM_FIRST + 95
 
 HDM_FIRST = 0x1200
 HDM_GETITEMCOUNT = HDM_FIRST + 0
 
-class LVITEMW(ctypes.Structure):
-    _fields_ = [
-        ("mask", wintypes.UINT),
-        ("iItem", wintypes.INT),
-        ("iSubItem", wintypes.INT),
-        ("state", wintypes.UINT),
-        ("stateMask", wintypes.UINT),
-        ("pszText", wintypes.LPWSTR),
-        ("cchTextMax", wintypes.INT),
-        ("iImage", wintypes.INT),
-        ("lParam", wintypes.LPARAM),
-    ]
-
-LVIF_TEXT = 0x0001
+LVNI_SELECTED = 0x0002
 
 
 def _close_any_dialogs(timeout: float = 2.0) -> int:
@@ -85,6 +83,8 @@ def _close_any_dialogs(timeout: float = 2.0) -> int:
 
     if closed:
         logger.warning("Preflight: cerré %s dialogs #32770 sueltos.", closed)
+        # el hook de destrucción es asíncrono: no esperar a que borre sus hwnds
+        CacheHwnd.invalidar()
 
     return closed
 
@@ -129,6 +129,7 @@ def cerrar_datos_si_aparece(timeout: float = 2.5) -> bool:
                         win32gui.PostMessage(w.handle, win32con.WM_CLOSE, 0, 0)
                     except Exception:
                         pass
+                CacheHwnd.invalidar()
                 return True
         except Exception:
             pass
@@ -161,19 +162,6 @@ def _find_main_child_control(parent_hwnd: int) -> int:
         raise RuntimeError("No pude encontrar el control principal (grid) en Datos.")
     return best
 
-GRID_CLASS_CANDIDATES = {
-    # ListView / grids comunes
-    "SysListView32",
-    "MSFlexGridWndClass",
-    "MshFlexGridWndClass",      # a veces
-    "VSFlexGridWndClass",
-    "VtListView",               # algunos terceros
-    "TDBGrid",                  # algunos terceros
-    # VB6 containers que pueden envolver otros
-    "ThunderRT6UserControlDC",
-    "ThunderRT6PictureBox",
-}
-
 def _enum_children(hwnd_parent: int) -> list[int]:
     out = []
     def cb(h, _):
@@ -196,7 +184,7 @@ def _dump_descendants(hwnd_parent: int, limit: int = 80):
             return
         seen.add(h)
         try:
-            cls = win32gui.GetClassName(h)
+            cls = CacheHwnd.clase(h)
             txt = (win32gui.GetWindowText(h) or "").strip()
             l, t, r, b = win32gui.GetWindowRect(h)
             items.append((depth, h, cls, txt, (r-l, b-t)))
@@ -207,6 +195,7 @@ def _dump_descendants(hwnd_parent: int, limit: int = 80):
             walk(ch, depth + 1)
 
     walk(hwnd_parent, 0)
+    grabador().grabar("dump", hwnd_parent)
 
     # ordenar por área (más grande primero) para ver candidatos
     items.sort(key=lambda x: (x[4][0]*x[4][1]), reverse=True)
@@ -219,102 +208,41 @@ def _dump_descendants(hwnd_parent: int, limit: int = 80):
 
 def _find_grid_hwnd(hwnd_root: int) -> int | None:
     """
-    Busca recursivamente un control que parezca grid real.
-    Evita quedarse con el wrapper ATL:xxxx.
+    Grid real de la ventana: primero por huella de layout (ctrl ids), si no
+    verifica -> búsqueda heurística y se refresca la huella.
     """
-    seen = set()
-    best = None
-    best_area = 0
-
-    def area_of(h):
-        try:
-            l, t, r, b = win32gui.GetWindowRect(h)
-            return max(0, r-l) * max(0, b-t)
-        except Exception:
-            return 0
-
-    def walk(h):
-        nonlocal best, best_area
-        if h in seen:
-            return
-        seen.add(h)
-
-        try:
-            cls = win32gui.GetClassName(h)
-        except Exception:
-            return
-
-        a = area_of(h)
-
-        # si es candidato, lo consideramos
-        if cls in GRID_CLASS_CANDIDATES or cls.startswith("ATL:"):
-            # preferimos el MÁS GRANDE que sea candidato
-            if a > best_area:
-                best_area = a
-                best = h
-
-        # seguir bajando
-        for ch in _enum_children(h):
-            walk(ch)
-
-    walk(hwnd_root)
+    try:
+        titulo = (win32gui.GetWindowText(hwnd_root) or "").strip()
+    except Exception:
+        titulo = ""
+    return huellas().resolver_o_buscar(f"grid@{titulo}", hwnd_root, lambda: _buscar_grid_hwnd(hwnd_root))
 
-    # Si lo “mejor” quedó siendo ATL:xxxx, intentamos buscar un hijo NO-ATL debajo de ese wrapper
-    if best:
-        try:
-            cls_best = win32gui.GetClassName(best)
-        except Exception:
-            cls_best = ""
-
-        if cls_best.startswith("ATL:"):
-            # buscar el mejor candidato real debajo del ATL
-            inner = None
-            inner_area = 0
-            for ch in _enum_children(best):
-                try:
-                    cls = win32gui.GetClassName(ch)
-                except Exception:
-                    continue
-                a = area_of(ch)
-                if (cls in GRID_CLASS_CANDIDATES) and a > inner_area:
-                    inner_area = a
-                    inner = ch
-            if inner:
-                return inner
 
+def _buscar_grid_hwnd(hwnd_root: int) -> int | None:
+    """
+    Busca recursivamente un control que parezca grid real.
+    Evita quedarse con el wrapper ATL:xxxx (ver Localizadores.grid).
+    """
+    best = Localizadores.grid(ui(), hwnd_root)
+    grabador().grabar("grid", hwnd_root, {"grid": best})
     return best
 #capturar_errores_desde_datos
 
-def _listview_get_cols(hwnd_lv: int) -> int:
-    hdr = user32.SendMessageW(hwnd_lv, LVM_GETHEADER, 0, 0)
-    if not hdr:
-        return 0
-    return user32.SendMessageW(hdr, HDM_GETITEMCOUNT, 0, 0)
-
-def _listview_get_text(hwnd_lv: int, row: int, col: int, maxlen: int = 512) -> str:
-    buf = ctypes.create_unicode_buffer(maxlen)
-    item = LVITEMW()
-    item.mask = LVIF_TEXT
-    item.iItem = row
-    item.iSubItem = col
-    item.pszText = ctypes.cast(buf, wintypes.LPWSTR)
-    item.cchTextMax = maxlen
-    user32.SendMessageW(hwnd_lv, LVM_GETITEMTEXTW, row, ctypes.byref(item))
-    return buf.value
-
 def _read_listview(hwnd_lv: int) -> list[list[str]]:
-    n_rows = user32.SendMessageW(hwnd_lv, LVM_GETITEMCOUNT, 0, 0)
-    n_cols = _listview_get_cols(hwnd_lv)
-    if n_rows <= 0 or n_cols <= 0:
-        return []
+    """Celdas del ListView leídas en bloque desde la memoria del proceso PISCO."""
+    return _read_listview_completo(hwnd_lv, cabeceras=False)[1]
 
-    data = []
-    for r in range(n_rows):
-        row = []
-        for c in range(n_cols):
-            row.append(_listview_get_text(hwnd_lv, r, c).strip())
-        data.append(row)
-    return data
+
+def _read_listview_completo(hwnd_lv: int, cabeceras: bool = True) -> tuple[list[str], list[list[str]]]:
+    """(cabeceras, filas) vía ListViewRemoto; ([], []) si no se puede leer (se usa el portapapeles)."""
+    try:
+        with ListViewRemoto(hwnd_lv) as lector:
+            return leer_tabla(lector, cabeceras=cabeceras)
+    except PiscoHung:
+        raise
+    except Exception as e:
+        logger.warning("No pude leer el ListView hwnd=%s en bloque: %s", hwnd_lv, e)
+        return [], []
 
 
 # ==========================================================
@@ -348,6 +276,36 @@ def load_config(path: str) -> PiscoConfig:
     )
 
 
+@dataclass
+class MigracionConfig:
+    """
+    [migracion] en config.ini (todo opcional):
+      lote = 50                  (filas por carga; 0 = todo en una sola carga)
+      timeout_base = 60          (segundos fijos de Guardar Masivo)
+      timeout_por_fila = 2.0     (segundos extra por fila del lote)
+      estancado = 45             (segundos sin progreso => abortar Guardar Masivo y la corrida;
+                                  debe ser menor que timeout_base para cortar antes del plazo)
+    """
+    lote: int = 50
+    timeout_base: float = 60.0
+    timeout_por_fila: float = 2.0
+    estancado: float = 45.0
+
+    def timeout_guardar(self, n_filas: int) -> int:
+        return int(self.timeout_base + self.timeout_por_fila * max(0, n_filas))
+
+
+def load_migracion_config(path: str) -> MigracionConfig:
+    cfg = configparser.ConfigParser()
+    cfg.read(path, encoding="utf-8")
+    return MigracionConfig(
+        lote=cfg.getint("migracion", "lote", fallback=50),
+        timeout_base=cfg.getfloat("migracion", "timeout_base", fallback=60.0),
+        timeout_por_fila=cfg.getfloat("migracion", "timeout_por_fila", fallback=2.0),
+        estancado=cfg.getfloat("migracion", "estancado", fallback=45.0),
+    )
+
+
 def _is_admin() -> bool:
     try:
         return bool(ctypes.windll.shell32.IsUserAnAdmin())
@@ -478,26 +436,9 @@ def _vb6_button(parent_hwnd: int, label: str) -> int | None:
     - texto exacto
     - visible
     - habilitado
+    (Localizadores.boton_vb6: memorizado mientras la ventana no cambie)
     """
-
-    result = None
-
-    def enum_child(hwnd, _):
-        nonlocal result
-        if result:
-            return
-        if win32gui.GetClassName(hwnd) != "ThunderRT6CommandButton":
-            return
-        if win32gui.GetWindowText(hwnd).strip().lower() != label.lower():
-            return
-        if not win32gui.IsWindowVisible(hwnd):
-            return
-        if not win32gui.IsWindowEnabled(hwnd):
-            return
-        result = hwnd
-
-    win32gui.EnumChildWindows(parent_hwnd, enum_child, None)
-    return result
+    return Localizadores.boton_vb6(ui(), parent_hwnd, label)
 
 
 def _bm_click(hwnd: int):
@@ -546,7 +487,7 @@ def _wait_result_popup(timeout: int = 60) -> dict:
             textos = []
 
             def enum_child(h, _):
-                if win32gui.GetClassName(h) == "Static":
+                if CacheHwnd.clase(h) == "Static":
                     txt = (win32gui.GetWindowText(h) or "").strip()
                     if txt:
                         textos.append(txt)
@@ -600,12 +541,21 @@ def _wait_result_popup(timeout: int = 60) -> dict:
 # GUARDAR MASIVO – FIX CRÍTICO
 # ==========================================================
 
-def guardar_masivo(mig_win):
+class GuardarEstancado(TimeoutError):
+    """
+    Guardar Masivo sin progreso durante `estancado` segundos, o el plazo venció
+    sin progreso desde el último avance: PISCO colgado.
+    """
+
+
+def guardar_masivo(mig_win, timeout: int = 180, estancado: float = 45.0):
     """
     FUNCIÓN CRÍTICA.
     - NO reintenta
     - NO corrige
     - NO toca otros botones
+    timeout: plazo inicial del popup final (escalar con el tamaño del lote).
+    estancado: segundos sin progreso visible para abortar (PISCO colgado).
     """
 
     btn = _vb6_button(mig_win.handle, "Guardar Masivo")
@@ -620,7 +570,56 @@ def guardar_masivo(mig_win):
     confirm = _wait_confirmacion()
     _click_si(confirm)
 
-    return _wait_proceso_finalizado(mig_win)
+    return _wait_proceso_finalizado(mig_win, timeout=timeout, estancado=estancado)
+
+
+# ==========================================================
+# COSECHA DE ÓRDENES DESDE EL GRID DE MIGRACIÓN
+# ==========================================================
+
+def _mapear_ordenes_grid(filas: list[list[str]], cedulas) -> dict[str, str]:
+    """
+    Sin depender de cabeceras: columnas por contenido (Localizadores.columnas_ordenes).
+    Retorna {cedula_normalizada: no_orden}. Cédulas ambiguas (varias filas) se omiten.
+    """
+    objetivo = {normalizar_cedula(c) for c in cedulas if normalizar_cedula(c)}
+    if not filas or not objetivo:
+        return {}
+
+    cols = Localizadores.columnas_ordenes([], filas, objetivo)
+    if "cedula" not in cols or "no_orden" not in cols:
+        return {}
+    col_ced, col_ord = cols["cedula"], cols["no_orden"]
+
+    out: dict[str, str] = {}
+    vistas: dict[str, int] = {}
+    for f in filas:
+        if len(f) <= max(col_ced, col_ord):
+            continue
+        key = normalizar_cedula(f[col_ced])
+        orden = (f[col_ord] or "").strip()
+        if key not in objetivo or not Localizadores.PAT_ORDEN.match(orden):
+            continue
+        vistas[key] = vistas.get(key, 0) + 1
+        out[key] = orden
+
+    return {k: v for k, v in out.items() if vistas.get(k) == 1}
+
+
+def cosechar_ordenes_migracion(mig_win, cedulas) -> dict[str, str]:
+    """
+    Lee el grid de Migración (después de Guardar Masivo) y empareja
+    No Orden Servicio con las cédulas del lote. Best-effort: {} si el grid
+    no existe, no es legible o no muestra órdenes.
+    """
+    hwnd_grid = _find_grid_hwnd(mig_win.handle)
+    if not hwnd_grid or CacheHwnd.clase(hwnd_grid) != "SysListView32":
+        return {}
+
+    filas = _read_listview(hwnd_grid)
+    ordenes = _mapear_ordenes_grid(filas, cedulas)
+    logger.info("Cosecha Migración: filas_grid=%s | órdenes emparejadas=%s", len(filas), len(ordenes))
+    return ordenes
 
 
 # ==========================================================
@@ -654,52 +653,211 @@ def _click_si(win):
     send_keys("{ENTER}")
 
 
-def _wait_proceso_finalizado(mig_win=None, timeout: int = 180) -> dict:
+class _MonitorProgreso:
+    """
+    Señales de avance de Guardar Masivo en la ventana de Migración:
+    - textos de barra de estado / labels (ej: "Procesando 15 de 200")
+    - grid ListView: cantidad de filas, fila seleccionada y primera visible
+    - tiempo de CPU del proceso PISCO
+    Cualquier cambio = progreso.
+    """
+
+    _RE_AVANCE = re.compile(r"(\d+)\s*(?:de|/)\s*(\d+)")
+    _CLASES_TEXTO = ("Static", "msctls_statusbar32", "ThunderRT6Label", "ThunderRT6TextBox")
+
+    def __init__(self, mig_hwnd: int | None, cpu_umbral: float = 0.05):
+        self.mig_hwnd = mig_hwnd
+        self.cpu_umbral = cpu_umbral
+        self.grid = None
+        self.proc = None
+        self.filas = None  # último "X" de "X de Y" visto
+
+        if not mig_hwnd:
+            return
+        try:
+            g = _find_grid_hwnd(mig_hwnd)
+            if g and CacheHwnd.clase(g) == "SysListView32":
+                self.grid = g
+        except Exception:
+            pass
+        try:
+            _, pid = win32process.GetWindowThreadProcessId(mig_hwnd)
+            self.proc = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION, False, pid)
+        except Exception:
+            self.proc = None
+
+        self._firma = self._leer_firma()
+        self._cpu = self._leer_cpu()
+
+    def _leer_firma(self) -> tuple:
+        textos = []
+        for h in _enum_children(self.mig_hwnd):
+            try:
+                if CacheHwnd.clase(h) in self._CLASES_TEXTO:
+                    txt = (win32gui.GetWindowText(h) or "").strip()
+                    if txt:
+                        textos.append(txt)
+            except Exception:
+                continue
+
+        for t in textos:
+            m = self._RE_AVANCE.search(t)
+            if m:
+                self.filas = int(m.group(1))
+                break
+
+        grid = ()
+        if self.grid:
+            try:
+                # timeout corto: durante el Guardar Masivo PISCO puede no atender mensajes,
+                # eso no es cuelgue (lo decide el detector de estancamiento)
+                grid = (
+                    Mensajes.enviar(self.grid, LVM_GETITEMCOUNT, timeout_ms=500),
+                    Mensajes.enviar(self.grid, LVM_GETNEXTITEM, -1, LVNI_SELECTED, timeout_ms=500),
+                    Mensajes.enviar(self.grid, LVM_GETTOPINDEX, timeout_ms=500),
+                )
+            except Exception:
+                grid = ()
+
+        return tuple(textos), grid
+
+    def _leer_cpu(self) -> float | None:
+        if not self.proc:
+            return None
+        try:
+            t = win32process.GetProcessTimes(self.proc)
+            return (t["KernelTime"] + t["UserTime"]) / 1e7  # 100ns -> s
+        except Exception:
+            return None
+
+    def hubo_progreso(self) -> bool:
+        if not self.mig_hwnd:
+            return False
+
+        avance = False
+        firma = self._leer_firma()
+        if firma != self._firma:
+            self._firma = firma
+            avance = True
+
+        cpu = self._leer_cpu()
+        if cpu is not None and self._cpu is not None and cpu - self._cpu >= self.cpu_umbral:
+            avance = True
+        if cpu is not None:
+            self._cpu = cpu
+
+        return avance
+
+    def cerrar(self) -> None:
+        if self.proc:
+            try:
+                win32api.CloseHandle(self.proc)
+            except Exception:
+                pass
+            self.proc = None
+
+
+def _wait_proceso_finalizado(
+    mig_win=None,
+    timeout: int = 180,
+    estancado: float = 45.0,
+    extension: float = 60.0,
+    max_total: float | None = None,
+) -> dict:
     """
     Captura el MessageBox VB6 final del Guardar Masivo:
     - 'Proceso finalizado con errores'
     - 'Proceso finalizado correctamente'
-    """
 
+    Espera guiada por progreso (ver _MonitorProgreso):
+    - timeout: plazo inicial.
+    - mientras hay progreso, el plazo se corre a ahora+extension (tope max_total, default 4x timeout).
+    - si nada cambia durante `estancado` segundos => PISCO colgado, se aborta sin esperar el plazo.
+    - si el plazo vence sin progreso desde el último avance, también es GuardarEstancado;
+      TimeoutError solo si seguía avanzando al llegar al tope.
+    """
     t0 = time.time()
+    deadline = t0 + timeout
+    tope = t0 + (max_total if max_total is not None else timeout * 4)
 
-    while time.time() - t0 < timeout:
-        hwnd = win32gui.FindWindow("#32770", None)
-        if hwnd:
-            textos = []
+    mon = _MonitorProgreso(getattr(mig_win, "handle", None))
+    ultimo_avance = t0
+    ultimo_log = t0
+    filas_ini, t_filas = mon.filas, t0
+    avanzando = False  # la última lectura del monitor mostró progreso
 
-            def enum_child(h, _):
-                if win32gui.GetClassName(h) == "Static":
-                    txt = win32gui.GetWindowText(h).strip()
-                    if txt:
-                        textos.append(txt)
+    try:
+        while True:
+            ahora = time.time()
+            if ahora >= deadline:
+                break
 
-            win32gui.EnumChildWindows(hwnd, enum_child, None)
+            hwnd = win32gui.FindWindow("#32770", None)
+            if hwnd:
+                textos = []
 
-            full = "\n".join(textos).lower()
+                def enum_child(h, _):
+                    if CacheHwnd.clase(h) == "Static":
+                        txt = win32gui.GetWindowText(h).strip()
+                        if txt:
+                            textos.append(txt)
 
-            if "proceso finalizado" in full:
-                logger.info("Popup final Guardar Masivo detectado.")
+                win32gui.EnumChildWindows(hwnd, enum_child, None)
 
-                tiene_errores = "con errores" in full
+                full = "\n".join(textos).lower()
 
-                # cerrar popup
-                try:
-                    btn = win32gui.FindWindowEx(hwnd, 0, "Button", None)
-                    if btn:
-                        win32gui.PostMessage(btn, win32con.BM_CLICK, 0, 0)
-                    else:
-                        win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
-                except Exception:
-                    win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+                if "proceso finalizado" in full:
+                    logger.info("Popup final Guardar Masivo detectado (%.1fs).", time.time() - t0)
 
-                return {
-                    "texto": full,
-                    "tiene_errores": tiene_errores
-                }
+                    tiene_errores = "con errores" in full
 
-        time.sleep(0.25)
+                    # cerrar popup
+                    try:
+                        btn = win32gui.FindWindowEx(hwnd, 0, "Button", None)
+                        if btn:
+                            win32gui.PostMessage(btn, win32con.BM_CLICK, 0, 0)
+                        else:
+                            win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+                    except Exception:
+                        win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
 
+                    return {
+                        "texto": full,
+                        "tiene_errores": tiene_errores
+                    }
+
+            avanzando = mon.hubo_progreso()
+            if avanzando:
+                ultimo_avance = ahora
+                deadline = min(tope, max(deadline, ahora + extension))
+            elif mon.mig_hwnd and ahora - ultimo_avance >= estancado:
+                raise GuardarEstancado(
+                    f"Guardar Masivo sin progreso durante {estancado:.0f}s "
+                    f"(PISCO colgado?). Transcurrido={ahora - t0:.0f}s."
+                )
+
+            if filas_ini is None and mon.filas is not None:
+                filas_ini, t_filas = mon.filas, ahora
+
+            if ahora - ultimo_log >= 10:
+                ultimo_log = ahora
+                if filas_ini is not None:
+                    logger.info(
+                        "Guardar Masivo: fila %s | %.2f filas/s",
+                        mon.filas, (mon.filas - filas_ini) / max(0.001, ahora - t_filas),
+                    )
+                else:
+                    logger.info("Guardar Masivo: esperando... %.0fs (último avance hace %.0fs)", ahora - t0, ahora - ultimo_avance)
+
+            time.sleep(0.25)
+    finally:
+        mon.cerrar()
+
+    if not avanzando:
+        raise GuardarEstancado(
+            f"Guardar Masivo: venció el plazo sin progreso desde hace {time.time() - ultimo_avance:.0f}s "
+            f"(PISCO colgado?). Transcurrido={time.time() - t0:.0f}s."
+        )
     raise TimeoutError(
         "Guardar Masivo se ejecutó, pero no se pudo capturar "
         "el MessageBox VB6 final."
@@ -743,12 +901,7 @@ def crear_csv_muestra_2_sin_error(
         raise RuntimeError("El CSV no tiene encabezados.")
 
     # Detectar columna de prestación
-    col_prest = None
-    for h in fieldnames:
-        nh = re.sub(r"\s+", " ", h.lower())
-        if "prestacion" in nh:
-            col_prest = h
-            break
+    col_prest = Columnas.nombre(fieldnames, "prestacion")
 
     if col_prest is None:
         raise RuntimeError(
@@ -784,6 +937,217 @@ def crear_csv_muestra_2_sin_error(
 
 
 
+def _copiar_grid_portapapeles(hwnd_form: int, hwnd_grid: int) -> str:
+    """
+    Fallback para grids que no son ListView: click en el grid, Ctrl+A / Ctrl+C
+    y lectura del portapapeles. Retorna el texto crudo (TSV).
+    """
+    # click dentro del grid para asegurarnos foco REAL
+    try:
+        l, t, r, b = win32gui.GetWindowRect(hwnd_grid)
+        x = l + 50
+        y = t + 60
+        win32gui.SetForegroundWindow(hwnd_form)
+        time.sleep(0.2)
+        user32.SetCursorPos(x, y)
+        user32.mouse_event(2, 0, 0, 0, 0)  # down
+        user32.mouse_event(4, 0, 0, 0, 0)  # up
+        time.sleep(0.2)
+    except Exception:
+        pass
+
+    # copiar y esperar a que cambie la secuencia del portapapeles
+    raw = Portapapeles.copiar_y_esperar(lambda: send_keys("^a^c"))
+    if not raw.strip():
+        # segundo intento: a veces CTRL+A no funciona, probamos HOME + SHIFT+END, etc.
+        raw = Portapapeles.copiar_y_esperar(lambda: send_keys("{HOME}+{END}^c"))
+
+    if not raw.strip():
+        _dump_descendants(hwnd_form)
+        raise RuntimeError(
+            f"No pude copiar contenido desde el grid. Clase detectada: {CacheHwnd.clase(hwnd_grid)}. "
+            "Revisar dump en log para ver controles internos."
+        )
+
+    return raw
+
+
+def _listview_headers(hwnd_lv: int) -> list[str]:
+    """Textos de las columnas del ListView (LVM_GETCOLUMNW en memoria remota)."""
+    try:
+        with ListViewRemoto(hwnd_lv) as lector:
+            _, n_cols = lector.dimensiones()
+            raw, lons = lector.leer_cabeceras(n_cols, CCH_CELDA)
+            return decodificar_slots(raw, lons, CCH_CELDA)
+    except PiscoHung:
+        raise
+    except Exception as e:
+        logger.warning("No pude leer cabeceras del ListView hwnd=%s: %s", hwnd_lv, e)
+        return []
+
+
+def leer_grid(hwnd_form: int, hwnd_grid: int) -> tuple[list[str], list[list[str]]]:
+    """
+    Lee un grid completo. Retorna (cabeceras, filas):
+    - ListView: cabeceras + celdas en bloque desde la memoria de PISCO (ListViewRemoto).
+    - Otros: portapapeles; cabeceras = [] (la 1ra fila puede ser cabecera, decide el llamador).
+    """
+    if CacheHwnd.clase(hwnd_grid) == "SysListView32":
+        headers, filas = _read_listview_completo(hwnd_grid)
+        if filas:
+            return headers, filas
+
+    raw = _copiar_grid_portapapeles(hwnd_form, hwnd_grid)
+    return [], list(Portapapeles.parsear_tsv(raw))
+
+
+@dataclass
+class ErrorDatos:
+    """Una fila de la ventana Datos: Fila | Identificacion | Nombre | Error."""
+    fila: Optional[int]
+    identificacion: str
+    error: str
+    nombre: str = ""
+
+
+# columna lógica -> fragmentos (normalizados) aceptados en la cabecera del grid Datos
+_CABECERAS_DATOS = {
+    "fila": ("fila", "linea", "registro"),
+    "identificacion": ("ident", "cedula", "documento"),
+    "nombre": ("nombre",),
+    "error": ("error", "observ", "mensaje", "motivo"),
+}
+# orden del grid cuando no hay cabeceras legibles
+_POSICION_DATOS = {"fila": 0, "identificacion": 1, "nombre": 2, "error": 3}
+
+
+def _columnas_datos(headers: list[str]) -> dict[str, int]:
+    norm = [Columnas.normalizar(h) for h in headers]
+    out: dict[str, int] = {}
+    for col, frags in _CABECERAS_DATOS.items():
+        i = next((i for i, h in enumerate(norm) for fr in frags if fr in h), None)
+        if i is not None:
+            out[col] = i
+    return out
+
+
+def parsear_errores_datos(headers: list[str], filas: list[list[str]]) -> list[ErrorDatos]:
+    """
+    Convierte el grid de Datos en registros. Si no vienen cabeceras (portapapeles),
+    la 1ra fila se usa como cabecera cuando lo parece; si no, orden por posición.
+    """
+    cols = _columnas_datos(headers) if headers else {}
+    if not headers and filas:
+        cand = _columnas_datos(filas[0])
+        if "error" in cand or "identificacion" in cand:
+            cols, filas = cand, filas[1:]
+    if "error" not in cols:
+        cols = dict(_POSICION_DATOS)
+
+    def celda(r: list[str], col: str) -> str:
+        i = cols.get(col)
+        if i is None or i >= len(r):
+            return ""
+        return (r[i] or "").strip()
+
+    out: list[ErrorDatos] = []
+    sin_error = 0
+    for r in filas:
+        if not r:
+            continue
+        err = celda(r, "error")
+        if not err:
+            # otra columna no es el texto del error: la fila no se adivina
+            if any((v or "").strip() for v in r):
+                sin_error += 1
+                logger.debug("Datos: fila sin texto en la columna Error (se omite): %s", r)
+            continue
+        fila_txt = re.sub(r"\D", "", celda(r, "fila"))
+        out.append(ErrorDatos(
+            fila=int(fila_txt) if fila_txt else None,
+            identificacion=celda(r, "identificacion"),
+            error=err,
+            nombre=celda(r, "nombre"),
+        ))
+    if sin_error:
+        logger.warning("Datos: %s filas sin texto en la columna Error (cols=%s); se omiten.", sin_error, cols)
+    return out
+
+
+# 'Fila' de Datos -> índice en el CSV: índice = fila - offset
+# (1 = 1-based sobre datos, 2 = cuenta la cabecera, 0 = 0-based); empates: el primero
+_OFFSETS_FILA = (1, 2, 0)
+
+
+def _offset_fila(csv_rows: list[dict], col_cc: Optional[str], errores: list[ErrorDatos]) -> int:
+    """
+    Numeración de 'Fila' de esta tabla Datos: el offset con más errores cuya
+    fila del CSV tiene la misma cédula. Sin cédulas que confirmen: 1.
+    """
+    if not col_cc:
+        return _OFFSETS_FILA[0]
+    n = len(csv_rows)
+    aciertos = dict.fromkeys(_OFFSETS_FILA, 0)
+    for e in errores:
+        key = normalizar_cedula(e.identificacion)
+        if not key or e.fila is None:
+            continue
+        for off in _OFFSETS_FILA:
+            i = e.fila - off
+            if 0 <= i < n and normalizar_cedula(csv_rows[i].get(col_cc, "")) == key:
+                aciertos[off] += 1
+    mejor = max(_OFFSETS_FILA, key=lambda off: aciertos[off])  # max() se queda con el primero en empate
+    logger.debug("Datos: offset de 'Fila'=%s (confirmadas por cédula=%s)", mejor, aciertos)
+    return mejor if aciertos[mejor] else _OFFSETS_FILA[0]
+
+
+def unir_errores_csv(
+    csv_rows: list[dict], col_cc: Optional[str], errores: list[ErrorDatos]
+) -> tuple[dict[int, str], list[ErrorDatos]]:
+    """
+    Une cada error con su fila del CSV usando un índice por cédula + Fila.
+    Retorna ({indice_fila_csv: texto_error}, errores_sin_fila). O(filas + errores).
+
+    'Fila' de PISCO puede ser 1-based sobre datos o contar la cabecera: se
+    elige UNA numeración para toda la tabla (_offset_fila, confirmada por
+    cédula). Un error cuya fila no coincide con su cédula va a la primera fila
+    de esa cédula aún sin error; sin Identificacion se usa solo la Fila.
+    """
+    por_cedula: dict[str, list[int]] = {}
+    if col_cc:
+        for i, r in enumerate(csv_rows):
+            key = normalizar_cedula(r.get(col_cc, ""))
+            if key:
+                por_cedula.setdefault(key, []).append(i)
+
+    marcadas: dict[int, str] = {}
+    sin_fila: list[ErrorDatos] = []
+    n = len(csv_rows)
+    offset = _offset_fila(csv_rows, col_cc, errores)
+
+    for e in errores:
+        key = normalizar_cedula(e.identificacion)
+        idx: Optional[int] = None
+
+        if key:
+            cands = por_cedula.get(key) or []
+            if e.fila is not None and e.fila - offset in cands:
+                idx = e.fila - offset
+            if idx is None:
+                # misma cédula en varias filas: la primera aún sin error
+                idx = next((i for i in cands if i not in marcadas), cands[0] if cands else None)
+        elif e.fila is not None and 0 <= e.fila - offset < n:
+            idx = e.fila - offset
+
+        if idx is None:
+            sin_fila.append(e)
+            continue
+
+        marcadas[idx] = f"{marcadas[idx]} | {e.error}" if idx in marcadas else e.error
+
+    return marcadas, sin_fila
+
+
 def capturar_errores_desde_datos(csv_path: str) -> dict:
     desk = Desktop(backend="win32")
     datos = desk.window(title_re=r"^Datos$")
@@ -800,97 +1164,36 @@ def capturar_errores_desde_datos(csv_path: str) -> dict:
         _dump_descendants(hwnd_form)
         raise RuntimeError("No pude encontrar ningún control tipo grid dentro de Datos.")
 
-    cls = win32gui.GetClassName(hwnd_grid)
+    cls = CacheHwnd.clase(hwnd_grid)
     logger.info("GRID detectado en Datos: hwnd=%s class=%s", hwnd_grid, cls)
 
-    # 2) Si es ListView -> leer por mensajes
-    rows = []
-    if cls == "SysListView32":
-        rows = _read_listview(hwnd_grid)
-
-    # 3) Si NO es ListView -> fallback: copiar “como humano” desde el control correcto
-    if not rows:
-        # click dentro del grid para asegurarnos foco REAL
-        try:
-            l, t, r, b = win32gui.GetWindowRect(hwnd_grid)
-            x = l + 50
-            y = t + 60
-            win32gui.SetForegroundWindow(hwnd_form)
-            time.sleep(0.2)
-            user32.SetCursorPos(x, y)
-            user32.mouse_event(2, 0, 0, 0, 0)  # down
-            user32.mouse_event(4, 0, 0, 0, 0)  # up
-            time.sleep(0.2)
-        except Exception:
-            pass
-
-        # limpiar clipboard y copiar
-        try:
-            pyperclip.copy("")
-        except Exception:
-            pass
-
-        # intentos de selección/copia típicos
-        send_keys("^a")
-        time.sleep(0.15)
-        send_keys("^c")
-        time.sleep(0.35)
-
-        raw = pyperclip.paste() or ""
-        if not raw.strip():
-            # segundo intento: a veces CTRL+A no funciona, probamos HOME + SHIFT+END, etc.
-            send_keys("{HOME}")
-            time.sleep(0.1)
-            send_keys("+{END}")
-            time.sleep(0.1)
-            send_keys("^c")
-            time.sleep(0.4)
-            raw = pyperclip.paste() or ""
-
-        if not raw.strip():
-            _dump_descendants(hwnd_form)
-            raise RuntimeError(
-                f"No pude copiar contenido desde el grid. Clase detectada: {cls}. "
-                "Revisar dump en log para ver controles internos."
-            )
-
-        # parse TSV
-        filas = [ln.split("\t") for ln in raw.splitlines() if ln.strip()]
-        # En tu screenshot: Fila | Identificacion | Nombre | Error
-        # si la primera fila son headers, se omite
-        if filas and ("error" in (filas[0][-1] or "").lower() or "ident" in (filas[0][1] or "").lower()):
-            data = filas[1:]
-        else:
-            data = filas
-
-        rows = data
-
-    # 4) Extraer errores (col última o 4ta)
-    errores = []
-    for r in rows:
-        if not r:
-            continue
-        if len(r) >= 4:
-            errores.append(r[3].strip())
-        else:
-            errores.append(r[-1].strip())
+    # 2) ListView por mensajes; otros grids por portapapeles
+    grid_headers, grid_rows = leer_grid(hwnd_form, hwnd_grid)
 
-    errores = [e for e in errores if e]
+    # 3) Registros estructurados: Fila | Identificacion | Nombre | Error
+    errores = parsear_errores_datos(grid_headers, grid_rows)
 
     if not errores:
         raise RuntimeError("Leí/copié la tabla pero no encontré textos de error.")
 
-    # 5) Escribir errores en N° Prestacion del CSV
+    # 4) Unir por Fila/Identificacion y marcar SOLO las filas con error
     p = Path(csv_path)
     with p.open("r", encoding="utf-8-sig", newline="") as f:
         reader = csv.DictReader(f, delimiter=";")
         csv_rows = list(reader)
         headers = reader.fieldnames or []
 
-    col_prest = next(h for h in headers if "prestacion" in h.lower())
+    col_prest = Columnas.nombre(headers, "prestacion")
+    if col_prest is None:
+        raise RuntimeError(f"No se encontró columna de prestación en headers: {headers}")
+
+    marcadas, sin_fila = unir_errores_csv(csv_rows, Columnas.nombre(headers, "cc_fallecido"), errores)
+
+    for idx, err in marcadas.items():
+        csv_rows[idx][col_prest] = err
 
-    for row, err in zip(csv_rows, errores):
-        row[col_prest] = err
+    for e in sin_fila:
+        logger.warning("Error de Datos sin fila en el CSV (fila=%s, id=%s): %s", e.fila, e.identificacion, e.error)
 
     out = p.with_name(p.stem + "_ERRORES.csv")
     with out.open("w", encoding="utf-8-sig", newline="") as f:
@@ -898,12 +1201,15 @@ def capturar_errores_desde_datos(csv_path: str) -> dict:
         w.writeheader()
         w.writerows(csv_rows)
 
-    logger.info("Errores extraídos y escritos en CSV: %s (n=%s)", out, len(errores))
+    logger.info(
+        "Errores extraídos y escritos en CSV: %s (errores=%s, filas_marcadas=%s, sin_fila=%s)",
+        out, len(errores), len(marcadas), len(sin_fila),
+    )
 
     # cerrar ventana Datos
     win32gui.PostMessage(hwnd_form, win32con.WM_CLOSE, 0, 0)
 
-    return {"csv_salida": str(out), "errores": len(errores)}
+    return {"csv_salida": str(out), "errores": len(errores), "filas_marcadas": len(marcadas)}
 
 
 
@@ -917,7 +1223,7 @@ def _click_toolbar_copy(datos_hwnd: int):
 
     def enum_child(hwnd, _):
         nonlocal btn_copy
-        cls = win32gui.GetClassName(hwnd)
+        cls = CacheHwnd.clase(hwnd)
 
         # ToolBarWindow32 es típico en VB6
         if cls == "ToolbarWindow32":
@@ -930,7 +1236,7 @@ def _click_toolbar_copy(datos_hwnd: int):
         raise RuntimeError("No se encontró Toolbar de la ventana Datos")
 
     # Simular click en botón copiar
-    win32gui.SendMessage(btn_copy, win32con.WM_COMMAND, 0, 0)
+    Mensajes.enviar(btn_copy, win32con.WM_COMMAND, 0, 0)
     time.sleep(0.4)
 
 def copiar_desde_menu_datos(datos_win):
@@ -971,7 +1277,7 @@ def copiar_grid_datos(datos_win):
 
     def enum_child(hwnd, _):
         nonlocal grid_hwnd
-        cls = win32gui.GetClassName(hwnd)
+        cls = CacheHwnd.clase(hwnd)
 
         if cls in (
             "MSFlexGridWndClass",
@@ -992,12 +1298,7 @@ def copiar_grid_datos(datos_win):
     time.sleep(0.3)
 
     # 👉 Seleccionar todo + copiar
-    send_keys("^a")
-    time.sleep(0.1)
-    send_keys("^c")
-    time.sleep(0.3)
-
-    raw = pyperclip.paste()
+    raw = Portapapeles.copiar_y_esperar(lambda: send_keys("^a^c"))
     if not raw.strip():
         raise RuntimeError("Clipboard vacío: el grid no copió datos")
 
@@ -1029,6 +1330,17 @@ def cerrar_ventana(win, timeout: float = 8.0):
         time.sleep(0.2)
     return False
 
+def ventana_existe(win) -> bool:
+    """True si el HWND de la ventana (wrapper o int) sigue vivo."""
+    if win is None:
+        return False
+    try:
+        hwnd = win.handle if hasattr(win, "handle") else int(win)
+        return bool(win32gui.IsWindow(hwnd))
+    except Exception:
+        return False
+
+
 def cerrar_pisco(main_win=None, timeout: float = 10.0) -> bool:
     """
     Cierra PISCO completo.
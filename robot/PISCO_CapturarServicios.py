@@ -11,7 +11,7 @@
 #      (robusto: abrir dropdown y leer ComboLBox)
 #   5) Escribir cédula en Edit
 #   6) Click lupa
-#   7) Si sale Error 13 / No coinciden los tipos -> cerrar y fallar
+#   7) Si sale Error 13 / No coinciden los tipos -> cerrar y fallar (ErrorTipos13)
 # ==========================================
 
 from __future__ import annotations
@@ -19,26 +19,45 @@ from __future__ import annotations
 import time
 import logging
 import ctypes
+import configparser
+from dataclasses import dataclass, field
 
 
 import unicodedata
 
-import win32gui
-import win32con
-import win32api
-
-from pywinauto import Desktop
-from pywinauto.timings import TimeoutError
-from pywinauto.keyboard import send_keys
+from robot import CacheHwnd
+from robot import Columnas
+from robot import Formulario
+from robot import Localizadores
+from robot import Mensajes
+from robot import PISCO
+from robot.CedulaCache import normalizar_cedula
+from robot.Diferido import Diferido, atributo, modulo
+from robot.Grabador import grabador
+from robot.HuellaLayout import huellas
+from robot.Mensajes import PiscoHung
+from robot.Reintentos import CedulaNoEscrita, ComboNoSeleccionado, ErrorTipos13
+from robot.UIDriver import ui
 
 logger = logging.getLogger("Robot62.PISCO.CapturarServicios")
 
-user32 = ctypes.windll.user32
+# pywin32/pywinauto se cargan en el primer uso (el módulo se importa en Linux)
+win32gui = modulo("win32gui")
+win32con = modulo("win32con")
+win32api = modulo("win32api")
+
+Desktop = atributo("pywinauto", "Desktop")
+send_keys = atributo("pywinauto.keyboard", "send_keys")
+
+user32 = Diferido(lambda: ctypes.windll.user32, "user32")
 
 # -------------------------
 # ComboBox messages
 # -------------------------
 CB_GETCOUNT = 0x0146
+CB_GETCURSEL = 0x0147
+CB_GETLBTEXT = 0x0148
+CB_GETLBTEXTLEN = 0x0149
 CB_SETCURSEL = 0x014E
 CB_SHOWDROPDOWN = 0x014F
 
@@ -100,100 +119,22 @@ def _find_top_window_title_contains(substr: str, timeout: float = 10.0, poll: fl
 
 def _extract_contrato_nro_from_control_llamadas(timeout: float = 10.0) -> str | None:
     """
-    Abre/espera la ventana 'Control de Llamadas / Novedades' y extrae el texto del campo 'Contrato Nro:'.
-    Estrategia:
-      A) Buscar el Static 'Contrato Nro:' y tomar el Edit más cercano a su derecha.
-      B) Fallback: escoger un Edit que parezca contrato con patrón tipo '05-0791-26'.
+    Espera la ventana 'Control de Llamadas / Novedades' y extrae 'Contrato Nro:'.
+    Fallback: un campo con patrón tipo '05-0791-26'.
     """
     hwnd = _find_top_window_title_contains("Control de Llamadas / Novedades", timeout=timeout, poll=0.2)
     if not hwnd:
         return None
 
-    # 1) Enumerar hijos
-    children = _all_descendants(hwnd)
-
-    statics = []
-    edits = []
-
-    for h in children:
-        try:
-            if not win32gui.IsWindowVisible(h):
-                continue
-            cls = win32gui.GetClassName(h)
-            txt = (win32gui.GetWindowText(h) or "").strip()
-
-            l, t, r, b = win32gui.GetWindowRect(h)
-            w, hgt = (r - l), (b - t)
-
-            if cls == "Static" and txt:
-                statics.append((h, txt, l, t, r, b))
-            elif cls in ("Edit", "ThunderRT6TextBox", "ThunderRT6MaskedEdit", "ThunderRT6TextBox2"):
-                # filtrar edits muy grandes tipo textarea
-                if w <= 260 and hgt <= 40:
-                    edits.append((h, l, t, r, b))
-        except Exception:
-            continue
-
-    # 2) Buscar label "Contrato Nro"
-    label = None
-    for h, txt, l, t, r, b in statics:
-        if "contrato" in txt.lower() and "nro" in txt.lower():
-            label = (h, txt, l, t, r, b)
-            break
-
-    # 3) Si hallamos label, elegir el edit a la derecha, alineado en Y
-    if label and edits:
-        _, _, ll, lt, lr, lb = label
-
-        best = None
-        best_score = 10**9
-        for eh, el, et, er, eb in edits:
-            # debe estar a la derecha del label
-            if el < lr - 5:
-                continue
-            y = abs(et - lt)
-            xgap = abs(el - lr)
-            score = y * 4 + xgap
-            if score < best_score:
-                best_score = score
-                best = eh
-
-        if best:
-            val = _get_text(best)
-            val = (val or "").strip()
-            if val:
-                return val
-
-    # 4) Fallback: buscar un Edit con pinta de contrato (05-0791-26)
-    # patrón flexible: 2 dígitos - 3 a 5 dígitos - 2 dígitos
-    pat = re.compile(r"^\d{2}-\d{3,5}-\d{2}$")
-    candidates = []
-    for eh, el, et, er, eb in edits:
-        v = (_get_text(eh) or "").strip()
-        if not v:
-            continue
-        if pat.match(v):
-            return v
-        # guardar por si no matchea exacto pero tiene guiones
-        if "-" in v and len(v) <= 12:
-            candidates.append(v)
-
-    if candidates:
-        # devolver el “más parecido”
-        return sorted(candidates, key=len)[0]
-
-    return None
+    return Localizadores.contrato(ui(), hwnd)
 
 
 def _get_text(hwnd: int) -> str:
-    """Lee texto real del control (Edit VB6) usando WM_GETTEXT."""
+    """Lee texto real del control (Edit VB6) usando WM_GETTEXT (con timeout)."""
     try:
-        ln = win32gui.SendMessage(hwnd, WM_GETTEXTLENGTH, 0, 0)
-        if not ln or int(ln) <= 0:
-            return ""
-        buf = ctypes.create_unicode_buffer(int(ln) + 1)
-        win32gui.SendMessage(hwnd, WM_GETTEXT, int(ln) + 1, buf)
-        return (buf.value or "").strip()
+        return Mensajes.texto(hwnd)
+    except PiscoHung:
+        raise
     except Exception:
         # fallback muy suave
         try:
@@ -204,11 +145,13 @@ def _get_text(hwnd: int) -> str:
 def _set_text_wm(hwnd_edit: int, value: str) -> bool:
     """Setea texto al Edit sin depender del teclado (VB6 friendly)."""
     try:
-        win32gui.SendMessage(hwnd_edit, WM_SETTEXT, 0, str(value))
+        Mensajes.enviar(hwnd_edit, WM_SETTEXT, 0, str(value))
         time.sleep(0.05)
         _notify_parent_command_smart(hwnd_edit, EN_CHANGE)
         time.sleep(0.05)
         return True
+    except PiscoHung:
+        raise
     except Exception as e:
         logger.warning("WM_SETTEXT falló en edit=%s: %s", hwnd_edit, e)
         return False
@@ -256,12 +199,14 @@ def _type_cedula_robusto(hwnd_edit: int, cedula: str, retries: int = 3) -> None:
                 return
 
             logger.warning("Intento %s: no quedó la cédula. edit_text='%s'", k + 1, txt2)
+        except PiscoHung:
+            raise
         except Exception as e:
             logger.warning("Intento %s: error escribiendo cédula: %s", k + 1, e)
 
         time.sleep(0.12)
 
-    raise RuntimeError("No pude escribir la cédula en el campo correcto (Edit).")
+    raise CedulaNoEscrita("No pude escribir la cédula en el campo correcto (Edit).")
 
 
 def _dismiss_unexpected_mes_dialogs(timeout: float = 0.2) -> None:
@@ -278,7 +223,7 @@ def _dismiss_unexpected_mes_dialogs(timeout: float = 0.2) -> None:
         # Leer el texto completo del Static para saber cuál es
         texts = []
         def enum_child(ch, __):
-            if win32gui.GetClassName(ch) == "Static":
+            if CacheHwnd.clase(ch) == "Static":
                 txt = (win32gui.GetWindowText(ch) or "").strip()
                 if txt:
                     texts.append(txt)
@@ -326,7 +271,7 @@ def _area(hwnd: int) -> int:
 
 def _get_ctrl_id(hwnd: int) -> int:
     try:
-        return win32gui.GetDlgCtrlID(hwnd)
+        return CacheHwnd.ctrl_id(hwnd)
     except Exception:
         return 0
 
@@ -394,13 +339,13 @@ def _find_dialog_by_static_contains(substr: str, timeout: float = 10.0, poll: fl
             try:
                 if not win32gui.IsWindowVisible(hwnd):
                     return
-                if win32gui.GetClassName(hwnd) != "#32770":
+                if CacheHwnd.clase(hwnd) != "#32770":
                     return
 
                 texts = []
 
                 def enum_child(ch, __):
-                    if win32gui.GetClassName(ch) == "Static":
+                    if CacheHwnd.clase(ch) == "Static":
                         txt = (win32gui.GetWindowText(ch) or "").strip()
                         if txt:
                             texts.append(txt)
@@ -432,7 +377,7 @@ def _click_button_in_dialog(hwnd_dlg: int, label: str) -> bool:
         nonlocal btn_hwnd
         if btn_hwnd:
             return
-        if win32gui.GetClassName(hwnd) != "Button":
+        if CacheHwnd.clase(hwnd) != "Button":
             return
         txt = (win32gui.GetWindowText(hwnd) or "").strip().lower()
         if txt == target:
@@ -492,7 +437,7 @@ def _wait_combolbox(timeout: float = 2.0, poll: float = 0.05) -> int | None:
             try:
                 if not win32gui.IsWindowVisible(hwnd):
                     return
-                cls = win32gui.GetClassName(hwnd)
+                cls = CacheHwnd.clase(hwnd)
                 if cls == "ComboLBox":
                     found = hwnd
             except Exception:
@@ -510,19 +455,19 @@ def _wait_combolbox(timeout: float = 2.0, poll: float = 0.05) -> int | None:
 
 
 def _listbox_items(hwnd_lb: int) -> list[str]:
-    n = win32gui.SendMessage(hwnd_lb, LB_GETCOUNT, 0, 0)
+    n = Mensajes.enviar(hwnd_lb, LB_GETCOUNT, 0, 0)
     if not n or int(n) <= 0:
         return []
 
     items: list[str] = []
     for i in range(int(n)):
-        ln = win32gui.SendMessage(hwnd_lb, LB_GETTEXTLEN, i, 0)
+        ln = Mensajes.enviar(hwnd_lb, LB_GETTEXTLEN, i, 0)
         if ln is None or int(ln) < 0:
             items.append("")
             continue
 
         buf = ctypes.create_unicode_buffer(int(ln) + 1)
-        win32gui.SendMessage(hwnd_lb, LB_GETTEXT, i, buf)
+        Mensajes.enviar(hwnd_lb, LB_GETTEXT, i, buf)
         items.append((buf.value or "").strip())
 
     return items
@@ -554,7 +499,9 @@ def _combo_select_second_option(hwnd_cb: int, timeout: float = 3.0) -> bool:
 
     # abrir dropdown SOLO Win32
     try:
-        win32gui.SendMessage(hwnd_cb, CB_SHOWDROPDOWN, 1, 0)
+        Mensajes.enviar(hwnd_cb, CB_SHOWDROPDOWN, 1, 0)
+    except PiscoHung:
+        raise
     except Exception:
         pass
     time.sleep(0.10)
@@ -575,7 +522,7 @@ def _combo_select_second_option(hwnd_cb: int, timeout: float = 3.0) -> bool:
         return False
 
     # asegurar que hay al menos 2 items
-    n = win32gui.SendMessage(hwnd_lb, LB_GETCOUNT, 0, 0)
+    n = Mensajes.enviar(hwnd_lb, LB_GETCOUNT, 0, 0)
     if not n or int(n) < 2:
         logger.error("ComboLBox sin suficientes items. count=%s", n)
         send_keys("{ESC}")
@@ -601,7 +548,9 @@ def _combo_select_second_option(hwnd_cb: int, timeout: float = 3.0) -> bool:
 
     # cerrar dropdown sin disparar acciones (ENTER a veces activa "Buscar")
     try:
-        win32gui.SendMessage(hwnd_cb, CB_SHOWDROPDOWN, 0, 0)
+        Mensajes.enviar(hwnd_cb, CB_SHOWDROPDOWN, 0, 0)
+    except PiscoHung:
+        raise
     except Exception:
         pass
     send_keys("{ESC}")  # respaldo
@@ -664,7 +613,7 @@ def _find_controls_for_busqueda(hwnd_container: int):
             if not win32gui.IsWindowVisible(h):
                 continue
 
-            cls = win32gui.GetClassName(h)
+            cls = CacheHwnd.clase(h)
             txt = (win32gui.GetWindowText(h) or "").strip()
             l, t, r, b = _rect(h)
             w, hgt = (r - l), (b - t)
@@ -731,16 +680,6 @@ def _find_controls_for_busqueda(hwnd_container: int):
 
     return combo, edit, lupa
 
-def _is_in_top_bar(hwnd: int, main_hwnd: int, margin_top: int = 180) -> bool:
-    """Filtra controles que están en la franja superior (donde está edit+combo+lupa)."""
-    try:
-        ml, mt, mr, mb = win32gui.GetWindowRect(main_hwnd)
-        l, t, r, b = win32gui.GetWindowRect(hwnd)
-        return (t >= mt) and (t <= mt + margin_top)
-    except Exception:
-        return False
-
-
 def _all_descendants(hwnd_parent: int) -> list[int]:
     out: list[int] = []
     def cb(h, _):
@@ -762,94 +701,27 @@ def _wait_busqueda_controls(main_win, timeout: float = 45.0, poll: float = 0.25)
 
     MAIN = main_win.handle
 
+    # Huella de layout (corridas anteriores): directo por ctrl ids, sin recorrer el árbol
+    hl = huellas()
+    combo = hl.resolver("busqueda.combo", MAIN)
+    edit = hl.resolver("busqueda.edit", MAIN) if combo else None
+    if combo and edit:
+        return MAIN, combo, edit, hl.resolver("busqueda.lupa", MAIN)
+
     while time.time() - t0 < timeout:
         try:
-            hwnds = _all_descendants(MAIN)
-
-            combos = []
-            edits = []
-            clickables = []
-
-            for h in hwnds:
-                try:
-                    if not win32gui.IsWindowVisible(h):
-                        continue
-                    if not _is_in_top_bar(h, MAIN, margin_top=220):
-                        continue
-
-                    cls = win32gui.GetClassName(h)
-                    txt = (win32gui.GetWindowText(h) or "").strip()
-                    l, t, r, b = win32gui.GetWindowRect(h)
-                    w, hgt = (r - l), (b - t)
-
-                    # Combo (dropdown)
-                    if cls in ("ComboBox", "ComboBoxEx32", "ThunderRT6ComboBox", "ThunderComboBox"):
-                        # combos muy pequeños suelen ser basura, filtramos
-                        if w >= 120 and hgt >= 18:
-                            combos.append((h, l, t, r, b, w, hgt, txt, cls))
-
-                    # Edit (campo texto)
-                    elif cls in ("Edit", "ThunderRT6TextBox"):
-                        # el edit de la barra suele ser ancho medio
-                        if w >= 80 and hgt >= 18:
-                            edits.append((h, l, t, r, b, w, hgt, txt, cls))
-
-                    # Posible lupa (a veces no es Button)
-                    elif cls in ("Button", "Static", "ToolbarWindow32", "ThunderRT6PictureBox", "ThunderRT6CommandButton"):
-                        # la lupa es un cuadrito pequeño
-                        if w <= 60 and hgt <= 60:
-                            clickables.append((h, l, t, r, b, w, hgt, txt, cls))
-
-                except Exception:
-                    continue
-
-            if not combos:
-                last_err = RuntimeError("No encontré ningún Combo en la barra superior.")
-                time.sleep(poll)
-                continue
-
-            # Elegir el combo "de criterio" = normalmente el más ancho de la barra
-            combo = max(combos, key=lambda x: x[5])[0]
-            cl, ct, cr, cb = win32gui.GetWindowRect(combo)
-
-            # Elegir edit más cercano a la izquierda del combo y alineado en Y
-            best_edit = None
-            best_score = 10**9
-            for e in edits:
-                eh, el, et, er, eb, ew, ehgt, etxt, ecls = e
-                # Queremos edit a la izquierda del combo y en la misma “fila”
-                if er > cl:  # si el edit está pasando el combo, no es el que queremos
-                    continue
-                y = abs(et - ct)
-                xgap = abs(cl - er)
-                score = y * 3 + xgap
-                if score < best_score:
-                    best_score = score
-                    best_edit = eh
-
-            if not best_edit:
-                last_err = RuntimeError("Encontré Combo, pero no hallé Edit candidato alineado a su izquierda.")
-                time.sleep(poll)
-                continue
+            combo, edit, lupa = Localizadores.busqueda(ui(), MAIN)
+            grabador().grabar("busqueda", MAIN, {"combo": combo, "edit": edit, "lupa": lupa})
 
-            edit = best_edit
-
-            # Lupa: lo más cercano al borde derecho del combo (si existe como control)
-            lupa = None
-            best_lupa_score = 10**9
-            for it in clickables:
-                hh, l, t, r, b, w, hgt, txt, cls = it
-                dx = abs(l - cr)
-                dy = abs(t - ct)
-                score = dx + dy
-                if score < best_lupa_score:
-                    best_lupa_score = score
-                    lupa = hh
-
-            # ¡Listo!
+            # ¡Listo! (y se guarda la huella para la próxima)
+            for nombre, h in (("busqueda.combo", combo), ("busqueda.edit", edit), ("busqueda.lupa", lupa)):
+                if h:
+                    hl.registrar(nombre, MAIN, h)
             hwnd_container = MAIN  # ya no dependemos de contenedor especial
             return hwnd_container, combo, edit, lupa
 
+        except PiscoHung:
+            raise
         except Exception as e:
             last_err = e
 
@@ -861,6 +733,50 @@ def _wait_busqueda_controls(main_win, timeout: float = 45.0, poll: float = 0.25)
     )
 
 
+# ----------------------------------------------------------
+# Config de captura
+# ----------------------------------------------------------
+@dataclass
+class CapturaConfig:
+    """
+    [captura] en config.ini (todo opcional):
+      modo = individual     (una búsqueda por cédula, como antes)
+           | conciliacion   (listado mensual en bloque + búsqueda individual solo de faltantes)
+      entrada = global      (mouse + teclado + foco, como antes)
+              | mensajes    (solo mensajes de ventana: corre minimizado / sesión bloqueada)
+    """
+    modo: str = "individual"
+    # entrada = mensajes (WM_SETTEXT/CB_SETCURSEL/BM_CLICK, sin mouse ni foco) | global (click + teclado)
+    entrada: str = "global"
+    # [campos_extra] cabecera en la hoja = label del formulario, ej:
+    #   Contrato = Contrato Nro
+    #   Fecha Orden = Fecha Servicio
+    campos_extra: dict[str, str] = field(default_factory=dict)
+
+
+def load_captura_config(path: str) -> CapturaConfig:
+    cp = configparser.ConfigParser()
+    cp.optionxform = str  # conservar mayúsculas de las cabeceras de la hoja
+    cp.read(path, encoding="utf-8")
+    modo = (cp.get("captura", "modo", fallback="individual") or "").strip().lower()
+    if modo not in ("conciliacion", "individual"):
+        logger.warning("[captura] modo=%s desconocido. Uso 'individual'.", modo)
+        modo = "individual"
+
+    entrada = (cp.get("captura", "entrada", fallback="global") or "").strip().lower()
+    if entrada not in ("mensajes", "global"):
+        logger.warning("[captura] entrada=%s desconocida. Uso 'global'.", entrada)
+        entrada = "global"
+
+    campos_extra: dict[str, str] = {}
+    if "campos_extra" in cp:
+        for col, label in cp["campos_extra"].items():
+            if col.strip() and (label or "").strip():
+                campos_extra[col.strip()] = label.strip()
+
+    return CapturaConfig(modo=modo, entrada=entrada, campos_extra=campos_extra)
+
+
 # ----------------------------------------------------------
 # API pública
 # ----------------------------------------------------------
@@ -879,30 +795,248 @@ def abrir_capturar_servicios(main_win) -> None:
     w.menu_select("Archivo->Capturar Servicios")
 
 
-def aceptar_popup_mes_servicios(timeout: int = 20) -> dict:
+MESES = (
+    "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre",
+)
+
+_FECHA_PATRONES = (
+    (re.compile(r"^(\d{4})[-/](\d{1,2})[-/](\d{1,2})"), (1, 2)),   # 2026-02-17
+    (re.compile(r"^(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})"), (3, 2)),  # 17/02/2026
+    (re.compile(r"^(\d{1,2})[-/.](\d{1,2})[-/.](\d{2})\b"), (3, 2)),  # 17/02/26
+)
+
+
+def mes_de_fecha(valor: str) -> tuple[int, int] | None:
+    """'17/02/2026' -> (2026, 2). None si no se reconoce."""
+    v = (valor or "").strip()
+    for pat, (iy, im) in _FECHA_PATRONES:
+        m = pat.match(v)
+        if m:
+            y, mes = int(m.group(iy)), int(m.group(im))
+            if y < 100:
+                y += 2000
+            if 1 <= mes <= 12:
+                return y, mes
+    return None
+
+
+def _combo_items(hwnd_cb: int) -> list[str]:
+    n = Mensajes.enviar(hwnd_cb, CB_GETCOUNT, 0, 0)
+    if not n or int(n) <= 0:
+        return []
+    items: list[str] = []
+    for i in range(int(n)):
+        ln = Mensajes.enviar(hwnd_cb, CB_GETLBTEXTLEN, i, 0)
+        if ln is None or int(ln) < 0:
+            items.append("")
+            continue
+        buf = ctypes.create_unicode_buffer(int(ln) + 1)
+        Mensajes.enviar(hwnd_cb, CB_GETLBTEXT, i, buf)
+        items.append((buf.value or "").strip())
+    return items
+
+
+def _combo_set_index(hwnd_cb: int, idx: int) -> bool:
+    """
+    CB_SETCURSEL + WM_COMMAND/CBN_SELCHANGE SÍNCRONO al padre (VB6 corre su
+    Click y actualiza .Text antes de volver). Verifica el texto del combo
+    contra el item pedido; CB_GETCURSEL devolvería idx aunque VB6 no se enterara.
+    """
+    items = _combo_items(hwnd_cb)
+    if not 0 <= idx < len(items):
+        return False
+    Mensajes.enviar(hwnd_cb, CB_SETCURSEL, idx, 0)
+    parent = win32gui.GetParent(hwnd_cb)
+    if parent:
+        wparam = (CBN_SELCHANGE << 16) | (_get_ctrl_id(hwnd_cb) & 0xFFFF)
+        Mensajes.enviar(parent, win32con.WM_COMMAND, wparam, hwnd_cb)
+    return _norm(Mensajes.texto(hwnd_cb)) == _norm(items[idx])
+
+
+# _set_mes_en_dialogo: el mes quedó pero el diálogo no tiene control de año
+MES_SIN_ANIO = "mes_sin_anio"
+
+
+def _set_mes_en_dialogo(hwnd_dlg: int, anio: int, mes: int) -> bool | str:
+    """
+    Ajusta el mes del popup 'Mes a Visualizar Servicios'. Soporta:
+    - Combo de meses (Enero..Diciembre) y/o combo de años
+    - Edit/MaskedEdit con 'MM/AAAA' o 'DD/MM/AAAA'
+    Retorna True si quedaron mes y año pedidos, False si no, y MES_SIN_ANIO
+    si quedó el mes pero no hay control de año (el año no está verificado).
+    """
+    ok_mes = False
+    ok_anio = None  # None = el diálogo no tiene año explícito
+
+    for h in _all_descendants(hwnd_dlg):
+        try:
+            if not win32gui.IsWindowVisible(h):
+                continue
+            cls = CacheHwnd.clase(h)
+
+            if cls in ("ComboBox", "ThunderRT6ComboBox", "ThunderComboBox"):
+                items = [_norm(x) for x in _combo_items(h)]
+                if any(x in MESES for x in items):
+                    idx = next((i for i, x in enumerate(items) if x == MESES[mes - 1]), None)
+                    ok_mes = idx is not None and _combo_set_index(h, idx)
+                elif items and all(re.fullmatch(r"\d{4}", x) for x in items if x):
+                    idx = next((i for i, x in enumerate(items) if x == str(anio)), None)
+                    ok_anio = idx is not None and _combo_set_index(h, idx)
+
+            elif cls in ("Edit", "ThunderRT6TextBox", "ThunderRT6MaskedEdit"):
+                cur = _get_text(h)
+                if re.fullmatch(r"\d{1,2}/\d{4}", cur):
+                    nuevo = f"{mes:02d}/{anio}"
+                elif re.fullmatch(r"\d{1,2}/\d{1,2}/\d{4}", cur):
+                    nuevo = f"01/{mes:02d}/{anio}"
+                elif _norm(cur) in MESES:
+                    nuevo = MESES[mes - 1].capitalize()
+                elif re.fullmatch(r"\d{4}", cur):
+                    _set_text_wm(h, str(anio))
+                    ok_anio = _get_text(h) == str(anio)
+                    continue
+                else:
+                    continue
+                _set_text_wm(h, nuevo)
+                ok_mes = _get_text(h) == nuevo
+        except PiscoHung:
+            raise
+        except Exception as e:
+            logger.debug("Popup mes: control %s no ajustable: %s", h, e)
+            continue
+
+    if ok_mes and ok_anio is None:
+        return MES_SIN_ANIO
+    return ok_mes and ok_anio is True
+
+
+def _anios_visibles(hwnd_dlg: int) -> set[int]:
+    """Años (19xx/20xx) que muestran el título y los controles del diálogo."""
+    anios: set[int] = set()
+    for h in [hwnd_dlg] + list(_all_descendants(hwnd_dlg)):
+        try:
+            if h != hwnd_dlg and not win32gui.IsWindowVisible(h):
+                continue
+            txt = _get_text(h)
+        except PiscoHung:
+            raise
+        except Exception:
+            continue
+        anios.update(int(y) for y in re.findall(r"\b((?:19|20)\d{2})\b", txt or ""))
+    return anios
+
+
+def aceptar_popup_mes_servicios(timeout: int = 20, mes: tuple[int, int] | None = None) -> dict:
+    """
+    Acepta el popup 'Mes a Visualizar Servicios'.
+    mes=(año, mes): antes de aceptar intenta seleccionar ese mes.
+    El resultado trae "mes_aplicado": True solo si el diálogo quedó (releído)
+    en el mes pedido; con mes=None no se toca y es True. Si el diálogo no
+    tiene control de año, el año se confirma releyendo los textos del
+    diálogo; si no aparece (o aparece otro), mes_aplicado es False.
+    """
     hwnd = _find_mes_servicios_dialog(timeout=timeout)
     if not hwnd:
         raise TimeoutError("No apareció el popup de 'Mes a Visualizar Servicios'.")
 
+    # solo cuenta lo que el diálogo confirma: el default del popup no es garantía de mes
+    mes_aplicado = mes is None
+    if mes is not None:
+        res = _set_mes_en_dialogo(hwnd, mes[0], mes[1])
+        if res == MES_SIN_ANIO:
+            anios = _anios_visibles(hwnd)
+            res = anios == {mes[0]}
+            if not res:
+                logger.warning(
+                    "Popup mes servicios: sin control de año y el diálogo muestra %s (pedido %s); no lo doy por aplicado.",
+                    sorted(anios) or "ningún año", mes[0],
+                )
+        mes_aplicado = res is True
+        if not mes_aplicado:
+            logger.warning("Popup mes servicios: no pude seleccionar %04d-%02d.", mes[0], mes[1])
+
     if _click_button_in_dialog(hwnd, "Aceptar"):
-        return {"ok": True}
+        return {"ok": True, "mes": mes, "mes_aplicado": mes_aplicado}
 
     # fallback ENTER
     win32gui.PostMessage(hwnd, win32con.WM_KEYDOWN, win32con.VK_RETURN, 0)
     win32gui.PostMessage(hwnd, win32con.WM_KEYUP, win32con.VK_RETURN, 0)
-    return {"ok": True, "fallback": "ENTER"}
+    return {"ok": True, "fallback": "ENTER", "mes": mes, "mes_aplicado": mes_aplicado}
 
 
-def capturar_servicios_desde_menu(main_win, timeout_popup: int = 20) -> dict:
+def capturar_servicios_desde_menu(main_win, timeout_popup: int = 20, mes: tuple[int, int] | None = None) -> dict:
     abrir_capturar_servicios(main_win)
 
     # a veces demora en cargar el form y/o el popup
     time.sleep(0.8)
 
-    res = aceptar_popup_mes_servicios(timeout=timeout_popup)
+    res = aceptar_popup_mes_servicios(timeout=timeout_popup, mes=mes)
     logger.info("Popup mes servicios aceptado: %s", res)
     return res
 
+# ----------------------------------------------------------
+# Listado mensual de servicios (conciliación en bloque)
+# ----------------------------------------------------------
+_PAT_ORDEN = Localizadores.PAT_ORDEN  # ej: 05-0791-26
+
+
+class ListadoSinFallecido(RuntimeError):
+    """El grid del listado mensual expone cabeceras pero ninguna es la cédula del fallecido."""
+
+
+def listar_servicios_mes(main_win, cedulas=(), timeout: float = 15.0) -> list[dict]:
+    """
+    Lee EN BLOQUE el grid de servicios del mes (pantalla Capturar Servicios,
+    después del popup 'Mes a Visualizar Servicios').
+    Retorna [{"cedula", "no_orden", "contrato"}]. [] si no hay grid legible.
+    `cedulas` ayuda a ubicar columnas cuando el grid no expone cabeceras.
+    ListadoSinFallecido si expone cabeceras pero no la cédula del fallecido.
+    """
+    MAIN = main_win.handle
+    hwnd_grid = None
+    t0 = time.time()
+    while time.time() - t0 < timeout and not hwnd_grid:
+        hwnd_grid = PISCO._find_grid_hwnd(MAIN)
+        if not hwnd_grid:
+            time.sleep(0.3)
+
+    if not hwnd_grid:
+        logger.warning("Listado mensual: no encontré grid de servicios en la ventana principal.")
+        return []
+
+    headers, filas = PISCO.leer_grid(MAIN, hwnd_grid)
+    return servicios_de_grid(headers, filas, cedulas)
+
+
+def servicios_de_grid(headers: list[str], filas: list[list[str]], cedulas=()) -> list[dict]:
+    """(cabeceras, filas) del grid del mes -> [{"cedula", "no_orden", "contrato"}]."""
+    # portapapeles: la 1ra fila suele ser cabecera (texto sin dígitos)
+    if not headers and filas and not any(any(ch.isdigit() for ch in (v or "")) for v in filas[0]):
+        headers, filas = filas[0], filas[1:]
+
+    if headers and Localizadores.columnas_ordenes(headers, [], ()).get("cedula") is None:
+        # emparejar por otra cédula (titular, afiliado) daría órdenes de otra persona
+        raise ListadoSinFallecido(f"Listado mensual sin columna de cédula del fallecido. headers={headers}")
+
+    cols = Localizadores.columnas_ordenes(headers, filas, cedulas)
+    if "cedula" not in cols or "no_orden" not in cols:
+        logger.warning("Listado mensual: no pude ubicar columnas cédula/orden. headers=%s", headers)
+        return []
+
+    out = []
+    for f in filas:
+        def cel(k):
+            j = cols.get(k)
+            return (f[j] or "").strip() if j is not None and j < len(f) else ""
+
+        if cel("cedula") and cel("no_orden"):
+            out.append({"cedula": cel("cedula"), "no_orden": cel("no_orden"), "contrato": cel("contrato")})
+
+    logger.info("Listado mensual: filas_grid=%s | servicios=%s | columnas=%s", len(filas), len(out), cols)
+    return out
+
+
 def _find_busqueda_no_encontro(timeout: float = 0.8) -> int | None:
     # cubre: "No se encontro registro alguno bajo este criterio"
     hwnd = _find_dialog_by_static_contains("no se encontro registro", timeout=timeout, poll=0.05)
@@ -927,6 +1061,54 @@ def _click_lupa_relativo_al_combo(hwnd_combo: int) -> None:
     time.sleep(0.08)
 
 
+# ----------------------------------------------------------
+# Entrada solo por mensajes (sin mouse, teclado ni foco)
+# ----------------------------------------------------------
+MK_LBUTTON = 0x0001
+CWP_SKIPINVISIBLE = 0x0001
+BOTONES = ("Button", "ThunderRT6CommandButton")
+
+
+def _escribir_edit_mensajes(hwnd_edit: int, valor: str) -> bool:
+    """WM_SETTEXT (síncrono) + EN_CHANGE al padre; verifica leyendo el texto."""
+    try:
+        Mensajes.enviar(hwnd_edit, WM_SETTEXT, 0, str(valor))
+    except PiscoHung:
+        raise
+    except Exception as e:
+        logger.warning("WM_SETTEXT falló en edit=%s: %s", hwnd_edit, e)
+        return False
+    _notify_parent_command_smart(hwnd_edit, EN_CHANGE)
+    return _get_text(hwnd_edit) == str(valor)
+
+
+def _post_click_cliente(hwnd: int, x_scr: int, y_scr: int) -> None:
+    """WM_LBUTTONDOWN/UP posteados al control con coordenadas cliente (el cursor no se mueve)."""
+    cx, cy = win32gui.ScreenToClient(hwnd, (x_scr, y_scr))
+    lparam = ((cy & 0xFFFF) << 16) | (cx & 0xFFFF)
+    win32gui.PostMessage(hwnd, win32con.WM_LBUTTONDOWN, MK_LBUTTON, lparam)
+    win32gui.PostMessage(hwnd, win32con.WM_LBUTTONUP, 0, lparam)
+
+
+def _click_lupa_mensajes(hwnd_combo: int, hwnd_lupa: int | None) -> None:
+    """
+    Lupa por mensajes: el control detectado, o el hijo del padre del combo que
+    está 14px a su derecha (mismo punto que el click físico de antes).
+    """
+    if hwnd_lupa and CacheHwnd.clase(hwnd_lupa) in BOTONES:
+        win32gui.PostMessage(hwnd_lupa, win32con.BM_CLICK, 0, 0)
+        return
+
+    l, t, r, b = _rect(hwnd_combo)
+    x, y = r + 14, (t + b) // 2
+    parent = win32gui.GetParent(hwnd_combo) or hwnd_combo
+    destino = win32gui.ChildWindowFromPointEx(parent, win32gui.ScreenToClient(parent, (x, y)), CWP_SKIPINVISIBLE)
+    if destino and CacheHwnd.clase(destino) in BOTONES:
+        win32gui.PostMessage(destino, win32con.BM_CLICK, 0, 0)
+    else:
+        _post_click_cliente(destino or parent, x, y)
+
+
 import re
 
 # ----------------------------------------------------------
@@ -955,77 +1137,37 @@ def _close_control_llamadas(timeout: float = 8.0) -> bool:
 # NUEVO: capturar "No Orden Servicio" del MAIN
 # (busca label Static y toma el Edit más cercano a la derecha)
 # ----------------------------------------------------------
-def _extract_no_orden_servicio_from_main(main_win, timeout: float = 8.0) -> str | None:
-    pat = re.compile(r"^\d{2}-\d{3,5}-\d{2}$")  # ej: 05-0791-26
-
+def leer_campos_servicio(main_win, timeout: float = 8.0) -> dict[str, str]:
+    """
+    Scrape del registro de servicio en el formulario principal (una pasada por
+    intento): {label normalizado: valor}. Reintenta hasta que aparezca
+    'No Orden Servicio' (o un campo con su patrón) o venza el timeout.
+    """
+    campos: dict[str, str] = {}
     t0 = time.time()
     while time.time() - t0 < timeout:
         try:
-            MAIN = main_win.handle
-            kids = _all_descendants(MAIN)
-
-            statics = []
-            edits = []
-
-            for h in kids:
-                try:
-                    if not win32gui.IsWindowVisible(h):
-                        continue
-                    cls = win32gui.GetClassName(h)
-                    txt = (win32gui.GetWindowText(h) or "").strip()
-                    l, t, r, b = win32gui.GetWindowRect(h)
-                    w, hgt = (r - l), (b - t)
-
-                    if cls == "Static" and txt:
-                        statics.append((h, txt, l, t, r, b))
-                    elif cls in ("Edit", "ThunderRT6TextBox", "ThunderRT6MaskedEdit"):
-                        # el de "No Orden Servicio" es pequeño/mediano, no textarea gigante
-                        if w <= 260 and hgt <= 40:
-                            edits.append((h, l, t, r, b))
-                except Exception:
-                    continue
-
-            # 1) Label exacto por texto
-            label = None
-            for _, txt, ll, lt, lr, lb in statics:
-                low = txt.lower()
-                if "orden servicio" in low:  # cubre "* No Orden Servicio:"
-                    label = (ll, lt, lr, lb)
-                    break
-
-            # 2) Si hay label, escoger edit a la derecha
-            if label and edits:
-                ll, lt, lr, lb = label
-                best = None
-                best_score = 10**9
-
-                for eh, el, et, er, eb in edits:
-                    if el < lr - 5:
-                        continue
-                    y = abs(et - lt)
-                    xgap = abs(el - lr)
-                    score = y * 4 + xgap
-                    if score < best_score:
-                        best_score = score
-                        best = eh
-
-                if best:
-                    v = (_get_text(best) or "").strip()
-                    if v:
-                        return v
-
-            # 3) Fallback: algún edit con patrón "05-0791-26"
-            for eh, *_ in edits:
-                v = (_get_text(eh) or "").strip()
-                if pat.match(v):
-                    return v
-
+            campos, ctrl = Localizadores.campos_servicio(ui(), main_win.handle)
+            if ctrl is not None:
+                grabador().grabar("servicio", main_win.handle, {"no_orden": ctrl.hwnd})
+                huellas().registrar("servicio.no_orden", main_win.handle, ctrl.hwnd)
+                return campos
+        except PiscoHung:
+            raise
         except Exception:
             pass
-
         time.sleep(0.2)
+    return campos
 
-    return None
+
+def _extract_no_orden_servicio_from_main(main_win, timeout: float = 8.0) -> str | None:
+    # camino corto: el campo por huella de layout
+    h = huellas().resolver("servicio.no_orden", main_win.handle)
+    if h:
+        v = _get_text(h)
+        if _PAT_ORDEN.match(v):
+            return v
+    return Formulario.buscar(leer_campos_servicio(main_win, timeout=timeout), "orden servicio")
 
 
 # ----------------------------------------------------------
@@ -1036,38 +1178,56 @@ def buscar_por_cedula_fallecido(
     criterio_text: str = "Por Cedula del Fallecido",
     cedula: str = "8349505",
     timeout_form: int = 45,
+    entrada: str = "global",
 ) -> dict:
-    main_win.set_focus()
-    time.sleep(10)
+    """
+    entrada="mensajes": WM_SETTEXT / CB_SETCURSEL / BM_CLICK, sin mouse, teclado
+    ni foco (funciona minimizado o con la sesión bloqueada). Si un paso no
+    verifica, ese paso cae al método con entrada global.
+    entrada="global": click + teclado + foco (comportamiento anterior).
+    """
+    por_mensajes = entrada == "mensajes"
+
+    if not por_mensajes:
+        main_win.set_focus()
+        time.sleep(10)
 
     _dismiss_unexpected_mes_dialogs(timeout=0.8)
 
     # A) Ubicar barra (edit + combo + lupa)
-    hwnd_container, combo, edit, _lupa = _wait_busqueda_controls(main_win, timeout=timeout_form)
-    logger.info("BUSQUEDA A combo=%s edit=%s", combo, edit)
+    hwnd_container, combo, edit, lupa = _wait_busqueda_controls(main_win, timeout=timeout_form)
+    logger.info("BUSQUEDA A combo=%s edit=%s entrada=%s", combo, edit, entrada)
 
     # 1) escribir cédula
-    _type_cedula_robusto(edit, cedula, retries=4)
-    time.sleep(0.20)
+    if not (por_mensajes and _escribir_edit_mensajes(edit, cedula)):
+        _type_cedula_robusto(edit, cedula, retries=4)
+        time.sleep(0.20)
 
     # 2) seleccionar 2da opción (Por Cédula...)
-    ok = False
-    for _ in range(3):
+    ok = por_mensajes and _combo_set_index(combo, 1)
+    if not ok and por_mensajes:
+        logger.warning("CB_SETCURSEL no quedó en el combo=%s; uso el método con mouse.", combo)
+    for _ in range(0 if ok else 3):
         ok = _combo_select_second_option(combo, timeout=6.0)
         if ok:
             break
         time.sleep(0.25)
     if not ok:
-        raise RuntimeError("No pude seleccionar la 2da opción del combo (Por Cédula del Fallecido).")
+        raise ComboNoSeleccionado("No pude seleccionar la 2da opción del combo (Por Cédula del Fallecido).")
 
     # 3) re-escribir cédula (VB6 a veces recalcula)
-    time.sleep(0.25)
-    _, combo2, edit2, _ = _wait_busqueda_controls(main_win, timeout=8.0)
-    _type_cedula_robusto(edit2, cedula, retries=3)
+    if not por_mensajes:
+        time.sleep(0.25)
+    _, combo2, edit2, lupa2 = _wait_busqueda_controls(main_win, timeout=8.0)
+    if not (por_mensajes and _escribir_edit_mensajes(edit2, cedula)):
+        _type_cedula_robusto(edit2, cedula, retries=3)
 
     # 4) click lupa
-    time.sleep(0.10)
-    _click_lupa_relativo_al_combo(combo2)
+    if por_mensajes:
+        _click_lupa_mensajes(combo2, lupa2 or lupa)
+    else:
+        time.sleep(0.10)
+        _click_lupa_relativo_al_combo(combo2)
 
     # ✅ PRIMERO: si aparece "No se encontró registro..." -> cerrar y salir
     time.sleep(0.35)
@@ -1079,18 +1239,28 @@ def buscar_por_cedula_fallecido(
     hwnd_err = _find_error13_dialog(timeout=1.2)
     if hwnd_err:
         _close_dialog_ok(hwnd_err)
-        raise RuntimeError("PISCO Error 13: No coinciden los tipos (al buscar por cédula).")
+        raise ErrorTipos13("PISCO Error 13: No coinciden los tipos (al buscar por cédula).")
 
-    # D) esperar "Control de Llamadas / Novedades" (si aparece) y cerrarla
-    _ = _find_top_window_title_contains("Control de Llamadas / Novedades", timeout=12.0, poll=0.2)
+    # D) esperar "Control de Llamadas / Novedades" (si aparece): leer sus campos y cerrarla
+    campos: dict[str, str] = {}
+    hwnd_llamadas = _find_top_window_title_contains("Control de Llamadas / Novedades", timeout=12.0, poll=0.2)
+    if hwnd_llamadas:
+        campos.update(Formulario.leer_formulario(hwnd_llamadas))
     _close_control_llamadas(timeout=2.0)
 
-    # E) capturar "No Orden Servicio"
-    no_orden = _extract_no_orden_servicio_from_main(main_win, timeout=8.0)
+    # E) capturar el registro de servicio completo (No Orden Servicio + resto de campos)
+    campos.update(leer_campos_servicio(main_win, timeout=8.0))
+    no_orden = Formulario.buscar(campos, "orden servicio")
     if no_orden:
-        logger.info("✅ No Orden Servicio capturado: %s", no_orden)
+        logger.info("✅ No Orden Servicio capturado: %s (campos=%s)", no_orden, len(campos))
     else:
         logger.warning("No pude capturar 'No Orden Servicio' del formulario principal.")
 
-    return {"ok": True, "criterio": "Por Cédula del Fallecido", "cedula": cedula, "no_orden_servicio": no_orden}
+    return {
+        "ok": True,
+        "criterio": "Por Cédula del Fallecido",
+        "cedula": cedula,
+        "no_orden_servicio": no_orden,
+        "campos": campos,
+    }
 
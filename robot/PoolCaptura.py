@@ -0,0 +1,243 @@
+# robot/PoolCaptura.py
+# ==========================================
+# PoolCaptura.py – reparto de búsquedas por cédula por mes, detrás de drivers
+#
+# Hoy main.py corre el Coordinador con UN driver: la sesión PISCO local
+# (DriverFunciones). Lo que aporta es el orden por afinidad de mes y el
+# contrato de resultados; una segunda sesión (otro escritorio / VM con su
+# PISCO) se suma implementando Driver, sin tocar main.
+#
+# Coordinador + trabajadores detrás de una interfaz de driver:
+#   - Driver.buscar(cedula, mes) -> (out, err, mes_correcto)
+#     out tiene el contrato de buscar_por_cedula_fallecido; err es la excepción
+#     si la búsqueda falló (se clasifica afuera, ver Reintentos).
+#   - Cada driver es dueño de SU sesión (ventana, mes abierto, watchdog).
+#
+# Reparto: una cola por mes. Cada trabajador sigue con el mes que ya tiene
+# abierto (evita reabrir Capturar Servicios) y al vaciarlo toma el mes con
+# más pendientes => balanceo sin asignación fija.
+#
+# El driver 0 corre en el hilo que llama (la sesión local de pywinauto no se
+# comparte entre hilos); el resto en un hilo cada uno. Los resultados se
+# entregan de a uno a `al_resultado`, serializados con un lock.
+#
+# FakeDriver: driver en proceso (sin Win32) para probar reparto, balanceo y
+# unión de resultados en Linux (tests/test_pool_captura.py).
+# ==========================================
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("Robot62.PoolCaptura")
+
+Salida = Tuple[Optional[dict], Optional[Exception], bool]  # (out, err, mes_correcto)
+
+
+@dataclass
+class Resultado:
+    key: Any
+    cedula: str
+    mes: Any
+    out: Optional[dict]
+    err: Optional[Exception]
+    mes_correcto: bool
+    trabajador: str
+
+
+@dataclass
+class EstadisticaTrabajador:
+    busquedas: int = 0
+    ocupado_s: float = 0.0
+    meses: List[Any] = field(default_factory=list)
+
+
+# ==========================================================
+# Drivers
+# ==========================================================
+class Driver(ABC):
+    """Una sesión PISCO capaz de buscar cédulas en un mes dado."""
+
+    nombre = "driver"
+
+    @abstractmethod
+    def buscar(self, cedula: str, mes: Any) -> Salida:
+        """(out, err, mes_correcto) de una búsqueda; abre el mes si no es el actual."""
+
+    def cerrar(self) -> None:
+        pass
+
+
+class DriverFunciones(Driver):
+    """Driver armado con funciones (ej. la sesión local de main.py)."""
+
+    def __init__(self, nombre: str, buscar: Callable[[str, Any], Salida], cerrar: Optional[Callable[[], None]] = None):
+        self.nombre = nombre
+        self._buscar = buscar
+        self._cerrar = cerrar
+
+    def buscar(self, cedula: str, mes: Any) -> Salida:
+        return self._buscar(cedula, mes)
+
+    def cerrar(self) -> None:
+        if self._cerrar:
+            self._cerrar()
+
+
+class FakeDriver(Driver):
+    """
+    Driver en proceso para pruebas.
+      ordenes: {cedula_normalizada: no_orden}; lo que no está => NO_ENCONTRADO
+      latencia_s: tiempo por búsqueda; latencia_mes_s: costo de cambiar de mes
+      fallar: {cedula: excepción} que se retorna como err
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        ordenes: Dict[str, str],
+        latencia_s: float = 0.0,
+        latencia_mes_s: float = 0.0,
+        fallar: Optional[Dict[str, Exception]] = None,
+    ):
+        self.nombre = nombre
+        self.ordenes = ordenes
+        self.latencia_s = latencia_s
+        self.latencia_mes_s = latencia_mes_s
+        self.fallar = fallar or {}
+        self.mes_abierto: Any = None
+        self.cambios_mes = 0
+        self.buscadas: List[str] = []
+
+    def buscar(self, cedula: str, mes: Any) -> Salida:
+        if mes != self.mes_abierto:
+            self.cambios_mes += 1
+            self.mes_abierto = mes
+            if self.latencia_mes_s:
+                time.sleep(self.latencia_mes_s)
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+        self.buscadas.append(cedula)
+
+        if cedula in self.fallar:
+            return None, self.fallar[cedula], True
+        no_orden = self.ordenes.get(cedula)
+        if not no_orden:
+            return {"ok": False, "motivo": "NO_ENCONTRADO", "cedula": cedula}, None, True
+        return {"ok": True, "cedula": cedula, "no_orden_servicio": no_orden, "campos": {}}, None, True
+
+
+# ==========================================================
+# Coordinador
+# ==========================================================
+class _Colas:
+    """Pendientes por mes con afinidad: cada trabajador sigue en su mes mientras haya."""
+
+    def __init__(self, trabajo: Dict[Any, Sequence[Tuple[Any, str]]]):
+        self._por_mes: Dict[Any, List[Tuple[Any, str]]] = {m: list(reversed(v)) for m, v in trabajo.items() if v}
+        self._lock = threading.Lock()
+
+    def tomar(self, mes_actual: Any) -> Optional[Tuple[Any, Any, str]]:
+        with self._lock:
+            if mes_actual not in self._por_mes:
+                if not self._por_mes:
+                    return None
+                mes_actual = max(self._por_mes, key=lambda m: len(self._por_mes[m]))
+            lst = self._por_mes[mes_actual]
+            key, cedula = lst.pop()
+            if not lst:
+                del self._por_mes[mes_actual]
+            return mes_actual, key, cedula
+
+    def restantes(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._por_mes.values())
+
+
+class Coordinador:
+    def __init__(self, drivers: Sequence[Driver]):
+        if not drivers:
+            raise ValueError("Coordinador sin drivers.")
+        self.drivers = list(drivers)
+        self.estadisticas: Dict[str, EstadisticaTrabajador] = {}
+        self.duracion_s = 0.0
+
+    def ejecutar(
+        self,
+        trabajo: Dict[Any, Sequence[Tuple[Any, str]]],
+        al_resultado: Callable[[Resultado], None],
+        mes_inicial: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        trabajo: {mes: [(key, cedula), ...]}. mes_inicial: {nombre_driver: mes
+        que ya tiene abierto}. Retorna cuántas búsquedas quedaron sin hacer (si
+        un trabajador cortó con excepción, esta se relanza después de frenar al resto).
+        """
+        colas = _Colas(trabajo)
+        lock = threading.Lock()
+        parar = threading.Event()
+        errores: List[BaseException] = []
+        mes_inicial = mes_inicial or {}
+        self.estadisticas = {d.nombre: EstadisticaTrabajador() for d in self.drivers}
+
+        def trabajar(driver: Driver) -> None:
+            st = self.estadisticas[driver.nombre]
+            mes = mes_inicial.get(driver.nombre)
+            try:
+                while not parar.is_set():
+                    tarea = colas.tomar(mes)
+                    if tarea is None:
+                        return
+                    mes, key, cedula = tarea
+                    if not st.meses or st.meses[-1] != mes:
+                        st.meses.append(mes)
+
+                    t0 = time.perf_counter()
+                    out, err, mes_correcto = driver.buscar(cedula, mes)
+                    st.ocupado_s += time.perf_counter() - t0
+                    st.busquedas += 1
+
+                    with lock:
+                        al_resultado(Resultado(key, cedula, mes, out, err, mes_correcto, driver.nombre))
+            except BaseException as e:
+                logger.error("Trabajador %s cortó: %s", driver.nombre, e)
+                with lock:
+                    errores.append(e)
+                parar.set()
+
+        t0 = time.perf_counter()
+        hilos = [
+            threading.Thread(target=trabajar, args=(d,), name=f"pool-{d.nombre}", daemon=True)
+            for d in self.drivers[1:]
+        ]
+        for h in hilos:
+            h.start()
+        trabajar(self.drivers[0])
+        for h in hilos:
+            h.join()
+        self.duracion_s = time.perf_counter() - t0
+
+        self._log()
+        if errores:
+            raise errores[0]
+        return colas.restantes()
+
+    def _log(self) -> None:
+        total = sum(st.busquedas for st in self.estadisticas.values())
+        if not total:
+            return
+        por_hora = total * 3600 / self.duracion_s if self.duracion_s else 0.0
+        logger.info(
+            "Pool: %s búsquedas en %.1fs con %s trabajadores (%.0f/hora).",
+            total, self.duracion_s, len(self.drivers), por_hora,
+        )
+        for nombre, st in self.estadisticas.items():
+            logger.info(
+                "Pool %s: búsquedas=%s | ocupado=%.1fs | meses=%s",
+                nombre, st.busquedas, st.ocupado_s, len(st.meses),
+            )
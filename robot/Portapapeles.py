@@ -0,0 +1,84 @@
+# robot/Portapapeles.py
+# ==========================================
+# Portapapeles.py – copia desde grids VB6 sin sleeps fijos
+#
+# - copiar_y_esperar(): ejecuta la acción de copiar (Ctrl+C, menú...) y espera a
+#   que cambie GetClipboardSequenceNumber (con timeout). Lee CF_UNICODETEXT
+#   UNA sola vez.
+# - parsear_tsv(): TSV "tipo Excel" en streaming: respeta celdas entre comillas
+#   con tabs / saltos de línea / "" escapadas (split("\t") las rompía).
+# ==========================================
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import time
+from typing import Callable, Iterator, List
+
+logger = logging.getLogger("Robot62.Portapapeles")
+
+CF_UNICODETEXT = 13
+
+# csv.field_size_limit por defecto (128 KB) corta celdas grandes del grid
+_LIMITE_CELDA = 64 * 1024 * 1024
+
+
+def parsear_tsv(texto: str) -> Iterator[List[str]]:
+    """
+    Itera las filas del TSV (se omiten filas vacías). El texto se recorre una
+    sola vez sobre un StringIO, sin partir líneas a mano.
+    """
+    if csv.field_size_limit() < _LIMITE_CELDA:
+        csv.field_size_limit(_LIMITE_CELDA)
+    reader = csv.reader(io.StringIO(texto, newline=""), delimiter="\t", quotechar='"', strict=False)
+    for fila in reader:
+        if any(c.strip() for c in fila):
+            yield fila
+
+
+def secuencia() -> int:
+    import win32clipboard
+
+    return int(win32clipboard.GetClipboardSequenceNumber())
+
+
+def _leer_texto(timeout: float) -> str:
+    """CF_UNICODETEXT; reintenta OpenClipboard mientras el dueño lo tenga tomado."""
+    import win32clipboard
+
+    limite = time.time() + timeout
+    while True:
+        try:
+            win32clipboard.OpenClipboard()
+        except Exception:
+            if time.time() >= limite:
+                raise
+            time.sleep(0.02)
+            continue
+        try:
+            if not win32clipboard.IsClipboardFormatAvailable(CF_UNICODETEXT):
+                return ""
+            return win32clipboard.GetClipboardData(CF_UNICODETEXT) or ""
+        finally:
+            win32clipboard.CloseClipboard()
+
+
+def copiar_y_esperar(accion: Callable[[], None], timeout: float = 3.0, poll: float = 0.02) -> str:
+    """
+    Ejecuta `accion` (la que copia) y espera a que el portapapeles cambie.
+    Retorna el texto copiado, o "" si la secuencia no cambió dentro de `timeout`
+    (evita devolver contenido viejo del portapapeles).
+    """
+    antes = secuencia()
+    accion()
+
+    limite = time.time() + timeout
+    while secuencia() == antes:
+        if time.time() >= limite:
+            logger.debug("Portapapeles sin cambios tras %.1fs.", timeout)
+            return ""
+        time.sleep(poll)
+
+    return _leer_texto(timeout=max(0.5, limite - time.time()))
@@ -0,0 +1,207 @@
+# robot/Reclamos.py
+# ==========================================
+# Reclamos.py – reclamo de filas de la hoja (varios robots sobre la misma hoja)
+#
+# Un host marca en N° Prestacion las filas que toma:
+#   "En proceso:<host>:<vence epoch>"
+# y solo exporta esas. Sheets no tiene compare-and-swap: se escribe el reclamo
+# (una llamada batch, celda por celda), se espera `espera_verificacion_s` y se
+# relee la columna; se queda solo con las celdas que siguen con SU token.
+# Gana el último que escribe, y uno que escribe tarde (leyó "Pendiente" antes
+# del reclamo de otro) puede pisar un reclamo ya verificado. Por eso el
+# reclamo se vuelve a verificar antes de cada lote (renovar) y antes de
+# escribir el resultado (vigentes): si la celda ya tiene el token de otro
+# host, esa fila se suelta y no se procesa ni se escribe.
+#
+# Ciclo de vida de un Reclamo:
+#   reclamar()   -> filas tomadas (verificadas)
+#   renovar()    -> reverifica + extiende el vencimiento (por lote)
+#   vigentes()   -> reverifica sin escribir (antes de escribir la hoja)
+#   terminar()   -> filas que ya tienen valor final escrito
+#   liberar()    -> (finally) lo no terminado vuelve a "Pendiente"
+#
+# Son reclamables: "Pendiente", reclamos vencidos y reclamos del mismo host
+# (su journal sabe en qué quedó cada fila).
+#
+# FakeHoja: backend en memoria para simular varios hosts en Linux
+# (tests/test_reclamos.py). El backend de gspread está en WriteAndReadSheet.
+# ==========================================
+
+from __future__ import annotations
+
+import logging
+import random
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger("Robot62.Reclamos")
+
+PREFIJO_RECLAMO = "En proceso"
+VALOR_LIBRE = "Pendiente"
+
+
+def host_id() -> str:
+    return socket.gethostname() or "robot"
+
+
+def token_reclamo(host: str, vence: float) -> str:
+    return f"{PREFIJO_RECLAMO}:{host}:{int(vence)}"
+
+
+def parse_reclamo(valor: str) -> Optional[tuple[str, int]]:
+    """'En proceso:HOST-1:1760000000' -> ('HOST-1', 1760000000)"""
+    partes = (valor or "").strip().split(":")
+    if len(partes) != 3 or partes[0].lower() != PREFIJO_RECLAMO.lower():
+        return None
+    try:
+        return partes[1], int(partes[2])
+    except ValueError:
+        return None
+
+
+def es_reclamable(valor: str, host: str, ahora: float) -> bool:
+    if (valor or "").strip().lower() == VALOR_LIBRE.lower():
+        return True
+    rec = parse_reclamo(valor)
+    if rec is None:
+        return False
+    dueno, vence = rec
+    return dueno == host or vence <= ahora
+
+
+class FakeHoja:
+    """Backend en memoria (columna N° Prestacion, fila 2 en adelante)."""
+
+    def __init__(self, valores: List[str], latencia_s: float = 0.0):
+        self._col = list(valores)
+        self._lock = threading.Lock()
+        self.latencia_s = latencia_s
+
+    def leer_columna(self, col: int) -> List[str]:
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+        with self._lock:
+            return list(self._col)
+
+    def escribir(self, col: int, valores: Dict[int, str]) -> None:
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+        with self._lock:
+            for r, v in valores.items():
+                self._col[r - 2] = v
+
+
+class Reclamo:
+    """Filas de la hoja (2..n) a nombre de este host que todavía no tienen valor final."""
+
+    def __init__(
+        self,
+        hoja,
+        col: int,
+        host: Optional[str] = None,
+        lease_minutos: float = 120,
+        espera_verificacion_s: float = 3.0,
+        ahora: Callable[[], float] = time.time,
+        dormir: Callable[[float], None] = time.sleep,
+    ):
+        self.hoja = hoja
+        self.col = col
+        self.host = host or host_id()
+        self.lease_s = lease_minutos * 60
+        self.espera_verificacion_s = espera_verificacion_s
+        self.ahora = ahora
+        self.dormir = dormir
+        self.filas: Set[int] = set()
+        self.perdidas = 0
+        self._renovado = 0.0
+
+    def _token(self) -> str:
+        return token_reclamo(self.host, self.ahora() + self.lease_s)
+
+    def _mias(self, valores: List[str], filas: Iterable[int]) -> Set[int]:
+        """Filas cuya celda sigue con un reclamo de este host (cualquier vencimiento)."""
+        out: Set[int] = set()
+        for r in filas:
+            rec = parse_reclamo(valores[r - 2]) if r - 2 < len(valores) else None
+            if rec is not None and rec[0] == self.host:
+                out.add(r)
+        return out
+
+    def _soltar(self, filas: Set[int], donde: str) -> None:
+        perdidas = self.filas & filas
+        if perdidas:
+            self.filas -= perdidas
+            self.perdidas += len(perdidas)
+            logger.warning(
+                "Reclamos (%s): %s filas ya tienen el reclamo de otro host; se sueltan: %s",
+                donde, len(perdidas), sorted(perdidas)[:20],
+            )
+
+    def reclamar(self, max_filas: int = 0) -> Set[int]:
+        t = self.ahora()
+        valores = self.hoja.leer_columna(self.col)
+        candidatas = {i for i, v in enumerate(valores, start=2) if es_reclamable(v, self.host, t)}
+        if not candidatas:
+            return set()
+        if max_filas and len(candidatas) > max_filas:
+            # al azar: dos hosts que reclaman a la vez casi no eligen las mismas filas
+            candidatas = set(random.sample(sorted(candidatas), max_filas))
+
+        token = self._token()
+        self.hoja.escribir(self.col, {r: token for r in candidatas})
+        if self.espera_verificacion_s:
+            self.dormir(self.espera_verificacion_s)
+
+        despues = self.hoja.leer_columna(self.col)
+        ganadas = {r for r in candidatas if r - 2 < len(despues) and despues[r - 2].strip() == token}
+        self.filas |= ganadas
+        self._renovado = self.ahora()
+        return ganadas
+
+    def renovar(self, filas: Optional[Iterable[int]] = None) -> Set[int]:
+        """
+        Reverifica `filas` (default: todas) y extiende su vencimiento. Retorna
+        las que siguen siendo de este host; las demás se sueltan.
+        """
+        pedidas = self.filas if filas is None else set(filas) & self.filas
+        if not pedidas:
+            return set()
+        valores = self.hoja.leer_columna(self.col)
+        mias = self._mias(valores, pedidas)
+        self._soltar(pedidas - mias, "renovar")
+        if mias:
+            token = self._token()
+            self.hoja.escribir(self.col, {r: token for r in mias})
+        if filas is None:
+            self._renovado = self.ahora()
+        return mias
+
+    def renovar_si_toca(self) -> None:
+        """Renueva todo si pasó un tercio del lease desde la última renovación completa."""
+        if self.filas and self.ahora() - self._renovado >= self.lease_s / 3:
+            self.renovar()
+
+    def vigentes(self, filas: Iterable[int]) -> Set[int]:
+        """Reverifica sin escribir (justo antes de escribir resultados en la hoja)."""
+        pedidas = set(filas) & self.filas
+        if not pedidas:
+            return set()
+        mias = self._mias(self.hoja.leer_columna(self.col), pedidas)
+        self._soltar(pedidas - mias, "antes de escribir")
+        return mias
+
+    def terminar(self, filas: Iterable[int]) -> None:
+        """Filas que ya tienen su valor final en la hoja: el reclamo no se libera."""
+        self.filas -= set(filas)
+
+    def liberar(self) -> int:
+        """Devuelve a 'Pendiente' las filas sin terminar que siguen con el reclamo de este host."""
+        if not self.filas:
+            return 0
+        mias = self._mias(self.hoja.leer_columna(self.col), self.filas)
+        if mias:
+            self.hoja.escribir(self.col, {r: VALOR_LIBRE for r in mias})
+        self.filas.clear()
+        return len(mias)
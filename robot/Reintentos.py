@@ -0,0 +1,167 @@
+# robot/Reintentos.py
+# ==========================================
+# Reintentos.py – clasificación de fallos de búsqueda + cola de reintentos
+#
+# Un fallo de buscar_por_cedula_fallecido es:
+#   - TRANSITORIO: la UI no respondió como se esperaba (combo no quedó, cédula
+#     no se escribió, timeout, formulario sin No Orden). Va a la cola y se
+#     reintenta al final del lote, con el formulario recién abierto.
+#   - PERMANENTE: el dato no sirve (Error 13 "No coinciden los tipos").
+#     No se reintenta: se escribe en la hoja "Error captura: <motivo>".
+#
+# Config opcional (config.ini):
+#   [reintentos]
+#   max_intentos = 3     (contando el intento original)
+#   espera_s = 5         (espera antes de la ronda n: espera_s * 2^(n-1))
+# ==========================================
+
+from __future__ import annotations
+
+import configparser
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger("Robot62.Reintentos")
+
+TRANSITORIO = "TRANSITORIO"
+PERMANENTE = "PERMANENTE"
+
+# Prefijo que se escribe en N° Prestacion para fallos permanentes
+MARCA_PERMANENTE = "Error captura"
+
+
+# ==========================================================
+# Errores tipados de la búsqueda
+# ==========================================================
+class BusquedaError(RuntimeError):
+    """Fallo de una búsqueda por cédula. `motivo` va al log / a la hoja."""
+
+    transitorio = True
+    motivo = "FALLO_BUSQUEDA"
+
+
+class ComboNoSeleccionado(BusquedaError):
+    motivo = "COMBO_NO_SELECCIONADO"
+
+
+class CedulaNoEscrita(BusquedaError):
+    motivo = "CEDULA_NO_ESCRITA"
+
+
+class ErrorTipos13(BusquedaError):
+    transitorio = False
+    motivo = "ERROR_13"
+
+
+def clasificar(exc: Optional[BaseException] = None, out: Optional[dict] = None) -> Tuple[str, str]:
+    """
+    (TRANSITORIO | PERMANENTE, motivo) de una excepción o de un resultado sin
+    No Orden. Lo no reconocido es transitorio: un reintento barato es mejor que
+    perder la fila hasta la próxima corrida.
+    """
+    if exc is not None:
+        if isinstance(exc, BusquedaError):
+            return (TRANSITORIO if exc.transitorio else PERMANENTE), exc.motivo
+        if isinstance(exc, TimeoutError) or type(exc).__name__ == "TimeoutError":
+            return TRANSITORIO, "TIMEOUT"
+        if type(exc).__name__ == "PiscoHung":
+            return TRANSITORIO, "PISCO_COLGADO"
+        return TRANSITORIO, type(exc).__name__
+
+    out = out or {}
+    if out.get("ok") and not (out.get("no_orden_servicio") or "").strip():
+        return TRANSITORIO, "SIN_NO_ORDEN"
+    return TRANSITORIO, str(out.get("motivo") or "SIN_RESULTADO")
+
+
+def marca_permanente(motivo: str) -> str:
+    return f"{MARCA_PERMANENTE}: {motivo}"
+
+
+def es_marca_permanente(valor: str) -> bool:
+    return (valor or "").strip().lower().startswith(MARCA_PERMANENTE.lower())
+
+
+# ==========================================================
+# Cola
+# ==========================================================
+@dataclass
+class Reintento:
+    key: Hashable  # ej. (cédula normalizada, mes) de main.clave_busqueda
+    cedula: str
+    grupo: Any = None  # ej. el mes del servicio: la ronda reabre el formulario por grupo
+    intentos: int = 1
+    motivo: str = ""
+
+
+class ColaReintentos:
+    def __init__(self, max_intentos: int = 3, espera_s: float = 5.0):
+        self.max_intentos = max(1, max_intentos)
+        self.espera_s = max(0.0, espera_s)
+        self._cola: Dict[Hashable, Reintento] = {}
+        self.rondas = 0
+        self.resueltos = 0
+        self.agotados: Dict[Hashable, str] = {}  # key -> último motivo
+
+    def __len__(self) -> int:
+        return len(self._cola)
+
+    def agregar(self, key: Hashable, cedula: str, motivo: str, grupo: Any = None) -> bool:
+        """Encola (o re-encola) la cédula. False si ya agotó sus intentos."""
+        ent = self._cola.get(key)
+        if ent is None:
+            ent = Reintento(key=key, cedula=cedula, grupo=grupo, intentos=1, motivo=motivo)
+        else:
+            ent.motivo = motivo
+        if ent.intentos >= self.max_intentos:
+            self._cola.pop(key, None)
+            self.agotados[key] = motivo
+            return False
+        self._cola[key] = ent
+        return True
+
+    def resuelto(self, key: Hashable) -> None:
+        if self._cola.pop(key, None) is not None:
+            self.resueltos += 1
+
+    def descartar(self, key: Hashable) -> None:
+        self._cola.pop(key, None)
+
+    def siguiente_ronda(self, dormir=time.sleep) -> Dict[Any, List[Reintento]]:
+        """
+        Espera el backoff de la ronda y retorna los pendientes agrupados por
+        `grupo` ({} si la cola está vacía). Cuenta un intento a cada uno.
+        """
+        if not self._cola:
+            return {}
+        self.rondas += 1
+        espera = self.espera_s * (2 ** (self.rondas - 1))
+        logger.info("Reintentos: ronda %s con %s cédulas (espera %.1fs).", self.rondas, len(self._cola), espera)
+        if espera:
+            dormir(espera)
+
+        por_grupo: Dict[Any, List[Reintento]] = {}
+        for ent in self._cola.values():
+            ent.intentos += 1
+            por_grupo.setdefault(ent.grupo, []).append(ent)
+        return por_grupo
+
+    def resumen(self) -> dict:
+        return {
+            "rondas": self.rondas,
+            "resueltos": self.resueltos,
+            "agotados": len(self.agotados),
+            "en_cola": len(self._cola),
+        }
+
+
+def desde_config(config_path: Path | str) -> ColaReintentos:
+    cp = configparser.ConfigParser()
+    cp.read(str(config_path), encoding="utf-8")
+    return ColaReintentos(
+        max_intentos=cp.getint("reintentos", "max_intentos", fallback=3),
+        espera_s=cp.getfloat("reintentos", "espera_s", fallback=5.0),
+    )
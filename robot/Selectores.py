@@ -0,0 +1,427 @@
+# robot/Selectores.py
+# ==========================================
+# Selectores.py – localizador declarativo de controles
+#
+# Cada búsqueda de controles es una CONSULTA de reglas en texto. La consulta
+# se compila una vez a predicados y se evalúa en UNA pasada por el árbol de
+# la raíz (raíz + descendientes); el resultado se memoriza por generación de
+# la ventana (la lista de hwnds descendientes) y se revalida antes de usarlo.
+#
+# Sintaxis (una regla por línea:  nombre = clases filtros... relación):
+#   combo = ComboBox|ThunderRT6ComboBox ancho>=120 alto>=18 franja<=220 mayor:ancho
+#   edit  = Edit|ThunderRT6TextBox ancho>=80 franja<=220 izquierda-de:combo peso-y=3
+#   boton = ThunderRT6CommandButton texto="Cargar Archivo" habilitado
+#   nro   = @campo derecha-de:"contrato nro" misma-fila<=14 peso-y=4
+#   orden = @campo valor~'^\d{2}-\d{3,5}-\d{2}$'
+#
+#   clases    A|B, prefijo con * (ATL:*), @campo / @label (Formulario) o *
+#   filtros   ancho>=N ancho<=N alto>=N alto<=N
+#             franja<=N      borde superior a <= N px del de la raíz
+#             texto="x"      título exacto (sin mayúsculas)
+#             texto~'re'     título por regex
+#             valor~'re'     texto real del control (WM_GETTEXT; no se memoriza)
+#             habilitado     solo controles habilitados
+#             oculto         acepta controles no visibles
+#   relación  derecha-de:R   c.l >= R.r-5, score dy*peso-y + |c.l - R.r|
+#             izquierda-de:R c.r <= R.l,   score dy*peso-y + |R.l - c.r|
+#             junto-a:R      score dy*peso-y + |c.l - R.r|
+#             dentro-de:R    descendiente de R
+#             R = otra regla de la consulta, o texto de un label (Static
+#             cuyo texto normalizado lo contiene; gana el primer label con
+#             candidato). misma-fila<=N limita dy; peso-y=N (default 1).
+#   elección  mayor:area | mayor:ancho; con relación, el de menor score; si
+#             no, el primero del árbol.
+# ==========================================
+
+from __future__ import annotations
+
+import logging
+import re
+import shlex
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from robot import Formulario
+from robot.Mensajes import PiscoHung
+from robot.UIDriver import UIDriver
+
+logger = logging.getLogger("Robot62.Selectores")
+
+RELACIONES = ("derecha-de", "izquierda-de", "junto-a", "dentro-de")
+
+_ALIAS = {
+    "@campo": Formulario.CLASES_CAMPO,
+    "@label": Formulario.CLASES_LABEL,
+}
+
+
+# ==========================================================
+# Reglas
+# ==========================================================
+@dataclass(frozen=True)
+class Regla:
+    nombre: str
+    clases: Optional[FrozenSet[str]] = None     # None (y sin prefijos) = cualquiera
+    prefijos: Tuple[str, ...] = ()
+    ancho: Tuple[Optional[int], Optional[int]] = (None, None)
+    alto: Tuple[Optional[int], Optional[int]] = (None, None)
+    franja: Optional[int] = None
+    texto: Optional[str] = None                 # exacto, en minúsculas
+    texto_re: Optional[re.Pattern] = None
+    valor_re: Optional[re.Pattern] = None
+    habilitado: bool = False
+    oculto: bool = False
+    relacion: Optional[str] = None
+    ancla: Optional[str] = None
+    misma_fila: Optional[int] = None
+    peso_y: int = 1
+    mayor: Optional[str] = None
+
+    @property
+    def volatil(self) -> bool:
+        return self.valor_re is not None
+
+
+@dataclass(frozen=True)
+class Consulta:
+    reglas: Tuple[Regla, ...]                   # en orden de resolución
+
+    @property
+    def volatil(self) -> bool:
+        return any(r.volatil for r in self.reglas)
+
+    def nombres(self) -> Tuple[str, ...]:
+        return tuple(r.nombre for r in self.reglas)
+
+
+_RE_TAM = re.compile(r"^(ancho|alto)(>=|<=)(\d+)$")
+
+
+def _regla(nombre: str, texto: str) -> Regla:
+    try:
+        toks = shlex.split(texto, posix=True)
+    except ValueError as e:
+        raise ValueError(f"Selector inválido '{nombre}': {e}") from None
+    if not toks:
+        raise ValueError(f"Selector inválido '{nombre}': sin clases")
+
+    kw: dict = {"nombre": nombre}
+    clases: List[str] = []
+    prefijos: List[str] = []
+    for c in toks[0].split("|"):
+        if c in _ALIAS:
+            clases.extend(_ALIAS[c])
+            if c == "@campo":
+                kw["alto"] = (None, Formulario.ALTO_MAX_CAMPO)
+        elif c.endswith("*"):
+            if c != "*":
+                prefijos.append(c[:-1])
+        elif c:
+            clases.append(c)
+    kw["clases"] = frozenset(clases) if clases else None
+    kw["prefijos"] = tuple(prefijos)
+
+    for t in toks[1:]:
+        m = _RE_TAM.match(t)
+        if m:
+            campo, op, n = m.group(1), m.group(2), int(m.group(3))
+            lo, hi = kw.get(campo, (None, None))
+            kw[campo] = (n, hi) if op == ">=" else (lo, n)
+        elif t.startswith("franja<="):
+            kw["franja"] = int(t[len("franja<="):])
+        elif t.startswith("texto="):
+            kw["texto"] = t[len("texto="):].strip().lower()
+        elif t.startswith("texto~"):
+            kw["texto_re"] = re.compile(t[len("texto~"):], re.I)
+        elif t.startswith("valor~"):
+            kw["valor_re"] = re.compile(t[len("valor~"):])
+        elif t == "habilitado":
+            kw["habilitado"] = True
+        elif t == "oculto":
+            kw["oculto"] = True
+        elif t.startswith("misma-fila<="):
+            kw["misma_fila"] = int(t[len("misma-fila<="):])
+        elif t.startswith("peso-y="):
+            kw["peso_y"] = int(t[len("peso-y="):])
+        elif t in ("mayor:area", "mayor:ancho"):
+            kw["mayor"] = t.split(":", 1)[1]
+        elif t.split(":", 1)[0] in RELACIONES and ":" in t:
+            kw["relacion"], kw["ancla"] = t.split(":", 1)
+        else:
+            raise ValueError(f"Selector inválido '{nombre}': no entiendo '{t}'")
+    return Regla(**kw)
+
+
+@lru_cache(maxsize=256)
+def compilar(texto: str) -> Consulta:
+    """Texto de la consulta -> Consulta con las reglas en orden de dependencias."""
+    reglas: Dict[str, Regla] = {}
+    for linea in texto.splitlines():
+        linea = linea.strip()
+        if not linea or linea.startswith("#"):
+            continue
+        nombre, sep, resto = linea.partition("=")
+        nombre = nombre.strip()
+        if not sep or not nombre.replace("_", "").isalnum():
+            raise ValueError(f"Selector inválido: '{linea}' (se espera 'nombre = ...')")
+        reglas[nombre] = _regla(nombre, resto)
+
+    orden: List[Regla] = []
+    estado: Dict[str, int] = {}  # 1 = visitando, 2 = listo
+
+    def visitar(n: str) -> None:
+        if estado.get(n) == 2:
+            return
+        if estado.get(n) == 1:
+            raise ValueError(f"Selector inválido: referencia circular en '{n}'")
+        estado[n] = 1
+        r = reglas[n]
+        if r.ancla in reglas:
+            visitar(r.ancla)
+        estado[n] = 2
+        orden.append(r)
+
+    for n in reglas:
+        visitar(n)
+    return Consulta(tuple(orden))
+
+
+# ==========================================================
+# Evaluación
+# ==========================================================
+class _Nodo:
+    """Propiedades de un hwnd leídas bajo demanda, una sola vez por pasada."""
+
+    __slots__ = ("h", "_ui", "_clase", "_rect", "_visible", "_titulo", "_valor", "_habilitado")
+
+    def __init__(self, ui: UIDriver, h: int):
+        self.h = h
+        self._ui = ui
+        self._clase = self._rect = self._visible = self._titulo = self._valor = self._habilitado = None
+
+    @property
+    def clase(self) -> str:
+        if self._clase is None:
+            self._clase = self._ui.clase(self.h)
+        return self._clase
+
+    @property
+    def rect(self) -> Tuple[int, int, int, int]:
+        if self._rect is None:
+            self._rect = tuple(self._ui.rect(self.h))
+        return self._rect
+
+    @property
+    def visible(self) -> bool:
+        if self._visible is None:
+            self._visible = bool(self._ui.visible(self.h))
+        return self._visible
+
+    @property
+    def habilitado(self) -> bool:
+        if self._habilitado is None:
+            self._habilitado = bool(self._ui.habilitado(self.h))
+        return self._habilitado
+
+    @property
+    def titulo(self) -> str:
+        if self._titulo is None:
+            self._titulo = (self._ui.titulo(self.h) or "").strip()
+        return self._titulo
+
+    @property
+    def valor(self) -> str:
+        if self._valor is None:
+            self._valor = Formulario._texto(self.h, self._ui)
+        return self._valor
+
+
+def _predicado(r: Regla, top_raiz: int) -> Callable[[_Nodo], bool]:
+    """Filtros de la regla como una sola función, de lo más barato a lo más caro."""
+
+    def ok(n: _Nodo) -> bool:
+        if r.clases is not None or r.prefijos:
+            cls = n.clase
+            if not ((r.clases and cls in r.clases) or (r.prefijos and cls.startswith(r.prefijos))):
+                return False
+        if not r.oculto and not n.visible:
+            return False
+        l, t, rr, b = n.rect
+        if r.franja is not None and not (top_raiz <= t <= top_raiz + r.franja):
+            return False
+        w, h = rr - l, b - t
+        if (r.ancho[0] is not None and w < r.ancho[0]) or (r.ancho[1] is not None and w > r.ancho[1]):
+            return False
+        if (r.alto[0] is not None and h < r.alto[0]) or (r.alto[1] is not None and h > r.alto[1]):
+            return False
+        if r.texto is not None and n.titulo.lower() != r.texto:
+            return False
+        if r.texto_re is not None and not r.texto_re.search(n.titulo):
+            return False
+        if r.habilitado and not n.habilitado:
+            return False
+        if r.valor_re is not None and not r.valor_re.search(n.valor):
+            return False
+        return True
+
+    return ok
+
+
+def _score(r: Regla, c: _Nodo, a: _Nodo) -> Optional[int]:
+    cl, ct, cr, _ = c.rect
+    al, at, ar, _ = a.rect
+    dy = abs(ct - at)
+    if r.misma_fila is not None and dy > r.misma_fila:
+        return None
+    if r.relacion == "derecha-de":
+        if cl < ar - 5:
+            return None
+        return dy * r.peso_y + abs(cl - ar)
+    if r.relacion == "izquierda-de":
+        if cr > al:
+            return None
+        return dy * r.peso_y + abs(al - cr)
+    return dy * r.peso_y + abs(cl - ar)  # junto-a
+
+
+def _dentro(ui: UIDriver, h: int, ancestro: int, raiz: int) -> bool:
+    while h and h != raiz:
+        h = ui.padre(h)
+        if h == ancestro:
+            return True
+    return False
+
+
+def _elegir(
+    ui: UIDriver, raiz: int, r: Regla, cands: List[_Nodo], anclas: List[_Nodo]
+) -> Optional[_Nodo]:
+    if r.relacion == "dentro-de":
+        cands = [c for c in cands if any(_dentro(ui, c.h, a.h, raiz) for a in anclas)]
+    elif r.relacion:
+        for a in anclas:
+            mejor, mejor_score = None, None
+            for c in cands:
+                if c.h == a.h:
+                    continue
+                s = _score(r, c, a)
+                if s is not None and (mejor_score is None or s < mejor_score):
+                    mejor, mejor_score = c, s
+            if mejor is not None:
+                return mejor
+        return None
+
+    if r.mayor:
+        def medida(n: _Nodo) -> int:
+            l, t, rr, b = n.rect
+            return max(0, rr - l) * (max(0, b - t) if r.mayor == "area" else 1)
+
+        mejor, mejor_m = None, 0
+        for c in cands:
+            m = medida(c)
+            if m > mejor_m:
+                mejor, mejor_m = c, m
+        return mejor
+    return cands[0] if cands else None
+
+
+class _Estado:
+    def __init__(self):
+        self.memo: Dict[Tuple[int, Consulta], Tuple[Tuple[int, ...], Dict[str, Optional[int]]]] = {}
+
+
+_estados: "weakref.WeakKeyDictionary[UIDriver, _Estado]" = weakref.WeakKeyDictionary()
+_stats = {"consultas": 0, "memo": 0, "pasadas": 0, "nodos": 0}
+
+
+def _revalidar(ui: UIDriver, raiz: int, c: Consulta, res: Dict[str, Optional[int]]) -> bool:
+    top = ui.rect(raiz)[1]
+    for r in c.reglas:
+        h = res.get(r.nombre)
+        if h is not None and not (ui.existe(h) and _predicado(r, top)(_Nodo(ui, h))):
+            return False
+    return True
+
+
+def localizar(ui: UIDriver, raiz: int, consulta: Consulta | str) -> Dict[str, Optional[int]]:
+    """
+    {regla: hwnd o None} para cada regla de la consulta. Una pasada por el
+    árbol; si la ventana no cambió de generación y lo elegido sigue cumpliendo
+    los filtros, devuelve lo memorizado sin recorrer.
+    """
+    c = compilar(consulta) if isinstance(consulta, str) else consulta
+    _stats["consultas"] += 1
+
+    hs = ui.descendientes(raiz)
+    generacion = tuple(hs)
+    st = _estados.get(ui)
+    if st is None:
+        st = _estados[ui] = _Estado()
+
+    if not c.volatil:
+        previo = st.memo.get((raiz, c))
+        if previo and previo[0] == generacion:
+            try:
+                if _revalidar(ui, raiz, c, previo[1]):
+                    _stats["memo"] += 1
+                    return dict(previo[1])
+            except PiscoHung:
+                raise
+            except Exception:
+                pass
+
+    top = ui.rect(raiz)[1]
+    preds = [(r, _predicado(r, top)) for r in c.reglas]
+    nombres = set(c.nombres())
+    necesita_labels = [r.ancla for r in c.reglas if r.ancla and r.ancla not in nombres]
+    claves_label = {a: Formulario.clave_campo(a) for a in necesita_labels}
+
+    cands: Dict[str, List[_Nodo]] = {r.nombre: [] for r in c.reglas}
+    labels: Dict[str, List[_Nodo]] = {a: [] for a in necesita_labels}
+
+    _stats["pasadas"] += 1
+    for h in [raiz] + hs:
+        n = _Nodo(ui, h)
+        _stats["nodos"] += 1
+        try:
+            for r, ok in preds:
+                if ok(n):
+                    cands[r.nombre].append(n)
+            if labels and n.clase in Formulario.CLASES_LABEL and n.visible and n.titulo:
+                k = Formulario.clave_campo(n.titulo)
+                for a, ka in claves_label.items():
+                    if ka and ka in k:
+                        labels[a].append(n)
+        except PiscoHung:
+            raise
+        except Exception:
+            continue
+
+    elegidos: Dict[str, Optional[_Nodo]] = {}
+    for r in c.reglas:
+        anclas: List[_Nodo] = []
+        if r.ancla:
+            if r.ancla in nombres:
+                a = elegidos.get(r.ancla)
+                anclas = [a] if a is not None else []
+            else:
+                anclas = labels[r.ancla]
+            if not anclas:
+                elegidos[r.nombre] = None
+                continue
+        elegidos[r.nombre] = _elegir(ui, raiz, r, cands[r.nombre], anclas)
+
+    res = {k: (n.h if n is not None else None) for k, n in elegidos.items()}
+    if not c.volatil and all(v is not None for v in res.values()):
+        st.memo[(raiz, c)] = (generacion, dict(res))
+    return res
+
+
+def uno(ui: UIDriver, raiz: int, selector: str) -> Optional[int]:
+    """Atajo para una sola regla sin nombre: uno(ui, h, 'ThunderRT6CommandButton texto=Aceptar')."""
+    return localizar(ui, raiz, f"x = {selector}")["x"]
+
+
+def estadisticas() -> Dict[str, int]:
+    return dict(_stats)
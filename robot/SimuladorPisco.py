@@ -0,0 +1,394 @@
+# robot/SimuladorPisco.py
+# ==========================================
+# SimuladorPisco.py – modelo en memoria de PISCO detrás de UIDriver
+#
+# Modela lo que toca la captura de servicios:
+#   - ventana principal con la barra de búsqueda (combo + edit + lupa) y el
+#     registro de servicio (labels + campos, "No Orden Servicio")
+#   - Archivo -> Capturar Servicios -> popup "Mes a Visualizar Servicios"
+#     (combo mes + combo año + Aceptar) -> grid de servicios del mes
+#   - lupa: "No se encontró registro", "Error '13' No coinciden los tipos" o
+#     ventana "Control de Llamadas / Novedades" + registro cargado
+#
+# Reloj virtual: cada operación suma su latencia (Latencias) a `reloj_s` sin
+# dormir, así un benchmark de miles de búsquedas corre en segundos y el
+# resultado es determinístico (semilla fija para los fallos al azar).
+#
+# DriverSimulado: PoolCaptura.Driver que repite, contra el simulador, los pasos
+# de la entrada por mensajes de PISCO_CapturarServicios (es una réplica: el
+# código de PCS habla Win32 directo y no corre sobre UIDriver). Benchmark lo
+# pone en lugar de las funciones de PCS que usa main.py (abrir_mes,
+# consultar, listar).
+# ==========================================
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from robot import Formulario
+from robot.PoolCaptura import Driver, Salida
+from robot.Reintentos import ComboNoSeleccionado, ErrorTipos13
+from robot.UIDriver import UIDriver
+
+MESES = (
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre",
+)
+CRITERIOS = ("Por Nombre del Fallecido", "Por Cedula del Fallecido", "Por No Orden")
+
+
+@dataclass
+class Latencias:
+    """Segundos (virtuales) por operación."""
+
+    mensaje_s: float = 0.002      # get/set texto, clase, rect...
+    menu_s: float = 1.5           # Archivo -> Capturar Servicios hasta el popup
+    aceptar_mes_s: float = 3.0    # Aceptar del popup hasta el grid del mes
+    busqueda_s: float = 1.8       # lupa hasta el resultado
+    llamadas_s: float = 0.6       # abrir "Control de Llamadas / Novedades"
+    grid_fila_s: float = 0.0005   # lectura del grid por fila
+    # probabilidad de que CB_SETCURSEL no "quede" (VB6 recalcula)
+    fallo_combo: float = 0.0
+
+
+@dataclass
+class _Nodo:
+    clase: str
+    titulo: str = ""
+    rect: Tuple[int, int, int, int] = (0, 0, 0, 0)
+    padre: int = 0
+    ctrl_id: int = 0
+    visible: bool = True
+    texto: str = ""
+    items: List[str] = field(default_factory=list)
+    sel: int = -1
+    hijos: List[int] = field(default_factory=list)
+
+
+class SimuladorUI(UIDriver):
+    def __init__(
+        self,
+        servicios: Dict[Tuple[Any, str], str],
+        error13: Optional[set] = None,
+        latencias: Optional[Latencias] = None,
+        semilla: int = 0,
+        hoy: Tuple[int, int] = (2026, 1),
+    ):
+        """
+        servicios: {(mes (año, mes), cedula): no_orden}. error13: cédulas que
+        disparan Error 13. hoy: mes que el popup trae por defecto.
+        """
+        self.servicios = servicios
+        self.error13 = error13 or set()
+        self.lat = latencias or Latencias()
+        self.rnd = random.Random(semilla)
+        self.hoy = hoy
+        self.reloj_s = 0.0
+        self.operaciones = 0
+        self._nodos: Dict[int, _Nodo] = {}
+        self._sig = 0x1000
+        self.mes_abierto: Any = None
+        self._construir_main()
+
+    # -------------------------
+    # Modelo
+    # -------------------------
+    def _gastar(self, s: float) -> None:
+        self.reloj_s += s
+        self.operaciones += 1
+
+    def _nuevo(self, padre: int, clase: str, **kw) -> int:
+        self._sig += 4
+        h = self._sig
+        self._nodos[h] = _Nodo(clase=clase, padre=padre, **kw)
+        if padre:
+            self._nodos[padre].hijos.append(h)
+        return h
+
+    def _quitar(self, h: int) -> None:
+        n = self._nodos.pop(h, None)
+        if n is None:
+            return
+        for c in list(n.hijos):
+            self._quitar(c)
+        if n.padre in self._nodos:
+            self._nodos[n.padre].hijos.remove(h)
+
+    def _construir_main(self) -> None:
+        self.main = self._nuevo(0, "ThunderRT6MDIForm", titulo="PISCO - Sistema de Servicios", rect=(0, 0, 1280, 900))
+        m = self.main
+        # barra de búsqueda (visible solo con Capturar Servicios abierto)
+        self.combo = self._nuevo(m, "ThunderRT6ComboBox", rect=(300, 60, 520, 82), ctrl_id=11, visible=False,
+                                 items=list(CRITERIOS), sel=0, texto=CRITERIOS[0])
+        self.edit = self._nuevo(m, "ThunderRT6TextBox", rect=(100, 60, 280, 82), ctrl_id=12, visible=False)
+        self.lupa = self._nuevo(m, "ThunderRT6CommandButton", rect=(530, 60, 552, 82), ctrl_id=13, visible=False)
+        self.grid = self._nuevo(m, "SysListView32", rect=(20, 420, 1260, 880), ctrl_id=20, visible=False)
+        # registro de servicio
+        self.campos: Dict[str, int] = {}
+        for i, label in enumerate(("No Orden Servicio", "Contrato Nro", "Fecha Servicio", "Fallecido")):
+            y = 120 + i * 30
+            self._nuevo(m, "Static", titulo=f"{label}:", rect=(20, y, 150, y + 18), ctrl_id=30 + i, visible=False)
+            self.campos[label] = self._nuevo(
+                m, "ThunderRT6TextBox", rect=(160, y - 2, 360, y + 19), ctrl_id=40 + i, visible=False
+            )
+
+    def _dialogo(self, titulo: str, mensaje: str, boton: str) -> int:
+        d = self._nuevo(0, "#32770", titulo=titulo, rect=(400, 300, 760, 440))
+        self._nuevo(d, "Static", titulo=mensaje, rect=(420, 320, 740, 360), ctrl_id=65535)
+        self._nuevo(d, "Button", titulo=boton, rect=(540, 390, 620, 414), ctrl_id=1)
+        return d
+
+    def _mostrar_busqueda(self, si: bool) -> None:
+        for h in (self.combo, self.edit, self.lupa, self.grid):
+            self._nodos[h].visible = si
+        for h in self._nodos[self.main].hijos:
+            if self._nodos[h].clase == "Static" or h in self.campos.values():
+                self._nodos[h].visible = si
+
+    def _popup_mes(self) -> None:
+        d = self._nuevo(0, "#32770", titulo="PISCO", rect=(400, 300, 760, 460))
+        self._nuevo(d, "Static", titulo="Mes a Visualizar Servicios", rect=(420, 310, 740, 330), ctrl_id=65535)
+        y, m = self.hoy
+        self._nuevo(d, "ThunderRT6ComboBox", rect=(420, 350, 560, 372), ctrl_id=2,
+                    items=list(MESES), sel=m - 1, texto=MESES[m - 1])
+        anios = [str(a) for a in range(y - 3, y + 1)]
+        self._nuevo(d, "ThunderRT6ComboBox", rect=(580, 350, 680, 372), ctrl_id=3,
+                    items=anios, sel=len(anios) - 1, texto=anios[-1])
+        self._nuevo(d, "ThunderRT6CommandButton", titulo="Aceptar", rect=(540, 410, 620, 434), ctrl_id=1)
+
+    def _aceptar_mes(self, dlg: int) -> None:
+        combos = [h for h in self._nodos[dlg].hijos if self._nodos[h].clase == "ThunderRT6ComboBox"]
+        mes = self._nodos[combos[0]].sel + 1
+        anio = int(self._nodos[combos[1]].texto)
+        self._quitar(dlg)
+        self._gastar(self.lat.aceptar_mes_s)
+        self.mes_abierto = (anio, mes)
+        self._mostrar_busqueda(True)
+
+    def _buscar(self) -> None:
+        self._gastar(self.lat.busqueda_s)
+        cedula = self._nodos[self.edit].texto.strip()
+        if self._nodos[self.combo].sel != 1:
+            self._dialogo("PISCO", "No se encontro registro alguno bajo este criterio", "Aceptar")
+            return
+        if cedula in self.error13:
+            self._dialogo("PISCO", "Error '13': No coinciden los tipos", "OK")
+            return
+        no_orden = self.servicios.get((self.mes_abierto, cedula))
+        if not no_orden:
+            self._dialogo("PISCO", "No se encontro registro alguno bajo este criterio", "Aceptar")
+            return
+
+        valores = {
+            "No Orden Servicio": no_orden,
+            "Contrato Nro": f"C-{cedula[-5:]}",
+            "Fecha Servicio": "15/{:02d}/{}".format(self.mes_abierto[1], self.mes_abierto[0]) if self.mes_abierto else "",
+            "Fallecido": f"FALLECIDO {cedula}",
+        }
+        for label, h in self.campos.items():
+            self._nodos[h].texto = valores[label]
+
+        self._gastar(self.lat.llamadas_s)
+        w = self._nuevo(0, "ThunderRT6FormDC", titulo="Control de Llamadas / Novedades", rect=(200, 150, 900, 600))
+        self._nuevo(w, "Static", titulo="Contrato Nro:", rect=(220, 200, 330, 218), ctrl_id=1)
+        self._nuevo(w, "ThunderRT6TextBox", texto=valores["Contrato Nro"], rect=(340, 198, 520, 219), ctrl_id=2)
+
+    # -------------------------
+    # UIDriver
+    # -------------------------
+    def ventanas(self) -> List[int]:
+        self._gastar(self.lat.mensaje_s)
+        return [h for h, n in self._nodos.items() if not n.padre and n.visible]
+
+    def hijos(self, hwnd: int) -> List[int]:
+        self._gastar(self.lat.mensaje_s)
+        n = self._nodos.get(hwnd)
+        return list(n.hijos) if n else []
+
+    def existe(self, hwnd: int) -> bool:
+        return hwnd in self._nodos
+
+    def visible(self, hwnd: int) -> bool:
+        self._gastar(self.lat.mensaje_s)
+        n = self._nodos.get(hwnd)
+        return bool(n and n.visible and (not n.padre or self.visible(n.padre)))
+
+    def padre(self, hwnd: int) -> int:
+        return self._nodos[hwnd].padre
+
+    def clase(self, hwnd: int) -> str:
+        self._gastar(self.lat.mensaje_s)
+        return self._nodos[hwnd].clase
+
+    def ctrl_id(self, hwnd: int) -> int:
+        return self._nodos[hwnd].ctrl_id
+
+    def rect(self, hwnd: int):
+        self._gastar(self.lat.mensaje_s)
+        return self._nodos[hwnd].rect
+
+    def titulo(self, hwnd: int) -> str:
+        self._gastar(self.lat.mensaje_s)
+        return self._nodos[hwnd].titulo
+
+    def texto(self, hwnd: int) -> str:
+        self._gastar(self.lat.mensaje_s)
+        return self._nodos[hwnd].texto
+
+    def set_texto(self, hwnd: int, valor: str) -> bool:
+        self._gastar(self.lat.mensaje_s * 2)
+        self._nodos[hwnd].texto = str(valor)
+        return True
+
+    def click(self, hwnd: int) -> None:
+        self._gastar(self.lat.mensaje_s)
+        n = self._nodos.get(hwnd)
+        if n is None:
+            return
+        if hwnd == self.lupa:
+            self._buscar()
+            return
+        dlg = n.padre
+        if dlg and self._nodos[dlg].clase == "#32770":
+            if any("Mes a Visualizar" in self._nodos[c].titulo for c in self._nodos[dlg].hijos):
+                self._aceptar_mes(dlg)
+            else:
+                self._quitar(dlg)
+
+    def combo_items(self, hwnd: int) -> List[str]:
+        self._gastar(self.lat.mensaje_s * (1 + len(self._nodos[hwnd].items)))
+        return list(self._nodos[hwnd].items)
+
+    def combo_set(self, hwnd: int, idx: int) -> bool:
+        self._gastar(self.lat.mensaje_s * 3)
+        n = self._nodos[hwnd]
+        if hwnd == self.combo and self.rnd.random() < self.lat.fallo_combo:
+            return False
+        if 0 <= idx < len(n.items):
+            n.sel, n.texto = idx, n.items[idx]
+            return True
+        return False
+
+    def menu(self, hwnd: int, ruta: str) -> None:
+        self._gastar(self.lat.menu_s)
+        if ruta.replace(" ", "").lower() == "archivo->capturarservicios":
+            self._mostrar_busqueda(False)
+            self._popup_mes()
+
+    def leer_grid(self, hwnd: int):
+        filas = [
+            [ced, orden, f"C-{ced[-5:]}"]
+            for (mes, ced), orden in sorted(self.servicios.items(), key=lambda kv: kv[0][1])
+            if mes == self.mes_abierto
+        ]
+        self._gastar(self.lat.mensaje_s + self.lat.grid_fila_s * len(filas))
+        return ["Cedula Fallecido", "No Orden Servicio", "Contrato"], filas
+
+    def cerrar(self, hwnd: int) -> None:
+        self._gastar(self.lat.mensaje_s)
+        self._quitar(hwnd)
+
+
+# ==========================================================
+# Driver de búsqueda sobre el simulador
+# ==========================================================
+class DriverSimulado(Driver):
+    """
+    Búsqueda por cédula con los pasos de la entrada por mensajes:
+    WM_SETTEXT edit -> CB_SETCURSEL combo -> WM_SETTEXT edit -> BM_CLICK lupa.
+    `etapas` acumula segundos virtuales por etapa.
+    """
+
+    def __init__(self, nombre: str, sim: SimuladorUI, reintentos_combo: int = 3):
+        self.nombre = nombre
+        self.sim = sim
+        self.reintentos_combo = reintentos_combo
+        self.mes_correcto = False
+        self.etapas: Dict[str, float] = {}
+
+    def _medir(self, etapa: str, t0: float) -> None:
+        self.etapas[etapa] = self.etapas.get(etapa, 0.0) + self.sim.reloj_s - t0
+
+    def abrir_mes(self, mes: Any) -> bool:
+        ui, t0 = self.sim, self.sim.reloj_s
+        ui.menu(ui.main, "Archivo->Capturar Servicios")
+        dlg = next((h for h in ui.ventanas() if ui.buscar_hijo(h, ("Static",), "Mes a Visualizar Servicios")), None)
+        if not dlg:
+            raise TimeoutError("No apareció el popup de 'Mes a Visualizar Servicios'.")
+
+        # como aceptar_popup_mes_servicios: el default del popup no cuenta como mes aplicado
+        aplicado = mes is None
+        if mes is not None:
+            combos = [h for h in ui.hijos(dlg) if ui.clase(h) == "ThunderRT6ComboBox"]
+            ok_mes = ui.combo_set(combos[0], mes[1] - 1)
+            anios = ui.combo_items(combos[1])
+            ok_anio = str(mes[0]) in anios and ui.combo_set(combos[1], anios.index(str(mes[0])))
+            aplicado = ok_mes and ok_anio
+        ui.click(ui.buscar_hijo(dlg, ("ThunderRT6CommandButton", "Button"), "Aceptar"))
+        self._medir("abrir_mes", t0)
+        self.mes_correcto = aplicado
+        return aplicado
+
+    def listar(self) -> Tuple[List[str], List[List[str]]]:
+        """Grid de servicios del mes abierto (lo que lee listar_servicios_mes)."""
+        t0 = self.sim.reloj_s
+        out = self.sim.leer_grid(self.sim.grid)
+        self._medir("listado", t0)
+        return out
+
+    def buscar(self, cedula: str, mes: Any) -> Salida:
+        ui = self.sim
+        if ui.mes_abierto != mes or not ui.visible(ui.combo):
+            self.abrir_mes(mes)
+        try:
+            return self.consultar(cedula), None, self.mes_correcto
+        except Exception as e:
+            return None, e, self.mes_correcto
+
+    def consultar(self, cedula: str) -> dict:
+        """
+        Búsqueda en el mes ya abierto, con el contrato de
+        buscar_por_cedula_fallecido: dict con ok/motivo o excepción tipada.
+        """
+        ui = self.sim
+        t0 = ui.reloj_s
+        ui.set_texto(ui.edit, cedula)
+        ok = False
+        for _ in range(self.reintentos_combo):
+            ok = ui.combo_set(ui.combo, 1)
+            if ok:
+                break
+        if not ok:
+            self._medir("escribir", t0)
+            raise ComboNoSeleccionado("No pude seleccionar la 2da opción del combo.")
+        ui.set_texto(ui.edit, cedula)
+        self._medir("escribir", t0)
+
+        t0 = ui.reloj_s
+        ui.click(ui.lupa)
+        for h in ui.ventanas():
+            msg = ui.buscar_hijo(h, ("Static",))
+            txt = ui.titulo(msg).lower() if msg else ""
+            if "no se encontr" in txt:
+                ui.click(ui.buscar_hijo(h, ("Button",)))
+                self._medir("buscar", t0)
+                return {"ok": False, "motivo": "NO_ENCONTRADO", "cedula": cedula}
+            if "no coinciden los tipos" in txt:
+                ui.click(ui.buscar_hijo(h, ("Button",)))
+                self._medir("buscar", t0)
+                raise ErrorTipos13("PISCO Error 13: No coinciden los tipos.")
+        self._medir("buscar", t0)
+
+        t0 = ui.reloj_s
+        campos: Dict[str, str] = {}
+        llamadas = ui.buscar_top("Control de Llamadas / Novedades")
+        if llamadas:
+            campos.update(Formulario.leer_formulario(llamadas, ui))
+            ui.cerrar(llamadas)
+        campos.update(Formulario.leer_formulario(ui.main, ui))
+        self._medir("leer_formulario", t0)
+
+        no_orden = Formulario.buscar(campos, "orden servicio")
+        return {"ok": True, "cedula": cedula, "no_orden_servicio": no_orden, "campos": campos}
@@ -0,0 +1,314 @@
+# robot/UIDriver.py
+# ==========================================
+# UIDriver.py – operaciones de UI que usa el robot, detrás de una interfaz
+#
+#   UIDriver   : interfaz abstracta (ventanas, hijos, clase, texto, rect, set_texto,
+#                click, combo, menú, grid, cerrar)
+#   Win32UI    : implementación real (win32gui + Mensajes + ListViewRemoto;
+#                clase y ctrl id vía CacheHwnd), con imports diferidos: el
+#                módulo se importa sin pywin32
+#   ui()       : driver en uso (Win32UI salvo que se cambie con usar())
+#
+# robot/SimuladorPisco.py implementa la misma interfaz sobre un modelo en
+# memoria de PISCO, para correr y medir el flujo de captura en Linux.
+# ==========================================
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+Rect = Tuple[int, int, int, int]
+
+WM_SETTEXT = 0x000C
+WM_COMMAND = 0x0111
+WM_CLOSE = 0x0010
+BM_CLICK = 0x00F5
+CB_GETCOUNT = 0x0146
+CB_GETCURSEL = 0x0147
+CB_GETLBTEXT = 0x0148
+CB_GETLBTEXTLEN = 0x0149
+CB_SETCURSEL = 0x014E
+CBN_SELCHANGE = 1
+EN_CHANGE = 0x0300
+
+
+class UIDriver(ABC):
+    """Lo mínimo que el robot necesita de la UI de PISCO."""
+
+    # -------------------------
+    # Árbol de ventanas
+    # -------------------------
+    @abstractmethod
+    def ventanas(self) -> List[int]:
+        """Ventanas de nivel superior visibles."""
+
+    @abstractmethod
+    def hijos(self, hwnd: int) -> List[int]:
+        """Solo el primer nivel."""
+
+    def descendientes(self, hwnd: int) -> List[int]:
+        out: List[int] = []
+        pila = list(reversed(self.hijos(hwnd)))
+        while pila:
+            h = pila.pop()
+            out.append(h)
+            pila.extend(reversed(self.hijos(h)))
+        return out
+
+    @abstractmethod
+    def existe(self, hwnd: int) -> bool:
+        """IsWindow."""
+
+    @abstractmethod
+    def visible(self, hwnd: int) -> bool:
+        """Visible con toda la cadena de padres (IsWindowVisible)."""
+
+    def habilitado(self, hwnd: int) -> bool:
+        return True
+
+    @abstractmethod
+    def padre(self, hwnd: int) -> int:
+        """0 si es de nivel superior."""
+
+    @abstractmethod
+    def clase(self, hwnd: int) -> str:
+        """Nombre de clase Win32 (ThunderRT6TextBox, SysListView32...)."""
+
+    @abstractmethod
+    def ctrl_id(self, hwnd: int) -> int:
+        """GetDlgCtrlID."""
+
+    @abstractmethod
+    def rect(self, hwnd: int) -> Rect:
+        """(left, top, right, bottom) en pantalla."""
+
+    # -------------------------
+    # Texto
+    # -------------------------
+    @abstractmethod
+    def titulo(self, hwnd: int) -> str:
+        """GetWindowText (títulos, labels)."""
+
+    @abstractmethod
+    def texto(self, hwnd: int) -> str:
+        """Texto real del control (WM_GETTEXT)."""
+
+    @abstractmethod
+    def set_texto(self, hwnd: int, valor: str) -> bool:
+        """Escribe el texto, avisa EN_CHANGE al padre y verifica leyendo."""
+
+    # -------------------------
+    # Acciones
+    # -------------------------
+    @abstractmethod
+    def click(self, hwnd: int) -> None:
+        """BM_CLICK (sin mouse)."""
+
+    @abstractmethod
+    def combo_items(self, hwnd: int) -> List[str]:
+        """Textos de los ítems del combo, en orden."""
+
+    @abstractmethod
+    def combo_set(self, hwnd: int, idx: int) -> bool:
+        """Selecciona, avisa CBN_SELCHANGE y verifica."""
+
+    @abstractmethod
+    def menu(self, hwnd: int, ruta: str) -> None:
+        """ruta tipo 'Archivo->Capturar Servicios'."""
+
+    @abstractmethod
+    def leer_grid(self, hwnd: int) -> Tuple[List[str], List[List[str]]]:
+        """(cabeceras, filas) del grid."""
+
+    @abstractmethod
+    def cerrar(self, hwnd: int) -> None:
+        """WM_CLOSE."""
+
+    # -------------------------
+    # Derivadas
+    # -------------------------
+    def buscar_top(self, fragmento: str) -> Optional[int]:
+        """Primera ventana de nivel superior cuyo título contiene `fragmento` (sin mayúsculas)."""
+        f = fragmento.lower()
+        for h in self.ventanas():
+            if f in self.titulo(h).lower():
+                return h
+        return None
+
+    def buscar_hijo(self, hwnd: int, clases: Sequence[str], texto: Optional[str] = None) -> Optional[int]:
+        t = texto.lower() if texto is not None else None
+        for h in self.descendientes(hwnd):
+            if self.clase(h) in clases and (t is None or self.titulo(h).strip().lower() == t):
+                return h
+        return None
+
+
+# ==========================================================
+# Win32
+# ==========================================================
+class Win32UI(UIDriver):
+    def ventanas(self) -> List[int]:
+        import win32gui
+
+        out: List[int] = []
+
+        def cb(h, _):
+            if win32gui.IsWindowVisible(h):
+                out.append(h)
+
+        win32gui.EnumWindows(cb, None)
+        return out
+
+    def hijos(self, hwnd: int) -> List[int]:
+        import win32gui
+
+        GW_HWNDNEXT, GW_CHILD = 2, 5
+        out: List[int] = []
+        try:
+            h = win32gui.GetWindow(hwnd, GW_CHILD)
+            while h:
+                out.append(h)
+                h = win32gui.GetWindow(h, GW_HWNDNEXT)
+        except Exception:
+            pass
+        return out
+
+    def descendientes(self, hwnd: int) -> List[int]:
+        # una sola llamada (EnumChildWindows) en vez de GetWindow por nodo
+        import win32gui
+
+        out: List[int] = []
+        try:
+            win32gui.EnumChildWindows(hwnd, lambda h, _: out.append(h), None)
+        except Exception:
+            pass
+        return out
+
+    def existe(self, hwnd: int) -> bool:
+        import win32gui
+
+        return bool(win32gui.IsWindow(hwnd))
+
+    def visible(self, hwnd: int) -> bool:
+        import win32gui
+
+        return bool(win32gui.IsWindowVisible(hwnd))
+
+    def habilitado(self, hwnd: int) -> bool:
+        import win32gui
+
+        return bool(win32gui.IsWindowEnabled(hwnd))
+
+    def padre(self, hwnd: int) -> int:
+        import win32gui
+
+        return win32gui.GetParent(hwnd)
+
+    def clase(self, hwnd: int) -> str:
+        from robot import CacheHwnd
+
+        return CacheHwnd.clase(hwnd)
+
+    def ctrl_id(self, hwnd: int) -> int:
+        from robot import CacheHwnd
+
+        return CacheHwnd.ctrl_id(hwnd)
+
+    def rect(self, hwnd: int) -> Rect:
+        import win32gui
+
+        return tuple(win32gui.GetWindowRect(hwnd))
+
+    def titulo(self, hwnd: int) -> str:
+        import win32gui
+
+        return (win32gui.GetWindowText(hwnd) or "").strip()
+
+    def texto(self, hwnd: int) -> str:
+        from robot import Mensajes
+
+        return Mensajes.texto(hwnd)
+
+    def _notificar(self, hwnd: int, codigo: int) -> None:
+        import win32gui
+
+        parent = win32gui.GetParent(hwnd)
+        if parent:
+            win32gui.PostMessage(parent, WM_COMMAND, (codigo << 16) | (self.ctrl_id(hwnd) & 0xFFFF), hwnd)
+
+    def set_texto(self, hwnd: int, valor: str) -> bool:
+        from robot import Mensajes
+
+        Mensajes.enviar(hwnd, WM_SETTEXT, 0, str(valor))
+        self._notificar(hwnd, EN_CHANGE)
+        return self.texto(hwnd) == str(valor)
+
+    def click(self, hwnd: int) -> None:
+        import win32gui
+
+        win32gui.PostMessage(hwnd, BM_CLICK, 0, 0)
+
+    def combo_items(self, hwnd: int) -> List[str]:
+        import ctypes
+
+        from robot import Mensajes
+
+        items: List[str] = []
+        for i in range(max(0, Mensajes.enviar(hwnd, CB_GETCOUNT))):
+            ln = Mensajes.enviar(hwnd, CB_GETLBTEXTLEN, i)
+            if ln < 0:
+                items.append("")
+                continue
+            buf = ctypes.create_unicode_buffer(ln + 1)
+            Mensajes.enviar(hwnd, CB_GETLBTEXT, i, buf)
+            items.append((buf.value or "").strip())
+        return items
+
+    def combo_set(self, hwnd: int, idx: int) -> bool:
+        # CBN_SELCHANGE síncrono y verificación por el texto del combo:
+        # CB_GETCURSEL devolvería idx aunque VB6 no procesara el cambio
+        import win32gui
+
+        from robot import Mensajes
+
+        items = self.combo_items(hwnd)
+        if not 0 <= idx < len(items):
+            return False
+        Mensajes.enviar(hwnd, CB_SETCURSEL, idx)
+        parent = win32gui.GetParent(hwnd)
+        if parent:
+            Mensajes.enviar(parent, WM_COMMAND, (CBN_SELCHANGE << 16) | (self.ctrl_id(hwnd) & 0xFFFF), hwnd)
+        return self.texto(hwnd).strip().lower() == items[idx].lower()
+
+    def menu(self, hwnd: int, ruta: str) -> None:
+        from pywinauto import Desktop
+
+        Desktop(backend="win32").window(handle=hwnd).menu_select(ruta)
+
+    def leer_grid(self, hwnd: int) -> Tuple[List[str], List[List[str]]]:
+        from robot.ListViewRemoto import ListViewRemoto, leer_tabla
+
+        with ListViewRemoto(hwnd) as lector:
+            return leer_tabla(lector)
+
+    def cerrar(self, hwnd: int) -> None:
+        import win32gui
+
+        win32gui.PostMessage(hwnd, WM_CLOSE, 0, 0)
+
+
+_actual: Optional[UIDriver] = None
+
+
+def ui() -> UIDriver:
+    global _actual
+    if _actual is None:
+        _actual = Win32UI()
+    return _actual
+
+
+def usar(driver: UIDriver) -> None:
+    """Cambia el driver en uso (ej. el simulador en benchmarks)."""
+    global _actual
+    _actual = driver
@@ -0,0 +1,119 @@
+# robot/Watchdog.py
+# ==========================================
+# Watchdog.py – detección de sesión PISCO colgada + reinicio
+#
+# Cuenta fallos consecutivos de la captura y vigila que la ventana principal
+# responda (ping WM_NULL con timeout). Al pasar el umbral:
+#   desmontar (cerrar_pisco / taskkill) -> montar (open_and_login) -> el
+#   llamador reabre Capturar Servicios y sigue desde la fila pendiente.
+#
+# Config opcional (config.ini):
+#   [watchdog]
+#   fallos_seguidos = 3
+#   max_reinicios = 3
+#   ping_ms = 1500
+# ==========================================
+
+from __future__ import annotations
+
+import configparser
+import logging
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from robot import Mensajes
+from robot.Mensajes import PiscoHung
+
+logger = logging.getLogger("Robot62.Watchdog")
+
+
+class SesionIrrecuperable(RuntimeError):
+    """Se agotaron los reinicios permitidos en la corrida (o PISCO no volvió a abrir)."""
+
+
+class WatchdogSesion:
+    def __init__(self, fallos_seguidos: int = 3, max_reinicios: int = 3, ping_ms: int = 1500):
+        self.fallos_seguidos = max(1, fallos_seguidos)
+        self.max_reinicios = max(0, max_reinicios)
+        self.ping_ms = ping_ms
+        self.fallos = 0
+        self.reinicios = 0
+        self.recuperaciones: List[float] = []  # segundos por reinicio
+
+    # -------------------------
+    # Salud
+    # -------------------------
+    def responde(self, hwnd: Optional[int]) -> bool:
+        """Ping a la ventana principal; sin HWND no se puede afirmar que esté colgada."""
+        if not hwnd:
+            return True
+        return Mensajes.responde(hwnd, timeout_ms=self.ping_ms)
+
+    def exito(self) -> None:
+        self.fallos = 0
+
+    def fallo(self, exc: Optional[BaseException], hwnd: Optional[int] = None) -> bool:
+        """
+        Anota un fallo. Retorna True si hay que reiniciar la sesión:
+        PISCO colgado (PiscoHung o no responde el ping) o N fallos seguidos.
+        """
+        self.fallos += 1
+        if isinstance(exc, PiscoHung):
+            logger.warning("Watchdog: PISCO colgado (%s).", exc)
+            return True
+        if not self.responde(hwnd):
+            logger.warning("Watchdog: la ventana principal no responde (ping %sms).", self.ping_ms)
+            return True
+        if self.fallos >= self.fallos_seguidos:
+            logger.warning("Watchdog: %s fallos seguidos.", self.fallos)
+            return True
+        return False
+
+    # -------------------------
+    # Reinicio
+    # -------------------------
+    def reiniciar(self, desmontar: Callable[[], None], montar: Callable[[], object]):
+        """
+        desmontar(): cierra/mata la sesión actual (best-effort).
+        montar(): abre PISCO + login y retorna la nueva ventana principal.
+        """
+        if self.reinicios >= self.max_reinicios:
+            raise SesionIrrecuperable(f"PISCO sigue fallando tras {self.reinicios} reinicios.")
+
+        self.reinicios += 1
+        t0 = time.time()
+        logger.warning("Watchdog: reiniciando sesión PISCO (%s/%s)...", self.reinicios, self.max_reinicios)
+
+        try:
+            desmontar()
+        except Exception as e:
+            logger.warning("Watchdog: error cerrando la sesión anterior (sigo): %s", e)
+
+        try:
+            nueva = montar()
+        except Exception as e:
+            raise SesionIrrecuperable(f"No pude volver a abrir PISCO: {e}") from e
+        dt = time.time() - t0
+        self.recuperaciones.append(dt)
+        self.fallos = 0
+        logger.info("Watchdog: sesión recuperada en %.1fs.", dt)
+        return nueva
+
+    def resumen(self) -> dict:
+        total = sum(self.recuperaciones)
+        return {
+            "reinicios": self.reinicios,
+            "recuperacion_total_s": round(total, 1),
+            "recuperacion_max_s": round(max(self.recuperaciones, default=0.0), 1),
+        }
+
+
+def desde_config(config_path: Path | str) -> WatchdogSesion:
+    cp = configparser.ConfigParser()
+    cp.read(str(config_path), encoding="utf-8")
+    return WatchdogSesion(
+        fallos_seguidos=cp.getint("watchdog", "fallos_seguidos", fallback=3),
+        max_reinicios=cp.getint("watchdog", "max_reinicios", fallback=3),
+        ping_ms=cp.getint("watchdog", "ping_ms", fallback=1500),
+    )
@@ -3,13 +3,17 @@ import csv
 import hashlib
 import json
 import configparser
+import logging
 from pathlib import Path
 from datetime import datetime
 
-import gspread
-from google.oauth2.service_account import Credentials
-from typing import Optional
+from typing import Dict, List, Optional, Set
 
+from robot import Columnas, Reclamos
+from robot.MascotaIds import MascotaIdAllocator, abrir_allocator, id_preferido
+from robot.Reclamos import Reclamo
+
+logger = logging.getLogger("Robot62.Sheets")
 
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
@@ -75,6 +79,10 @@ def connect(credentials_path: str, config_path: Optional[str] = None):
 
     spreadsheet_id, sheet_name = _load_sheets_config(config_path)
 
+    # gspread/google-auth solo al conectar: el módulo se importa sin ellos (Linux, Benchmark)
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     creds = Credentials.from_service_account_file(credentials_path, scopes=SCOPES)
     client = gspread.authorize(creds)
     book = client.open_by_key(spreadsheet_id)
@@ -95,6 +103,57 @@ def is_target_row(prestacion_value: str) -> bool:
     return v == "pendiente"
 
 
+# ------------------------------------------------------------
+# Reclamo de filas (varios robots sobre la misma hoja) – ver robot/Reclamos.py
+# ------------------------------------------------------------
+#   [reclamos]
+#   habilitado = false
+#   host =                    (vacío = nombre del equipo)
+#   lease_minutos = 120       (main lo renueva por lote)
+#   espera_verificacion_s = 3
+#   max_filas = 0             (0 = todas; >0 = tanda al azar, para repartir entre hosts)
+class HojaGspread:
+    """Backend de reclamos sobre un worksheet de gspread (columnas 1-based)."""
+
+    def __init__(self, ws):
+        self.ws = ws
+
+    def leer_columna(self, col: int) -> List[str]:
+        """Valores de la fila 2 en adelante."""
+        return self.ws.col_values(col)[1:]
+
+    def escribir(self, col: int, valores: Dict[int, str]) -> None:
+        from gspread.utils import rowcol_to_a1
+
+        # celda por celda (no un rango): no pisa filas intermedias que otro host cambió
+        self.ws.batch_update(
+            [{"range": rowcol_to_a1(r, col), "values": [[v]]} for r, v in sorted(valores.items())],
+            value_input_option="RAW",
+        )
+
+
+_reclamo: Optional[Reclamo] = None
+
+
+def reclamo_actual() -> Optional[Reclamo]:
+    """Reclamo de la última generate_pendientes_csv (None si [reclamos] no está habilitado)."""
+    return _reclamo
+
+
+def _load_reclamos_config(config_path: str) -> Optional[dict]:
+    """None si [reclamos] no está habilitado."""
+    cp = configparser.ConfigParser()
+    cp.read(config_path, encoding="utf-8")
+    if not cp.getboolean("reclamos", "habilitado", fallback=False):
+        return None
+    return {
+        "host": (cp.get("reclamos", "host", fallback="") or "").strip() or Reclamos.host_id(),
+        "lease_minutos": cp.getfloat("reclamos", "lease_minutos", fallback=120),
+        "espera_verificacion_s": cp.getfloat("reclamos", "espera_verificacion_s", fallback=3.0),
+        "max_filas": cp.getint("reclamos", "max_filas", fallback=0),
+    }
+
+
 def ensure_daily_folder(servicios_dir: str) -> str:
     """Crea ./robot/servicios/YYYY-MM-DD y devuelve el path."""
     today = datetime.now().strftime("%Y-%m-%d")
@@ -108,67 +167,37 @@ def find_col_index(headers, candidates):
     Busca un índice de columna por posibles nombres.
     candidates: lista de strings (nombres posibles)
     """
-    norm_headers = [normalize(h).lower() for h in headers]
+    norm_headers = [Columnas.normalizar(h) for h in headers]
     for cand in candidates:
-        c = cand.lower()
+        c = Columnas.normalizar(cand)
         if c in norm_headers:
             return norm_headers.index(c)
     return None
 
 
-def make_mascota_id(row_values, salt="PISCO", used_ids=None) -> str:
+def make_mascota_id(row_values, salt="PISCO", allocator: Optional[MascotaIdAllocator] = None) -> str:
     """
     Genera un M#### determinístico usando hash (0..9999).
-    Evita duplicados dentro del CSV usando used_ids.
+    Con allocator: evita IDs ya usados (hoja, corridas anteriores y este CSV).
     """
-    base = "|".join([normalize(x) for x in row_values])
-    h = hashlib.sha256((salt + "|" + base).encode("utf-8")).hexdigest()
-
-    # Primer intento
-    n = int(h[:8], 16) % 10000
-    candidate = f"M{n:04d}"
-
-    if used_ids is None:
-        return candidate
-
-    if candidate not in used_ids:
-        return candidate
-
-    for i in range(1, 20000):
-        hi = hashlib.sha256((h + f"|{i}").encode("utf-8")).hexdigest()
-        n2 = int(hi[:8], 16) % 10000
-        candidate2 = f"M{n2:04d}"
-        if candidate2 not in used_ids:
-            return candidate2
+    if allocator is None:
+        return f"M{id_preferido(row_values, salt):04d}"
+    return allocator.asignar(row_values)
 
-    for n3 in range(10000):
-        candidate3 = f"M{n3:04d}"
-        if candidate3 not in used_ids:
-            return candidate3
 
-    raise RuntimeError("No hay IDs disponibles M0000..M9999 (se agotaron).")
-
-
-def export_filtered_to_csv(all_rows, out_csv_path):
+def export_filtered_to_csv(
+    all_rows, out_csv_path, allocator: Optional[MascotaIdAllocator] = None, filas: Optional[Set[int]] = None
+):
+    """filas: si se pasa, se exportan esas filas de la hoja (reclamadas) en vez de las 'Pendiente'."""
     if not all_rows:
         raise RuntimeError("La hoja está vacía (no hay filas).")
 
     headers = all_rows[0]
     data_rows = all_rows[1:]
 
-    idx_prestacion = find_col_index(headers, [
-        "N° Prestacion",
-        "N Prestacion",
-        "N Prestaciones",
-        "N° Prestaciones",
-        "N Prestación",
-        "N° Prestación",
-        "No Prestaciones",
-        "No Prestación",
-        "Prestaciones",
-        "Prestación",
-    ])
+    cols = Columnas.resolver(headers)
 
+    idx_prestacion = cols["prestacion"]
     if idx_prestacion is None:
         idx_prestacion = PRESTACION_COL_INDEX
     if len(headers) <= idx_prestacion:
@@ -177,19 +206,11 @@ def export_filtered_to_csv(all_rows, out_csv_path):
             "Revisa el nombre de la cabecera o ajusta PRESTACION_COL_INDEX."
         )
 
-    idx_tipo = find_col_index(headers, ["TIPO", "Tipo"])
-    idx_categoria = find_col_index(headers, ["Categoria", "Categoría"])
-    idx_clasificacion = find_col_index(headers, ["Clasificacion", "Clasificación"])
+    idx_tipo = cols["tipo"]
+    idx_categoria = cols["categoria"]
+    idx_clasificacion = cols["clasificacion"]
 
-    idx_cc_fallecido = find_col_index(headers, [
-        "CC: Del Fallecido",
-        "CC Del Fallecido",
-        "CC Fallecido",
-        "Cedula Fallecido",
-        "Cédula Fallecido",
-        "Documento Fallecido",
-        "Documento del Fallecido",
-    ])
+    idx_cc_fallecido = cols["cc_fallecido"]
 
     if idx_cc_fallecido is None:
         raise RuntimeError(
@@ -197,7 +218,11 @@ def export_filtered_to_csv(all_rows, out_csv_path):
             "Dime el nombre exacto como aparece en Google Sheets."
         )
 
-    used_ids = set()
+    # IDs M#### ya presentes en la hoja => ocupados
+    if allocator is None:
+        allocator = MascotaIdAllocator()
+    allocator.sembrar(r[idx_cc_fallecido] for r in data_rows if len(r) > idx_cc_fallecido)
+
     filtered = []
     row_map = {}
 
@@ -209,7 +234,10 @@ def export_filtered_to_csv(all_rows, out_csv_path):
 
         prestacion_val = row[idx_prestacion] if len(row) > idx_prestacion else ""
 
-        if not is_target_row(prestacion_val):
+        if filas is not None:
+            if gs_row not in filas:
+                continue
+        elif not is_target_row(prestacion_val):
             continue
 
         # ✅ Regla: dejar la columna "N Prestaciones" vacía en el CSV
@@ -225,9 +253,7 @@ def export_filtered_to_csv(all_rows, out_csv_path):
 
         cc_val = normalize(row[idx_cc_fallecido])
         if mascota_flag and cc_val == "":
-            mid = make_mascota_id(row, used_ids=used_ids)
-            row[idx_cc_fallecido] = mid
-            used_ids.add(mid)
+            row[idx_cc_fallecido] = make_mascota_id(row, allocator=allocator)
 
         rid = hashlib.sha1("|".join([normalize(x) for x in row]).encode("utf-8")).hexdigest()
         row_map.setdefault(rid, []).append(gs_row)
@@ -257,14 +283,39 @@ def generate_pendientes_csv(base_dir: Path | str) -> Optional[Path]:
 
     # ✅ connect ahora lee spreadsheet_id y sheet_name desde ./robot/config.ini automáticamente
     ws = connect(credentials_path)
+    Columnas.configurar(base_dir / "config.ini")
     all_rows = ws.get_all_values()
 
+    # Varios robots sobre la misma hoja: exportar solo las filas reclamadas por este host
+    global _reclamo
+    filas = None
+    _reclamo = None
+    rec_cfg = _load_reclamos_config(str(base_dir / "config.ini"))
+    if rec_cfg and all_rows:
+        idx = Columnas.resolver(all_rows[0])["prestacion"]
+        idx = PRESTACION_COL_INDEX if idx is None else idx
+        _reclamo = Reclamo(
+            HojaGspread(ws),
+            idx + 1,
+            host=rec_cfg["host"],
+            lease_minutos=rec_cfg["lease_minutos"],
+            espera_verificacion_s=rec_cfg["espera_verificacion_s"],
+        )
+        filas = _reclamo.reclamar(max_filas=rec_cfg["max_filas"])
+        logger.info("Reclamos: host=%s filas reclamadas=%s", rec_cfg["host"], len(filas))
+        if not filas:
+            return None
+
     daily_folder = ensure_daily_folder(servicios_dir=servicios_dir)
     hora = datetime.now().strftime("%H%M%S")
     filename = f"Prestacion_Pendiente_{hora}.csv"
     out_csv_path = os.path.join(daily_folder, filename)
 
-    n = export_filtered_to_csv(all_rows, out_csv_path)
+    # IDs de corridas anteriores cuyas filas nunca llegaron a PISCO vuelven a estar libres
+    allocator = abrir_allocator(base_dir, liberar_provisionales=True)
+    n = export_filtered_to_csv(all_rows, out_csv_path, allocator=allocator, filas=filas)
+    allocator.guardar()
+    allocator.reportar()
 
     if n == 0:
         return None
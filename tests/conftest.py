@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# los módulos se importan como en main.py: from robot import X
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
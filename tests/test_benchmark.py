@@ -0,0 +1,24 @@
+import pytest
+
+from robot.Benchmark import correr
+from robot.SimuladorPisco import SimuladorUI
+from robot.UIDriver import UIDriver
+
+
+def test_uidriver_es_abstracto():
+    with pytest.raises(TypeError):
+        UIDriver()
+    assert issubclass(SimuladorUI, UIDriver)
+
+
+@pytest.mark.parametrize("conciliacion", [True, False])
+def test_captura_de_main_contra_el_simulador(conciliacion):
+    rep = correr(filas=60, meses=2, conciliacion=conciliacion)
+
+    assert rep["pendientes"] == 0
+    assert rep["con_orden"] + rep["no_registradas"] + rep["marcadas"] == 60
+    assert rep["escrituras_hoja"] == 1
+    # la conciliación resuelve por el grid del mes: casi no hay búsquedas individuales
+    if conciliacion:
+        assert "listado" in rep["pasos_s"]
+        assert rep["pasos_s"]["buscar"] < 60 * 1.8 / 2
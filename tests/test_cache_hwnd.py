@@ -0,0 +1,65 @@
+import pytest
+
+from robot import CacheHwnd
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    vivas = {10, 20}
+    llamadas = {"IsWindow": 0, "GetClassName": 0}
+
+    def es_ventana(h):
+        llamadas["IsWindow"] += 1
+        return h in vivas
+
+    def leer(h):
+        llamadas["GetClassName"] += 1
+        return f"Clase{h}"
+
+    monkeypatch.setattr(CacheHwnd, "_es_ventana", es_ventana)
+    monkeypatch.setattr(CacheHwnd, "_datos", {})
+    monkeypatch.setattr(CacheHwnd, "_stats", dict.fromkeys(CacheHwnd._stats, 0))
+    monkeypatch.setattr(CacheHwnd, "_con_hook", False)
+    return vivas, llamadas, lambda h: CacheHwnd._obtener(h, CacheHwnd._CLASE, leer)
+
+
+def test_con_hook_los_aciertos_no_llaman_a_windows(cache, monkeypatch):
+    _, llamadas, clase = cache
+    monkeypatch.setattr(CacheHwnd, "_con_hook", True)
+
+    assert [clase(10) for _ in range(5)] == ["Clase10"] * 5
+    assert llamadas == {"IsWindow": 0, "GetClassName": 1}
+    st = CacheHwnd.estadisticas()
+    assert (st["evitadas"], st["validadas"], st["reales"]) == (4, 0, 1)
+
+
+def test_sin_hook_cada_acierto_se_valida_con_iswindow(cache):
+    vivas, llamadas, clase = cache
+
+    assert [clase(10) for _ in range(3)] == ["Clase10"] * 3
+    assert llamadas == {"IsWindow": 2, "GetClassName": 1}
+
+    vivas.discard(10)  # ventana destruida: se descarta y se vuelve a leer
+    clase(10)
+    st = CacheHwnd.estadisticas()
+    assert (st["evitadas"], st["validadas"], st["invalidadas"], st["reales"]) == (0, 2, 1, 2)
+
+
+def test_cerrar_dialogos_vacia_la_cache_sin_esperar_al_hook(cache, monkeypatch):
+    from types import SimpleNamespace
+
+    from robot import PISCO
+
+    _, _, clase = cache
+    monkeypatch.setattr(CacheHwnd, "_con_hook", True)
+    clase(10)
+    abiertos = [77]
+    monkeypatch.setattr(PISCO, "win32gui", SimpleNamespace(
+        FindWindow=lambda cls, titulo: abiertos[0] if abiertos else 0,
+        PostMessage=lambda h, msg, w, l: abiertos.clear(),
+    ))
+    monkeypatch.setattr(PISCO, "win32con", SimpleNamespace(WM_CLOSE=0x0010))
+    monkeypatch.setattr(PISCO.time, "sleep", lambda s: None)
+
+    assert PISCO._close_any_dialogs(timeout=1.0) == 1
+    assert CacheHwnd._datos == {}
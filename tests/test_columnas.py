@@ -0,0 +1,35 @@
+import pytest
+
+from robot import Columnas
+
+
+@pytest.fixture
+def config(tmp_path):
+    def escribir(texto):
+        path = tmp_path / "config.ini"
+        path.write_text(texto, encoding="utf-8")
+        Columnas.configurar(path)
+
+    yield escribir
+    Columnas.configurar(tmp_path / "no_existe.ini")
+
+
+def test_resuelve_sinonimos_y_tildes():
+    headers = ["Fecha", "CC: Del Fallecido", "N° Prestación "]
+    assert Columnas.indice(headers, "prestacion") == 2
+    assert Columnas.nombre(headers, "cc_fallecido") == "CC: Del Fallecido"
+
+
+def test_campos_extra_por_nombre_de_cabecera(config):
+    config("")
+    headers = ["CC Fallecido", "Fecha Orden", "Contrato"]
+    assert Columnas.indice_libre(headers, "contrato ") == 2
+    assert Columnas.indice_libre(headers, "Fecha  Orden") == 1
+    assert Columnas.indice_libre(headers, "Plan") is None
+
+
+def test_campos_extra_renombrada_en_config(config):
+    config("[columnas]\ncontrato = Nro Contrato | Contrato N°\n")
+    assert Columnas.indice_libre(["CC Fallecido", "Contrato N°"], "Contrato") == 1
+    # sin la cabecera renombrada, vale el nombre original
+    assert Columnas.indice_libre(["Contrato"], "Contrato") == 0
@@ -0,0 +1,49 @@
+from robot import Dedup
+
+HEADERS = ["Fecha Servicio", "CC: Del Fallecido", "Tipo", "N° Prestacion"]
+CLAVE = list(Dedup.CLAVE_DEFAULT)
+
+
+def fila(cc, fecha="15/03/2026", tipo="Humano"):
+    return {"Fecha Servicio": fecha, "CC: Del Fallecido": cc, "Tipo": tipo, "N° Prestacion": ""}
+
+
+def rid(r):
+    return "|".join(r[h] for h in HEADERS)
+
+
+def test_agrupa_duplicados_y_mueve_sus_filas_al_representante():
+    filas = [fila("1.234.567"), fila("1234567 "), fila("1234567", tipo=" HUMANO"), fila("1234567", fecha="16/03/2026")]
+    row_map = {rid(r): [n] for n, r in enumerate(filas, start=2)}
+
+    out = Dedup.coalescer(filas, HEADERS, CLAVE, row_map, rid)
+
+    assert out == [filas[0], filas[3]]
+    assert row_map == {rid(filas[0]): [2, 3, 4], rid(filas[3]): [5]}
+
+
+def test_falta_una_columna_de_la_clave_no_agrupa():
+    headers = ["Fecha Servicio", "CC: Del Fallecido", "N° Prestacion"]  # sin Tipo
+    filas = [fila("1"), fila("1")]
+    row_map = {"a": [2], "b": [3]}
+
+    assert Dedup.coalescer(filas, headers, CLAVE, row_map, rid) is filas
+    assert row_map == {"a": [2], "b": [3]}
+    assert Dedup.funcion_clave(headers, CLAVE) is None
+
+
+def test_clave_sin_cedula_o_vacia_no_agrupa():
+    filas = [fila("1"), fila("2")]
+    assert Dedup.coalescer(filas, HEADERS, ["fecha_servicio", "tipo"], {}, rid) is filas
+    assert Dedup.coalescer(filas, HEADERS, [], {}, rid) is filas
+
+
+def test_clave_desde_config(tmp_path):
+    cfg = tmp_path / "config.ini"
+    assert Dedup.clave_desde_config(cfg) == CLAVE
+
+    cfg.write_text("[dedup]\nclave = CC_Fallecido , fecha_servicio,\n", encoding="utf-8")
+    assert Dedup.clave_desde_config(cfg) == ["cc_fallecido", "fecha_servicio"]
+
+    cfg.write_text("[dedup]\nclave =\n", encoding="utf-8")
+    assert Dedup.clave_desde_config(cfg) == []
@@ -0,0 +1,69 @@
+from robot.PISCO import ErrorDatos, parsear_errores_datos, unir_errores_csv
+
+CSV = [
+    {"CC: Del Fallecido": "111", "N° Prestacion": ""},
+    {"CC: Del Fallecido": "111", "N° Prestacion": ""},
+    {"CC: Del Fallecido": "111", "N° Prestacion": ""},
+    {"CC: Del Fallecido": "222", "N° Prestacion": ""},
+    {"CC: Del Fallecido": "3.333", "N° Prestacion": ""},
+]
+COL_CC = "CC: Del Fallecido"
+
+
+def test_parsea_la_tabla_datos_con_cabecera_en_la_primera_fila():
+    filas = [
+        ["Fila", "Identificacion", "Nombre", "Error"],
+        ["2", "111", "ANA", "Fecha inválida"],
+        ["5", "222", "LUIS", "Sede no existe"],
+        ["6", "3333", "", ""],
+        [],
+    ]
+    errores = parsear_errores_datos([], filas)
+    assert errores == [
+        ErrorDatos(fila=2, identificacion="111", error="Fecha inválida", nombre="ANA"),
+        ErrorDatos(fila=5, identificacion="222", error="Sede no existe", nombre="LUIS"),
+    ]
+
+
+def test_fila_que_cuenta_la_cabecera():
+    # PISCO numera contando la cabecera: fila 2 = 1ra fila de datos
+    errores = [
+        ErrorDatos(fila=2, identificacion="111", error="E1"),
+        ErrorDatos(fila=5, identificacion="222", error="E2"),
+        ErrorDatos(fila=6, identificacion="3333", error="E3"),
+    ]
+    marcadas, sin_fila = unir_errores_csv(CSV, COL_CC, errores)
+    # con "fila-1 primero" E1 habría caído en la 2da fila de 111
+    assert marcadas == {0: "E1", 3: "E2", 4: "E3"}
+    assert sin_fila == []
+
+
+def test_fila_1_based_sobre_datos():
+    errores = [
+        ErrorDatos(fila=3, identificacion="111", error="E1"),
+        ErrorDatos(fila=4, identificacion="222", error="E2"),
+    ]
+    marcadas, _ = unir_errores_csv(CSV, COL_CC, errores)
+    assert marcadas == {2: "E1", 3: "E2"}
+
+
+def test_sin_identificacion_usa_la_misma_numeracion():
+    errores = [
+        ErrorDatos(fila=5, identificacion="222", error="E2"),
+        ErrorDatos(fila=2, identificacion="", error="E0"),
+        ErrorDatos(fila=9, identificacion="", error="fuera"),
+    ]
+    marcadas, sin_fila = unir_errores_csv(CSV, COL_CC, errores)
+    assert marcadas == {3: "E2", 0: "E0"}
+    assert [e.error for e in sin_fila] == ["fuera"]
+
+
+def test_fila_que_no_confirma_cae_en_la_cedula():
+    errores = [
+        ErrorDatos(fila=4, identificacion="222", error="E2"),
+        ErrorDatos(fila=4, identificacion="111", error="E1"),
+        ErrorDatos(fila=1, identificacion="999", error="ajena"),
+    ]
+    marcadas, sin_fila = unir_errores_csv(CSV, COL_CC, errores)
+    assert marcadas == {3: "E2", 0: "E1"}
+    assert [e.error for e in sin_fila] == ["ajena"]
@@ -0,0 +1,57 @@
+import re
+
+from robot.Formulario import Control, buscar, buscar_por_patron, emparejar
+
+_h = iter(range(1000, 2000))
+
+
+def label(texto, l, t, r=None):
+    return Control(next(_h), "Static", texto, l, t, r if r is not None else l + 100, t + 16)
+
+
+def campo(texto, l, t, alto=20, clase="ThunderRT6TextBox"):
+    return Control(next(_h), clase, texto, l, t, l + 120, t + alto)
+
+
+def test_cada_label_con_el_campo_mas_cercano_a_su_derecha():
+    controles = [
+        label("* No Orden Servicio:", 10, 10),
+        label("Contrato Nro", 10, 40),
+        campo("05-0791-26", 115, 12),
+        campo("lejano", 400, 10),
+        campo("C-123", 118, 38, clase="ThunderRT6ComboBox"),
+        campo("a la izquierda", 0, 70),
+        label("Sede", 150, 70),
+    ]
+    assert emparejar(controles) == {"no orden servicio": "05-0791-26", "contrato nro": "C-123"}
+
+
+def test_descarta_textareas_y_campos_desalineados():
+    controles = [
+        label("Observaciones", 10, 10),
+        campo("texto largo", 115, 10, alto=80),
+        label("Fecha", 10, 100),
+        campo("01/03/2026", 115, 100 + 15),  # más de DY_MAX por debajo
+    ]
+    assert emparejar(controles) == {}
+
+
+def test_labels_repetidos_gana_el_primero_con_valor():
+    controles = [
+        label("Estado", 10, 10),
+        campo("", 115, 10),
+        label("Estado:", 10, 200),
+        campo("ACTIVO", 115, 200),
+        label("ESTADO", 10, 300),
+        campo("otro", 115, 300),
+    ]
+    assert emparejar(controles) == {"estado": "ACTIVO"}
+
+
+def test_buscar_por_fragmentos_y_patron():
+    campos = {"nro contrato": "", "no orden servicio": "05-0791-26", "orden interna": "X"}
+    assert buscar(campos, "Orden", "Servicio:") == "05-0791-26"
+    assert buscar(campos, "contrato") is None
+
+    controles = [label("05-0000-26", 0, 0), campo("abc", 0, 30), campo("05-0791-26", 0, 60)]
+    assert buscar_por_patron(controles, re.compile(r"\d{2}-\d{4}-\d{2}$")) == "05-0791-26"
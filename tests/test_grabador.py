@@ -0,0 +1,42 @@
+import pytest
+
+from robot import Localizadores
+from robot.Grabador import Grabador, ReplayUI, SoloLectura
+from robot.SimuladorPisco import SimuladorUI
+
+
+@pytest.fixture
+def replay(tmp_path):
+    sim = SimuladorUI({})
+    sim.menu(sim.main, "Archivo->Capturar Servicios")
+    dlg = next(h for h in sim.ventanas() if h != sim.main)
+    sim.click(sim.buscar_hijo(dlg, ("ThunderRT6CommandButton",), "Aceptar"))
+
+    path = Grabador(tmp_path).grabar("busqueda", sim.main, {"combo": sim.combo, "edit": sim.edit}, ui=sim)
+    return sim, ReplayUI.desde_archivo(path)
+
+
+def test_replay_sirve_la_grabacion_a_los_localizadores(replay):
+    sim, ui = replay
+    assert ui.raiz == sim.main
+    assert ui.clase(sim.edit) == "ThunderRT6TextBox"
+    assert ui.texto(sim.combo) == sim.texto(sim.combo)
+
+    combo, edit, _ = Localizadores.busqueda(ui, ui.raiz)
+    assert (combo, edit) == (ui.elegidos["combo"], ui.elegidos["edit"])
+
+
+@pytest.mark.parametrize(
+    "accion",
+    [
+        lambda ui, h: ui.set_texto(h, "123"),
+        lambda ui, h: ui.click(h),
+        lambda ui, h: ui.combo_set(h, 1),
+        lambda ui, h: ui.menu(h, "Archivo->Capturar Servicios"),
+        lambda ui, h: ui.cerrar(h),
+    ],
+)
+def test_replay_es_de_solo_lectura(replay, accion):
+    sim, ui = replay
+    with pytest.raises(SoloLectura):
+        accion(ui, sim.edit)
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from robot import PISCO
+
+
+class Reloj:
+    def __init__(self):
+        self.t = 1000.0
+
+    def time(self):
+        return self.t
+
+    def sleep(self, s):
+        self.t += s
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    r = Reloj()
+    monkeypatch.setattr(PISCO, "time", SimpleNamespace(time=r.time, sleep=r.sleep))
+    # el popup final nunca aparece
+    monkeypatch.setattr(PISCO, "win32gui", SimpleNamespace(FindWindow=lambda *a: 0))
+    return r
+
+
+def _monitor(monkeypatch, reloj, avanza_hasta=None):
+    """Monitor falso: hay progreso mientras el reloj no pase `avanza_hasta`."""
+
+    class Monitor:
+        def __init__(self, hwnd):
+            self.mig_hwnd = hwnd
+            self.filas = None
+
+        def hubo_progreso(self):
+            return avanza_hasta is not None and reloj.t < avanza_hasta
+
+        def cerrar(self):
+            pass
+
+    monkeypatch.setattr(PISCO, "_MonitorProgreso", Monitor)
+
+
+def test_default_estancado_corta_antes_del_plazo():
+    cfg = PISCO.MigracionConfig()
+    assert cfg.estancado < cfg.timeout_base <= cfg.timeout_guardar(cfg.lote)
+
+
+def test_pisco_colgado_aborta_en_estancado(monkeypatch, reloj):
+    _monitor(monkeypatch, reloj)
+    t0 = reloj.t
+    with pytest.raises(PISCO.GuardarEstancado):
+        PISCO._wait_proceso_finalizado(SimpleNamespace(handle=1), timeout=160, estancado=45)
+    assert 45 <= reloj.t - t0 < 46
+
+
+def test_deja_de_avanzar_cuenta_desde_el_ultimo_avance(monkeypatch, reloj):
+    _monitor(monkeypatch, reloj, avanza_hasta=reloj.t + 30)
+    t0 = reloj.t
+    with pytest.raises(PISCO.GuardarEstancado):
+        PISCO._wait_proceso_finalizado(SimpleNamespace(handle=1), timeout=160, estancado=45)
+    assert reloj.t - t0 == pytest.approx(30 + 45, abs=0.5)
+
+
+def test_plazo_vencido_sin_monitor_es_estancado(monkeypatch, reloj):
+    _monitor(monkeypatch, reloj)
+    with pytest.raises(PISCO.GuardarEstancado):
+        PISCO._wait_proceso_finalizado(None, timeout=20, estancado=45)
+
+
+def test_tope_con_progreso_es_timeout_comun(monkeypatch, reloj):
+    _monitor(monkeypatch, reloj, avanza_hasta=float("inf"))
+    t0 = reloj.t
+    with pytest.raises(TimeoutError) as exc:
+        PISCO._wait_proceso_finalizado(SimpleNamespace(handle=1), timeout=10, estancado=45)
+    assert type(exc.value) is TimeoutError
+    assert reloj.t - t0 == pytest.approx(40, abs=0.5)  # tope = 4x timeout
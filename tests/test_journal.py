@@ -0,0 +1,44 @@
+import main
+from robot.Journal import Journal
+
+
+def _journal(tmp_path):
+    return Journal(tmp_path / "journal.jsonl")
+
+
+def test_reanuda_solo_ordenes_capturadas(tmp_path):
+    j = _journal(tmp_path)
+    j.registrar("orden", "ORDEN_CAPTURADA", valor="05-0791-26")
+    j.registrar("no_reg", "ORDEN_CAPTURADA", valor="Cedula no registrada")
+    j.registrar("marca", "ORDEN_CAPTURADA", valor="Error captura: ERROR_13")
+    j.registrar("guardada", "GUARDADO")
+
+    j = _journal(tmp_path)  # corrida siguiente
+    assert main.orden_reanudable(j, "orden") == "05-0791-26"
+    assert main.orden_reanudable(j, "no_reg") == ""
+    assert main.orden_reanudable(j, "marca") == ""
+    assert main.orden_reanudable(j, "guardada") == ""
+    assert j.alcanzo("guardada", "GUARDADO")  # no se vuelve a migrar
+
+
+def test_fila_escrita_que_vuelve_a_pendiente_se_rehace(tmp_path):
+    j = _journal(tmp_path)
+    j.registrar_muchos(["a", "b"], "ORDEN_CAPTURADA", valor="05-0791-26")
+    j.registrar_muchos(["a", "b"], "ESCRITO_SHEET")
+    j.registrar("c", "GUARDADO")
+
+    j = _journal(tmp_path)
+    assert main.reabrir_reescritas(j, ["a", "c", "nueva"]) == 1
+    assert j.etapa("a") == "EXPORTADO" and j.datos("a") == {}
+    assert not j.alcanzo("a", "GUARDADO")
+    assert main.orden_reanudable(j, "a") == ""
+    assert j.etapa("b") == "ESCRITO_SHEET"  # no se exportó: sigue escrita
+    assert j.etapa("c") == "GUARDADO"
+
+    assert _journal(tmp_path).etapa("a") == "EXPORTADO"  # el reinicio quedó en disco
+
+
+def test_es_no_orden():
+    assert main.es_no_orden("05-0791-26")
+    for v in ("", "Error", "Cedula no registrada", "Falta CC fallecido", "Error captura: VARIOS_SERVICIOS_MES"):
+        assert not main.es_no_orden(v)
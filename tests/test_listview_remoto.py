@@ -0,0 +1,121 @@
+import struct
+
+import pytest
+
+from robot import ListViewRemoto as LV
+from robot.ListViewRemoto import FakeListView, LectorListView, decodificar_slots, leer_tabla
+
+
+def test_interfaz_abstracta():
+    with pytest.raises(TypeError):
+        LectorListView()
+
+
+def test_lee_cabeceras_y_filas():
+    lv = FakeListView([["1234", "05-0791-26"], ["5678", "05-0792-26"]], cabeceras=["Cédula", "No Orden"])
+    headers, filas = leer_tabla(lv)
+    assert headers == ["Cédula", "No Orden"]
+    assert filas == [["1234", "05-0791-26"], ["5678", "05-0792-26"]]
+
+
+def test_sin_cabeceras_no_las_pide():
+    lv = FakeListView([["a", "b"]], cabeceras=["X", "Y"])
+    headers, filas = leer_tabla(lv, cabeceras=False)
+    assert headers == []
+    assert filas == [["a", "b"]]
+
+
+def test_filas_cortas_y_tabla_vacia():
+    headers, filas = leer_tabla(FakeListView([["a"], ["b", "c"]], cabeceras=["1", "2"]))
+    assert filas == [["a", ""], ["b", "c"]]
+    assert leer_tabla(FakeListView([])) == ([], [])
+
+
+def test_bloques_de_celdas():
+    lv = FakeListView([[str(r * 10 + c) for c in range(3)] for r in range(7)], cabeceras=list("abc"))
+    _, filas = leer_tabla(lv, bloque=4)
+    assert filas[6] == ["60", "61", "62"]
+    assert lv.idas_y_vueltas == 6  # 21 celdas / 4 por bloque
+
+
+def test_relee_celdas_truncadas():
+    largo = "x" * 50
+    lv = FakeListView([["corto", largo]], cabeceras=["a", "b"])
+    _, filas = leer_tabla(lv, cch=16)
+    assert filas == [["corto", largo]]
+    assert lv.idas_y_vueltas == 2  # 1 bloque + 1 relectura solo de la celda larga
+
+
+def test_decodificar_slots_corta_por_longitud_o_nul():
+    cch = 8
+    raw = "abc".encode("utf-16-le").ljust(cch * 2, b"\0") + "de".encode("utf-16-le").ljust(cch * 2, b"\0")
+    assert decodificar_slots(raw, [3, -1], cch) == ["abc", "de"]
+    assert decodificar_slots(raw, [1, 2], cch) == ["a", "de"]
+
+
+@pytest.mark.parametrize(
+    "bits, tam_item, off_texto, tam_col, off_texto_col",
+    [(32, 36, 20, 32, 12), (64, 48, 24, 40, 16)],
+)
+def test_estructuras_segun_bitness(bits, tam_item, off_texto, tam_col, off_texto_col):
+    # LVITEMW: mask, iItem, iSubItem, state, stateMask, pszText, cchTextMax, iImage, lParam
+    item = LV._LVITEM[bits]
+    assert item.size == tam_item <= LV._SLOT_ESTRUCTURA
+    raw = item.pack(LV.LVIF_TEXT, 7, 2, 0, 0, 0xABCD1234, 260, 0, 0)
+    assert struct.unpack_from("<iiI", raw, 0) == (LV.LVIF_TEXT, 7, 2)
+    ptr = "<Q" if bits == 64 else "<I"
+    assert struct.unpack_from(ptr, raw, off_texto)[0] == 0xABCD1234
+    assert struct.unpack_from("<i", raw, off_texto + struct.calcsize(ptr))[0] == 260
+
+    # LVCOLUMNW: mask, fmt, cx, pszText, cchTextMax, iSubItem, iImage, iOrder
+    col = LV._LVCOLUMN[bits]
+    assert col.size == tam_col <= LV._SLOT_ESTRUCTURA
+    raw = col.pack(LV.LVCF_TEXT, 0, 0, 0xABCD1234, 260, 3, 0, 0)
+    assert struct.unpack_from(ptr, raw, off_texto_col)[0] == 0xABCD1234
+
+
+class _RemotoEnMemoria(LV.ListViewRemoto):
+    """ListViewRemoto con la memoria del 'proceso destino' en un bytearray."""
+
+    BASE = 0x10000
+
+    def __init__(self, filas, bits):
+        self.hwnd = 1
+        self.bits = bits
+        self.filas = filas
+        self.memoria = bytearray()
+        self._mem, self._mem_size = None, 0
+
+    def _reservar(self, size):
+        self.memoria = bytearray(size)
+        self._mem, self._mem_size = self.BASE, size
+        return self.BASE
+
+    def _liberar(self):
+        self._mem, self._mem_size = None, 0
+
+    def _escribir(self, addr, data):
+        self.memoria[addr - self.BASE:addr - self.BASE + len(data)] = data
+
+    def _leer(self, addr, size):
+        return bytes(self.memoria[addr - self.BASE:addr - self.BASE + size])
+
+    def enviar(self, hwnd, msg, wparam=0, lparam=0, timeout_ms=None):
+        # el control lee SU copia del LVITEM y escribe el texto en pszText
+        assert msg == LV.LVM_GETITEMTEXTW
+        _, item, sub, _, _, psz, cch, _, _ = LV._LVITEM[self.bits].unpack_from(self.memoria, lparam - self.BASE)
+        assert item == wparam
+        txt = self.filas[item][sub][: cch - 1].encode("utf-16-le") + b"\0\0"
+        self._escribir(psz, txt)
+        return len(txt) // 2 - 1
+
+
+@pytest.mark.parametrize("bits", [32, 64])
+def test_ronda_empaqueta_y_lee_la_memoria_remota(monkeypatch, bits):
+    filas = [["1234", "Pérez"], ["5678", "Gómez"]]
+    lv = _RemotoEnMemoria(filas, bits)
+    monkeypatch.setattr(LV.Mensajes, "enviar", lv.enviar)
+
+    raw, lons = lv.leer_bloque([(0, 0), (0, 1), (1, 1)], 16)
+    assert decodificar_slots(raw, lons, 16) == ["1234", "Pérez", "Gómez"]
+    assert lons == [4, 5, 5]
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from robot import MascotaIds
+from robot.MascotaIds import ESPACIO, MascotaIdAllocator, abrir_allocator
+
+
+@pytest.fixture
+def preferido(monkeypatch):
+    """Fija el primer intento (hash) de cada asignación."""
+    valor = {"n": 0}
+    monkeypatch.setattr(MascotaIds, "id_preferido", lambda row, salt="PISCO": valor["n"])
+    return valor
+
+
+def test_ocupado_salta_al_siguiente_libre(preferido):
+    a = MascotaIdAllocator()
+    a.sembrar(["M0005", "M0006", "m0008", "12345678", "M123"])
+    assert a.usados == 3
+
+    preferido["n"] = 5
+    assert a.asignar(["a"]) == "M0007"
+    assert a.asignar(["b"]) == "M0009"
+    assert a.asignar(["a"]) == "M0007"  # misma fila, mismo ID
+    assert a.esta_usado("m0009") and not a.esta_usado("M0010")
+
+
+def test_da_la_vuelta_al_final(preferido):
+    a = MascotaIdAllocator()
+    a.sembrar([f"M{n:04d}" for n in range(ESPACIO - 3, ESPACIO)] + ["M0000"])
+
+    preferido["n"] = ESPACIO - 2
+    assert a.asignar(["a"]) == "M0001"
+    assert a.asignar(["b"]) == "M0002"
+
+
+def test_agotado(preferido):
+    a = MascotaIdAllocator()
+    a.sembrar([f"M{n:04d}" for n in range(ESPACIO - 1)])
+    preferido["n"] = 17
+
+    assert a.asignar(["ultima"]) == f"M{ESPACIO - 1:04d}"
+    assert a.ocupacion() == 1.0
+    with pytest.raises(RuntimeError):
+        a.asignar(["otra"])
+    assert a.asignar(["ultima"]) == f"M{ESPACIO - 1:04d}"
+
+
+def test_libera_los_que_no_llegaron_a_pisco(tmp_path, preferido):
+    a = abrir_allocator(tmp_path, liberar_provisionales=True)
+    preferido["n"] = 100
+    guardada = a.asignar(["guardada"])
+    nunca = a.asignar(["nunca cargada"])
+    fallo = a.asignar(["lote fallido"])
+    a.reservar([guardada, fallo, "Pendiente"])
+    a.liberar([fallo])
+    a.guardar()
+
+    # sin liberar (main durante la corrida): siguen todos ocupados
+    assert abrir_allocator(tmp_path).usados == 3
+
+    b = abrir_allocator(tmp_path, liberar_provisionales=True)
+    assert (b.usados, b.liberados) == (1, 2)
+    assert b.asignar(["guardada"]) == guardada
+    assert b.asignar(["otra"]) == nunca  # M0101 volvió a estar libre
+
+
+def test_archivo_sin_reservas_conserva_todo(tmp_path):
+    ruta = tmp_path / "estado" / MascotaIds.DEFAULT_IDS_NAME
+    ruta.parent.mkdir()
+    ruta.write_text(json.dumps({"asignados": {"k1": "M0001", "k2": "M0002"}}), encoding="utf-8")
+
+    a = abrir_allocator(tmp_path, liberar_provisionales=True)
+    assert (a.usados, a.liberados) == (2, 0)
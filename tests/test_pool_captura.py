@@ -0,0 +1,94 @@
+import pytest
+
+from robot.PoolCaptura import Coordinador, Driver, FakeDriver
+
+M1, M2, M3 = (2026, 1), (2026, 2), (2026, 3)
+
+
+def _trabajo(n_por_mes):
+    return {
+        mes: [((f"{mes[1]}-{i}", mes), f"{mes[1]}{i:03d}") for i in range(n)]
+        for mes, n in n_por_mes.items()
+    }
+
+
+def _ordenes(trabajo, salvo=()):
+    return {ced: f"05-{ced}-26" for items in trabajo.values() for _, ced in items if ced not in salvo}
+
+
+def _correr(drivers, trabajo, **kw):
+    res = []
+    pendientes = Coordinador(drivers).ejecutar(trabajo, res.append, **kw)
+    return res, pendientes
+
+
+def test_driver_es_abstracto():
+    with pytest.raises(TypeError):
+        Driver()
+
+
+def test_un_driver_respeta_el_orden_y_no_reabre_meses():
+    trabajo = _trabajo({M1: 3, M2: 2, M3: 4})
+    d = FakeDriver("local", _ordenes(trabajo))
+    res, pendientes = _correr([d], trabajo, mes_inicial={"local": M2})
+
+    assert pendientes == 0
+    # primero el mes ya abierto, luego el de más pendientes; dentro del mes, en orden
+    esperado = [k for k, _ in trabajo[M2]] + [k for k, _ in trabajo[M3]] + [k for k, _ in trabajo[M1]]
+    assert [r.key for r in res] == esperado
+    assert all(r.mes == r.key[1] for r in res)
+    assert d.cambios_mes == 3
+
+
+def test_varios_drivers_afinidad_de_mes_y_resultados_completos():
+    trabajo = _trabajo({M1: 12, M2: 12, M3: 12})
+    drivers = [FakeDriver(f"s{i}", _ordenes(trabajo), latencia_s=0.002) for i in range(3)]
+    res, pendientes = _correr(drivers, trabajo, mes_inicial={"s0": M1, "s1": M2, "s2": M3})
+
+    assert pendientes == 0
+    assert sorted(r.key for r in res) == sorted(k for items in trabajo.values() for k, _ in items)
+    for r in res:
+        assert r.mes == r.key[1]
+        assert r.out["no_orden_servicio"] == f"05-{r.cedula}-26"
+
+    for d in drivers:
+        por_driver = [r for r in res if r.trabajador == d.nombre]
+        # afinidad: un driver nunca vuelve a un mes que ya dejó
+        meses = [r.mes for r in por_driver]
+        cambios = [m for i, m in enumerate(meses) if i == 0 or m != meses[i - 1]]
+        assert len(cambios) == len(set(cambios)) == d.cambios_mes
+        # dentro de un mes, cada driver recibe sus cédulas en el orden de la cola
+        for mes, items in trabajo.items():
+            orden = [k for k, _ in items]
+            idx = [orden.index(r.key) for r in por_driver if r.mes == mes]
+            assert idx == sorted(idx)
+
+
+def test_mes_con_mas_pendientes_se_reparte_entre_drivers():
+    trabajo = _trabajo({M1: 30, M2: 1})
+    drivers = [FakeDriver(f"s{i}", _ordenes(trabajo), latencia_s=0.002) for i in range(2)]
+    res, _ = _correr(drivers, trabajo)
+
+    assert {r.trabajador for r in res if r.mes == M1} == {"s0", "s1"}
+
+
+def test_errores_y_no_encontrados_llegan_como_resultado():
+    trabajo = _trabajo({M1: 3})
+    _, ced_err = trabajo[M1][0]
+    _, ced_nf = trabajo[M1][1]
+    d = FakeDriver("local", _ordenes(trabajo, salvo=[ced_nf]), fallar={ced_err: RuntimeError("x")})
+    res, _ = _correr([d], trabajo)
+
+    por_ced = {r.cedula: r for r in res}
+    assert isinstance(por_ced[ced_err].err, RuntimeError) and por_ced[ced_err].out is None
+    assert por_ced[ced_nf].out["motivo"] == "NO_ENCONTRADO"
+
+
+def test_excepcion_de_un_driver_frena_el_pool():
+    class Roto(FakeDriver):
+        def buscar(self, cedula, mes):
+            raise KeyboardInterrupt
+
+    trabajo = _trabajo({M1: 5})
+    with pytest.raises(KeyboardInterrupt):
+        Coordinador([Roto("local", {})]).ejecutar(trabajo, lambda r: None)
@@ -0,0 +1,34 @@
+import pytest
+
+from robot import PISCO_CapturarServicios as PCS
+
+
+@pytest.fixture
+def popup(monkeypatch):
+    estado = {"set": True, "anios": set()}
+    monkeypatch.setattr(PCS, "_find_mes_servicios_dialog", lambda timeout=20: 101)
+    monkeypatch.setattr(PCS, "_set_mes_en_dialogo", lambda h, anio, mes: estado["set"])
+    monkeypatch.setattr(PCS, "_anios_visibles", lambda h: estado["anios"])
+    monkeypatch.setattr(PCS, "_click_button_in_dialog", lambda h, texto: True)
+    return estado
+
+
+@pytest.mark.parametrize(
+    "resultado, anios, aplicado",
+    [
+        (True, set(), True),
+        (False, {2026}, False),
+        (PCS.MES_SIN_ANIO, {2026}, True),
+        (PCS.MES_SIN_ANIO, set(), False),  # año no verificable: no se da por aplicado
+        (PCS.MES_SIN_ANIO, {2025}, False),
+        (PCS.MES_SIN_ANIO, {2025, 2026}, False),
+    ],
+)
+def test_mes_aplicado(popup, resultado, anios, aplicado):
+    popup["set"], popup["anios"] = resultado, anios
+    assert PCS.aceptar_popup_mes_servicios(mes=(2026, 3))["mes_aplicado"] is aplicado
+
+
+def test_sin_mes_no_toca_el_dialogo(popup):
+    popup["set"] = False
+    assert PCS.aceptar_popup_mes_servicios()["mes_aplicado"] is True
@@ -0,0 +1,38 @@
+from robot import Portapapeles
+from robot.Portapapeles import parsear_tsv
+
+
+def test_filas_simples_y_vacias():
+    texto = "Fila\tError\r\n1\tFecha inválida\r\n\r\n\t \r\n2\t\r\n"
+    assert list(parsear_tsv(texto)) == [["Fila", "Error"], ["1", "Fecha inválida"], ["2", ""]]
+
+
+def test_celdas_entre_comillas_con_tab_salto_y_comillas_escapadas():
+    texto = '1\t"Error\tcon tab"\r\n2\t"dos\r\nlíneas"\r\n3\t"dijo ""no"""\r\n'
+    assert list(parsear_tsv(texto)) == [
+        ["1", "Error\tcon tab"],
+        ["2", "dos\r\nlíneas"],
+        ["3", 'dijo "no"'],
+    ]
+
+
+def test_comilla_suelta_en_medio_de_la_celda():
+    # Excel solo cita celdas que empiezan con comilla
+    assert list(parsear_tsv('1\tpulgada 5"\tx\n')) == [["1", 'pulgada 5"', "x"]]
+
+
+def test_celda_mas_grande_que_el_limite_de_csv():
+    grande = "x" * (200 * 1024)
+    assert list(parsear_tsv(f'1\t"{grande}"')) == [["1", grande]]
+
+
+def test_copiar_y_esperar_no_devuelve_contenido_viejo(monkeypatch):
+    monkeypatch.setattr(Portapapeles, "secuencia", lambda: 7)
+    monkeypatch.setattr(Portapapeles, "_leer_texto", lambda timeout: "copiado")
+    llamadas = []
+    assert Portapapeles.copiar_y_esperar(lambda: llamadas.append(1), timeout=0.05, poll=0.01) == ""
+    assert llamadas == [1]
+
+    seq = iter([7, 7, 8])
+    monkeypatch.setattr(Portapapeles, "secuencia", lambda: next(seq))
+    assert Portapapeles.copiar_y_esperar(lambda: None, timeout=1.0, poll=0.0) == "copiado"
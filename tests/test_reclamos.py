@@ -0,0 +1,124 @@
+from robot.Reclamos import FakeHoja, Reclamo, es_reclamable, parse_reclamo, token_reclamo
+
+COL = 3
+
+
+class Reloj:
+    def __init__(self, t=1_000_000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+class Intercalada:
+    """Vista de la hoja de un host: corre `antes_de_escribir` justo antes de su próxima escritura."""
+
+    def __init__(self, hoja, antes_de_escribir=None):
+        self.hoja = hoja
+        self.antes_de_escribir = antes_de_escribir
+
+    def leer_columna(self, col):
+        return self.hoja.leer_columna(col)
+
+    def escribir(self, col, valores):
+        f, self.antes_de_escribir = self.antes_de_escribir, None
+        if f:
+            f()
+        self.hoja.escribir(col, valores)
+
+
+def _host(hoja, nombre, reloj, **kw):
+    return Reclamo(hoja, COL, host=nombre, lease_minutos=10, espera_verificacion_s=1, ahora=reloj, **kw)
+
+
+def test_token_y_reclamables():
+    assert parse_reclamo(token_reclamo("PC-1", 123.9)) == ("PC-1", 123)
+    assert parse_reclamo("Pendiente") is None
+    assert es_reclamable(" pendiente ", "A", 0)
+    assert es_reclamable(token_reclamo("A", 50), "A", 10)      # propio, vigente
+    assert es_reclamable(token_reclamo("B", 5), "A", 10)       # ajeno, vencido
+    assert not es_reclamable(token_reclamo("B", 50), "A", 10)  # ajeno, vigente
+    assert not es_reclamable("05-0791-26", "A", 10)
+
+
+def test_dos_hosts_a_la_vez_no_comparten_filas():
+    hoja = FakeHoja(["Pendiente"] * 6 + ["05-0791-26"])
+    reloj = Reloj()
+    b = _host(hoja, "B", reloj)
+    # B reclama mientras A espera la verificación: ve el reclamo vigente de A
+    a = _host(hoja, "A", reloj, dormir=lambda s: b.reclamar())
+
+    assert a.reclamar() == set(range(2, 8))
+    assert b.filas == set()
+
+
+def test_escritor_tardio_pisa_y_el_renovar_por_lote_lo_detecta():
+    hoja = FakeHoja(["Pendiente"] * 4)
+    reloj = Reloj()
+    a = _host(hoja, "A", reloj, dormir=lambda s: None)
+
+    # B lee "Pendiente", pero su escritura llega después de que A ya verificó
+    vista_b = Intercalada(hoja, antes_de_escribir=a.reclamar)
+    b = _host(vista_b, "B", reloj, dormir=lambda s: None)
+    assert b.reclamar() == {2, 3, 4, 5}
+    assert a.filas == {2, 3, 4, 5}  # last-writer-wins: A cree que las tiene
+
+    # antes del lote A reverifica y las suelta; B las conserva
+    assert a.renovar({2, 3}) == set()
+    assert a.filas == {4, 5} and a.perdidas == 2
+    assert a.vigentes({4, 5}) == set()
+    assert a.filas == set()
+    assert b.renovar() == {2, 3, 4, 5}
+
+
+def test_renovar_extiende_el_lease_y_otro_host_no_entra():
+    hoja = FakeHoja(["Pendiente"] * 3)
+    reloj = Reloj()
+    a = _host(hoja, "A", reloj, dormir=lambda s: None)
+    b = _host(hoja, "B", reloj, dormir=lambda s: None)
+    a.reclamar()
+
+    reloj.t += 8 * 60
+    assert a.renovar({2}) == {2}
+    reloj.t += 4 * 60  # el lease original de A ya venció; solo la fila 2 fue renovada
+    assert b.reclamar() == {3, 4}
+    assert a.renovar() == {2}
+    assert parse_reclamo(hoja.leer_columna(COL)[0]) == ("A", int(reloj.t + 10 * 60))
+
+
+def test_renovar_si_toca_cada_tercio_del_lease():
+    hoja = FakeHoja(["Pendiente"])
+    reloj = Reloj()
+    a = _host(hoja, "A", reloj, dormir=lambda s: None)
+    a.reclamar()
+    antes = hoja.leer_columna(COL)[0]
+
+    reloj.t += 60
+    a.renovar_si_toca()
+    assert hoja.leer_columna(COL)[0] == antes
+    reloj.t += 3 * 60
+    a.renovar_si_toca()
+    assert hoja.leer_columna(COL)[0] != antes
+
+
+def test_liberar_devuelve_solo_lo_propio_sin_terminar():
+    hoja = FakeHoja(["Pendiente"] * 4)
+    reloj = Reloj()
+    a = _host(hoja, "A", reloj, dormir=lambda s: None)
+    a.reclamar()
+
+    hoja.escribir(COL, {2: "05-0791-26"})  # valor final escrito por A
+    a.terminar({2})
+    hoja.escribir(COL, {3: token_reclamo("B", reloj.t + 600)})  # fila que pisó B
+
+    assert a.liberar() == 2
+    assert hoja.leer_columna(COL) == ["05-0791-26", token_reclamo("B", reloj.t + 600), "Pendiente", "Pendiente"]
+    assert a.filas == set()
+
+
+def test_host_con_reclamo_vencido_de_otro_lo_toma():
+    reloj = Reloj()
+    hoja = FakeHoja([token_reclamo("B", reloj.t - 1), token_reclamo("B", reloj.t + 60)])
+    a = _host(hoja, "A", reloj, dormir=lambda s: None)
+    assert a.reclamar() == {2}
@@ -0,0 +1,56 @@
+from robot import Reintentos
+from robot.Mensajes import PiscoHung
+from robot.Reintentos import ColaReintentos, ErrorTipos13, PERMANENTE, TRANSITORIO
+
+
+def test_backoff_exponencial_por_ronda():
+    cola = ColaReintentos(max_intentos=5, espera_s=2.0)
+    esperas = []
+    key = ("1234567", (2026, 3))  # main usa (cédula, mes) como clave
+
+    assert cola.siguiente_ronda(dormir=esperas.append) == {}
+    for _ in range(3):
+        assert cola.agregar(key, "1234567", "TIMEOUT", grupo=(2026, 3))
+        cola.siguiente_ronda(dormir=esperas.append)
+    assert esperas == [2.0, 4.0, 8.0]
+
+    sin_espera = ColaReintentos(espera_s=0)
+    sin_espera.agregar("k", "1", "TIMEOUT")
+    sin_espera.siguiente_ronda(dormir=lambda s: esperas.append(("durmió", s)))
+    assert esperas == [2.0, 4.0, 8.0]
+
+
+def test_agrupa_por_grupo_y_agota_intentos():
+    cola = ColaReintentos(max_intentos=2, espera_s=0)
+    assert cola.agregar(("a", 1), "a", "COMBO", grupo=1)
+    assert cola.agregar(("b", 2), "b", "COMBO", grupo=2)
+    assert cola.agregar(("c", 1), "c", "COMBO", grupo=1)
+
+    ronda = cola.siguiente_ronda()
+    assert {g: [e.key for e in ents] for g, ents in ronda.items()} == {1: [("a", 1), ("c", 1)], 2: [("b", 2)]}
+    assert all(e.intentos == 2 for ents in ronda.values() for e in ents)
+
+    cola.resuelto(("a", 1))
+    cola.descartar(("b", 2))
+    assert not cola.agregar(("c", 1), "c", "TIMEOUT", grupo=1)
+    assert cola.agotados == {("c", 1): "TIMEOUT"}
+    assert cola.resumen() == {"rondas": 1, "resueltos": 1, "agotados": 1, "en_cola": 0}
+
+
+def test_max_intentos_1_no_encola():
+    cola = ColaReintentos(max_intentos=1)
+    assert not cola.agregar("k", "1", "TIMEOUT")
+    assert len(cola) == 0
+
+
+def test_clasificar():
+    assert Reintentos.clasificar(ErrorTipos13()) == (PERMANENTE, "ERROR_13")
+    assert Reintentos.clasificar(TimeoutError()) == (TRANSITORIO, "TIMEOUT")
+    assert Reintentos.clasificar(PiscoHung(1, 0, 100)) == (TRANSITORIO, "PISCO_COLGADO")
+    assert Reintentos.clasificar(KeyError("x")) == (TRANSITORIO, "KeyError")
+    assert Reintentos.clasificar(out={"ok": True, "no_orden_servicio": " "}) == (TRANSITORIO, "SIN_NO_ORDEN")
+    assert Reintentos.clasificar(out={"motivo": "NO_ABRIO"}) == (TRANSITORIO, "NO_ABRIO")
+
+    marca = Reintentos.marca_permanente("ERROR_13")
+    assert marca == "Error captura: ERROR_13"
+    assert Reintentos.es_marca_permanente(" error CAPTURA: x") and not Reintentos.es_marca_permanente("05-0001-26")
@@ -0,0 +1,78 @@
+import pytest
+
+from robot import Selectores
+from robot.SimuladorPisco import SimuladorUI
+
+
+@pytest.fixture
+def ui():
+    """Formulario de prueba sobre el simulador: raíz en y=100."""
+    sim = SimuladorUI({})
+    raiz = sim._nuevo(0, "ThunderRT6FormDC", titulo="Migración", rect=(0, 100, 800, 700))
+    h = {"raiz": raiz}
+    h["combo_chico"] = sim._nuevo(raiz, "ThunderRT6ComboBox", rect=(10, 110, 60, 130))
+    h["combo"] = sim._nuevo(raiz, "ComboBox", rect=(300, 120, 500, 142))
+    h["edit"] = sim._nuevo(raiz, "ThunderRT6TextBox", rect=(100, 122, 280, 142))
+    h["edit_lejos"] = sim._nuevo(raiz, "ThunderRT6TextBox", rect=(100, 500, 280, 520))
+    h["cargar"] = sim._nuevo(raiz, "ThunderRT6CommandButton", titulo="Cargar Archivo", rect=(520, 120, 600, 142))
+    h["lbl"] = sim._nuevo(raiz, "Static", titulo="* Contrato Nro:", rect=(10, 200, 110, 216))
+    h["nro"] = sim._nuevo(raiz, "ThunderRT6TextBox", texto="C-1", rect=(120, 201, 300, 221))
+    h["orden"] = sim._nuevo(raiz, "ThunderRT6TextBox", texto="05-0791-26", rect=(120, 240, 300, 260))
+    h["marco"] = sim._nuevo(raiz, "ThunderRT6Frame", rect=(400, 300, 700, 600))
+    h["boton_marco"] = sim._nuevo(h["marco"], "ThunderRT6CommandButton", titulo="Ok", rect=(420, 320, 480, 340))
+    h["oculto"] = sim._nuevo(raiz, "ATL:00A1", visible=False, rect=(0, 100, 10, 110))
+    return sim, h
+
+
+def test_filtros_mayor_y_relacion_entre_reglas(ui):
+    sim, h = ui
+    res = Selectores.localizar(sim, h["raiz"], """
+        combo = ComboBox|ThunderRT6ComboBox ancho>=40 franja<=220 mayor:ancho
+        edit  = Edit|ThunderRT6TextBox ancho>=80 franja<=220 izquierda-de:combo peso-y=3
+        boton = ThunderRT6CommandButton texto="cargar archivo" habilitado
+    """)
+    assert res == {"combo": h["combo"], "edit": h["edit"], "boton": h["cargar"]}
+
+
+def test_label_como_ancla_valor_regex_y_dentro_de(ui):
+    sim, h = ui
+    res = Selectores.localizar(sim, h["raiz"], """
+        nro   = @campo derecha-de:"contrato nro" misma-fila<=14 peso-y=4
+        orden = @campo valor~'^\\d{2}-\\d{3,5}-\\d{2}$'
+        marco = ThunderRT6Frame
+        ok    = ThunderRT6CommandButton dentro-de:marco
+    """)
+    assert res == {"nro": h["nro"], "orden": h["orden"], "marco": h["marco"], "ok": h["boton_marco"]}
+    assert Selectores.uno(sim, h["raiz"], '@campo derecha-de:"no existe"') is None
+
+
+def test_prefijo_y_oculto(ui):
+    sim, h = ui
+    assert Selectores.uno(sim, h["raiz"], "ATL:*") is None
+    assert Selectores.uno(sim, h["raiz"], "ATL:* oculto") == h["oculto"]
+
+
+def test_memoriza_y_revalida_por_generacion(ui):
+    sim, h = ui
+    consulta = "b = ThunderRT6CommandButton texto~'^cargar'"
+    antes = Selectores.estadisticas()
+    assert Selectores.localizar(sim, h["raiz"], consulta)["b"] == h["cargar"]
+    assert Selectores.localizar(sim, h["raiz"], consulta)["b"] == h["cargar"]
+    despues = Selectores.estadisticas()
+    assert (despues["pasadas"] - antes["pasadas"], despues["memo"] - antes["memo"]) == (1, 1)
+
+    # el elegido dejó de cumplir los filtros: se vuelve a recorrer
+    sim._nodos[h["cargar"]].titulo = "Cancelar"
+    assert Selectores.localizar(sim, h["raiz"], consulta)["b"] is None
+
+
+@pytest.mark.parametrize("texto", [
+    "x = ",
+    "x = Edit ancho>>3",
+    "a = Edit derecha-de:b\nb = Edit derecha-de:a",
+    "sin igual",
+    "x = Edit texto='sin cerrar",
+])
+def test_selectores_invalidos(texto):
+    with pytest.raises(ValueError):
+        Selectores.compilar(texto)
@@ -0,0 +1,64 @@
+import pytest
+
+from robot import Watchdog
+from robot.Mensajes import PiscoHung
+from robot.Watchdog import SesionIrrecuperable, WatchdogSesion
+
+
+@pytest.fixture
+def ping(monkeypatch):
+    estado = {"responde": True, "llamadas": []}
+
+    def responde(hwnd, timeout_ms):
+        estado["llamadas"].append((hwnd, timeout_ms))
+        return estado["responde"]
+
+    monkeypatch.setattr(Watchdog.Mensajes, "responde", responde)
+    return estado
+
+
+def test_reinicia_tras_n_fallos_seguidos(ping):
+    w = WatchdogSesion(fallos_seguidos=3, ping_ms=800)
+    assert not w.fallo(ValueError("x"), hwnd=10)
+    assert not w.fallo(ValueError("x"), hwnd=10)
+    w.exito()
+    assert not w.fallo(ValueError("x"), hwnd=10)
+    assert not w.fallo(ValueError("x"))
+    assert w.fallo(ValueError("x"), hwnd=10)
+    assert ping["llamadas"][0] == (10, 800)
+
+
+def test_colgado_reinicia_en_el_primer_fallo(ping):
+    w = WatchdogSesion(fallos_seguidos=5)
+    assert w.fallo(PiscoHung(10, 0x000C, 2000), hwnd=10)
+    assert ping["llamadas"] == []  # PiscoHung no necesita ping
+
+    ping["responde"] = False
+    assert w.fallo(ValueError("x"), hwnd=10)
+    assert not WatchdogSesion(fallos_seguidos=5).fallo(ValueError("x"), hwnd=None)
+
+
+def test_reiniciar_desmonta_monta_y_limita(ping):
+    w = WatchdogSesion(max_reinicios=2)
+    pasos = []
+
+    def desmontar():
+        pasos.append("desmontar")
+        raise OSError("taskkill falló")  # best-effort: no corta el reinicio
+
+    w.fallos = 3
+    assert w.reiniciar(desmontar, lambda: pasos.append("montar") or "ventana") == "ventana"
+    assert pasos == ["desmontar", "montar"] and w.fallos == 0
+
+    with pytest.raises(SesionIrrecuperable):
+        w.reiniciar(lambda: None, lambda: (_ for _ in ()).throw(RuntimeError("login")))
+    with pytest.raises(SesionIrrecuperable):
+        w.reiniciar(lambda: None, lambda: "ventana")
+    assert w.resumen()["reinicios"] == 2
+
+
+def test_desde_config(tmp_path):
+    cfg = tmp_path / "config.ini"
+    cfg.write_text("[watchdog]\nfallos_seguidos = 0\nmax_reinicios = 5\n", encoding="utf-8")
+    w = Watchdog.desde_config(cfg)
+    assert (w.fallos_seguidos, w.max_reinicios, w.ping_ms) == (1, 5, 1500)